@@ -4,11 +4,34 @@ import { Client } from "@gradio/client"
 const HF_API_TOKEN = process.env.HF_API_TOKEN
 const HF_MODEL_ENDPOINT = process.env.HF_MODEL_ENDPOINT // Paid Inference Endpoint URL
 const HF_SPACE_ID = process.env.HF_SPACE_ID // Free Gradio Space (e.g., "itsmepraks/gw-courses-chat")
+const RETRIEVAL_SERVICE_URL = process.env.RETRIEVAL_SERVICE_URL // Local KG retrieval service (utils/retrieval_service.py)
 
 export async function POST(request: NextRequest) {
   try {
     const { messages } = await request.json()
-    const lastUserMessage = messages.filter((m: { role: string }) => m.role === "user").pop()?.content || ""
+    const question = messages.filter((m: { role: string }) => m.role === "user").pop()?.content || ""
+
+    // Templated lookups (instructor, schedule, CRN, description) are answered from the catalog
+    const catalogAnswer = await fastPathAnswer(question)
+    if (catalogAnswer) {
+      return NextResponse.json({ content: catalogAnswer })
+    }
+
+    const context = await graphContext(question)
+    const lastUserMessage = context ? `Graph Context:\n${context}\n\nQuestion: ${question}` : question
+
+    // Repeated and near-duplicate questions with the same graph context and the same earlier turns
+    // reuse an earlier answer; the turns are part of the key because follow-ups ("who teaches it?")
+    // depend on them
+    const history = messages.slice(0, -1).map((m: { role: string; content: string }) => [m.role, m.content])
+    const cachedAnswer = await retrievalService("/cache/get", { query: question, context, history })
+    if (cachedAnswer?.answer) {
+      return NextResponse.json({ content: cachedAnswer.answer })
+    }
+    const respond = (content: string) => {
+      void retrievalService("/cache/put", { query: question, context, history, answer: content })
+      return NextResponse.json({ content })
+    }
 
     if (HF_SPACE_ID) {
       console.log("[v0] Using Gradio Space:", HF_SPACE_ID)
@@ -31,8 +54,9 @@ export async function POST(request: NextRequest) {
         // gr.ChatInterface exposes /chat endpoint with positional args: (message, history)
         const result = await client.predict("/chat", [lastUserMessage, history])
 
-        const content = (result.data as string[])?.[0] || result.data || "No response generated"
-        return NextResponse.json({ content })
+        const content = (result.data as string[])?.[0] || result.data
+        if (typeof content === "string" && content) return respond(content)
+        return NextResponse.json({ content: "No response generated" })
       } catch (spaceError) {
         console.error("[v0] Gradio Space error:", spaceError)
         throw spaceError
@@ -57,7 +81,7 @@ export async function POST(request: NextRequest) {
           "x-wait-for-model": "true",
         },
         body: JSON.stringify({
-          inputs: formatMessagesForModel(messages),
+          inputs: formatMessagesForModel(withGraphContext(messages, lastUserMessage)),
           parameters: {
             max_new_tokens: 512,
             temperature: 0.7,
@@ -81,11 +105,10 @@ export async function POST(request: NextRequest) {
       }
 
       const data = await response.json()
-      const content = Array.isArray(data)
-        ? data[0]?.generated_text || "No response generated"
-        : data.generated_text || data[0]?.generated_text || "No response generated"
+      const content = Array.isArray(data) ? data[0]?.generated_text : data.generated_text || data[0]?.generated_text
 
-      return NextResponse.json({ content })
+      if (content) return respond(content)
+      return NextResponse.json({ content: "No response generated" })
     }
 
     return NextResponse.json({
@@ -127,6 +150,47 @@ Add \`HF_SPACE_ID\` in **Vars** with your Space ID (e.g., \`itsmepraks/gw-course
   }
 }
 
+async function retrievalService(path: string, body: object, timeoutMs = 500): Promise<any> {
+  if (!RETRIEVAL_SERVICE_URL) return null
+
+  try {
+    const response = await fetch(`${RETRIEVAL_SERVICE_URL.replace(/\/$/, "")}${path}`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+      signal: AbortSignal.timeout(timeoutMs),
+    })
+    return response.ok ? await response.json() : null
+  } catch (serviceError) {
+    console.error(`[v0] Retrieval service ${path} error:`, serviceError)
+    return null
+  }
+}
+
+async function fastPathAnswer(question: string): Promise<string | null> {
+  if (!question) return null
+  const result = await retrievalService("/answer", { query: question })
+  return result?.answer || null
+}
+
+// KG context for the question, used in the same "Graph Context: ... Question: ..." shape the KG-QA model was trained on
+async function graphContext(question: string): Promise<string> {
+  if (!question) return ""
+  const result = await retrievalService("/context", { query: question, max_hops: 3 }, 2000)
+  const context = result?.context
+  if (!context || context === "No relevant graph information found.") return ""
+  return context
+}
+
+// The conversation with its last user turn replaced by the context-augmented question
+function withGraphContext(
+  messages: { role: string; content: string }[],
+  lastUserMessage: string,
+): { role: string; content: string }[] {
+  const lastUserIndex = messages.map((m) => m.role).lastIndexOf("user")
+  return messages.map((m, i) => (i === lastUserIndex ? { ...m, content: lastUserMessage } : m))
+}
+
 function formatMessagesForModel(messages: { role: string; content: string }[]): string {
   return (
     messages
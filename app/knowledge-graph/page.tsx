@@ -10,6 +10,7 @@ import { Button } from "@/components/ui/button"
 import { Navigation } from "@/components/navigation"
 import { BackToTop } from "@/components/back-to-top"
 import { Search, Network, Users, BookOpen, GitBranch, Sparkles, ArrowRight, Maximize2, Minimize2, X } from "lucide-react"
+import { fetchAsset } from "@/lib/assets"
 
 // Dynamically import ForceGraph2D to avoid SSR issues
 const ForceGraph2D = dynamic(() => import("react-force-graph-2d"), { ssr: false })
@@ -72,7 +73,7 @@ export default function KnowledgeGraphPage() {
   const fullscreenContainerRef = useRef<HTMLDivElement>(null)
 
   useEffect(() => {
-    fetch("/data/knowledge_graph.json")
+    fetchAsset("knowledge_graph.json")
       .then((res) => res.json())
       .then((data) => setGraphData(data))
       .catch((err) => console.error("Failed to load graph data:", err))
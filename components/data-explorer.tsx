@@ -8,6 +8,7 @@ import { Card } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table"
 import { cn } from "@/lib/utils"
+import { fetchAsset } from "@/lib/assets"
 import { motion, AnimatePresence } from "framer-motion"
 
 interface Message {
@@ -116,7 +117,7 @@ export function DataExplorer() {
     }
 
     // Load standard fine-tuning data
-    fetch("/data/course_finetune.jsonl")
+    fetchAsset("course_finetune.jsonl")
       .then(res => res.text())
       .then(text => {
         const lines = text.trim().split('\n').filter(line => line.trim())
@@ -130,7 +131,7 @@ export function DataExplorer() {
       })
 
     // Load KG-based training data
-    fetch("/data/course_finetune_kg_rag.jsonl")
+    fetchAsset("course_finetune_kg_rag.jsonl")
       .then(res => res.text())
       .then(text => {
         const lines = text.trim().split('\n').filter(line => line.trim())
@@ -146,7 +147,7 @@ export function DataExplorer() {
     // Load schedule CSV data (only if tab is active or will be used)
     const loadScheduleCSV = async () => {
       try {
-        const res = await fetch("/data/spring_2026_courses.csv")
+        const res = await fetchAsset("spring_2026_courses.csv")
         if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`)
         const text = await res.text()
         if (text && typeof text === 'string') {
@@ -164,7 +165,7 @@ export function DataExplorer() {
     // Load bulletin CSV data (only if tab is active or will be used)
     const loadBulletinCSV = async () => {
       try {
-        const res = await fetch("/data/bulletin_courses.csv")
+        const res = await fetchAsset("bulletin_courses.csv")
         if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`)
         const text = await res.text()
         if (text && typeof text === 'string') {
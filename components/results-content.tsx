@@ -20,12 +20,21 @@ import {
 import { BackToTop } from "@/components/back-to-top"
 import { TrendingDown, TrendingUp, Zap, Clock, Target, AlertCircle, CheckCircle2, BarChart3, LineChart as LineChartIcon, GitCompare, Info, HelpCircle } from "lucide-react"
 import { Popover, PopoverContent, PopoverTrigger } from "@/components/ui/popover"
+import { fetchAsset } from "@/lib/assets"
 
 interface TrainingMetrics {
   approaches: {
     [key: string]: {
       name: string
-      epochs: Array<{ epoch: number; train_loss: number; val_loss?: number; learning_rate: number }>
+      run_id?: string
+      // Logged points before downsampling (one per logged training step)
+      total_points: number
+      // Distinct epochs seen in the full log (epochs below is downsampled)
+      num_epochs: number
+      // Downsampled by utils/metrics_store.py; step is the training step of each kept point
+      epochs: Array<{ step?: number; epoch: number; train_loss: number; learning_rate: number }>
+      // Validation rows, logged separately from the training steps and downsampled the same way
+      eval?: Array<{ step: number; epoch: number; val_loss: number }>
       final_metrics: {
         final_loss: number
         val_loss?: number
@@ -40,7 +49,8 @@ interface ModelComparison {
   comparisons: Array<{
     approach: string
     notebook: string
-    training_samples: number
+    run_id?: string
+    training_samples: number | null
     epochs: number
     lora_rank: number
     learning_rate: number
@@ -54,21 +64,51 @@ interface ModelComparison {
   }>
 }
 
+// Written by utils/rag_profiler.py; one report per approach, absent until a profile has been run
+interface LatencySummary {
+  count: number
+  mean?: number
+  p50?: number
+  p95?: number
+  p99?: number
+}
+
+interface LatencyMetrics {
+  approaches: {
+    [approach: string]: {
+      profiled_at: string
+      backend: string
+      model: string | null
+      num_queries: number
+      stages_seconds: { [stage: string]: LatencySummary }
+      tokens: { [key: string]: LatencySummary }
+    }
+  }
+}
+
+const formatMs = (seconds?: number) => (seconds === undefined ? "–" : `${(seconds * 1000).toFixed(1)}`)
+
 export function ResultsContent() {
   const [trainingMetrics, setTrainingMetrics] = useState<TrainingMetrics | null>(null)
   const [modelComparison, setModelComparison] = useState<ModelComparison | null>(null)
+  const [latencyMetrics, setLatencyMetrics] = useState<LatencyMetrics | null>(null)
   const [isClient, setIsClient] = useState(false)
 
   useEffect(() => {
     Promise.all([
-      fetch("/data/training_metrics.json").then((r) => r.json()),
-      fetch("/data/model_comparison.json").then((r) => r.json()),
+      fetchAsset("training_metrics.json").then((r) => r.json()),
+      fetchAsset("model_comparison.json").then((r) => r.json()),
     ])
       .then(([metrics, comparison]) => {
         setTrainingMetrics(metrics)
         setModelComparison(comparison)
       })
       .catch((err) => console.error("Failed to load data:", err))
+    // Optional: only present after utils/rag_profiler.py has been run
+    fetchAsset("latency_metrics.json")
+      .then((r) => (r.ok ? r.json() : null))
+      .then(setLatencyMetrics)
+      .catch(() => setLatencyMetrics(null))
   }, [])
 
   useEffect(() => {
@@ -77,44 +117,47 @@ export function ResultsContent() {
 
   const renderChart = (chart: ReactNode) => (isClient ? chart : <div className="h-full w-full rounded-lg bg-muted/10" />)
 
-  // Create comparison data - sample standard data if it's much larger than others
   const standardEpochs = trainingMetrics?.approaches.standard.epochs || []
   const optimizedEpochs = trainingMetrics?.approaches.optimized.epochs || []
   const kgBasedEpochs = trainingMetrics?.approaches.kg_based.epochs || []
-  
-  // Use the minimum length to avoid showing zeros for shorter datasets
-  const minLength = Math.min(
-    optimizedEpochs.length,
-    kgBasedEpochs.length,
-    Math.min(standardEpochs.length, 100) // Limit to 100 points for comparison
-  )
+  // Training steps before downsampling
+  const standardSteps = trainingMetrics?.approaches.standard.total_points ?? standardEpochs.length
+  const optimizedSteps = trainingMetrics?.approaches.optimized.total_points ?? optimizedEpochs.length
+  const kgBasedSteps = trainingMetrics?.approaches.kg_based.total_points ?? kgBasedEpochs.length
 
-  const combinedLossData = trainingMetrics
-    ? Array.from({ length: minLength }, (_, index) => {
-        // Sample standard data if it's too large
-        const standardIndex = standardEpochs.length > minLength
-          ? Math.floor((index / minLength) * standardEpochs.length)
-          : index
-        
-        // For KG-Based, use the actual data point if available, otherwise null (not 0)
-        const kgLoss = kgBasedEpochs[index]?.train_loss
-        
-        return {
-          epoch: index + 1,
-          standard: standardEpochs[standardIndex]?.train_loss || null,
-          optimized: optimizedEpochs[index]?.train_loss || null,
-          kg_based: kgLoss !== undefined ? kgLoss : null,
-        }
-      })
-    : []
+  // Align the three curves on their training step; each approach keeps different points after downsampling
+  type LossRow = { step: number; standard?: number; optimized?: number; kg_based?: number }
+  const lossByStep = new Map<number, LossRow>()
+  const series = [
+    ["standard", standardEpochs],
+    ["optimized", optimizedEpochs],
+    ["kg_based", kgBasedEpochs],
+  ] as const
+  for (const [key, entries] of series) {
+    entries.forEach((entry, index) => {
+      const step = entry.step ?? index + 1
+      const row = lossByStep.get(step) ?? { step }
+      row[key] = entry.train_loss
+      lossByStep.set(step, row)
+    })
+  }
+  const combinedLossData = Array.from(lossByStep.values()).sort((a, b) => a.step - b.step)
 
   // Full standard data for detailed view
   const standardLossData = standardEpochs.map((entry, index) => ({
-    step: index + 1,
+    step: entry.step ?? index + 1,
     loss: entry.train_loss,
     learning_rate: entry.learning_rate,
   }))
 
+  // Sample counts come from model_comparison.json (parsed from the notebooks by data_prep.py)
+  const kgComparison = modelComparison?.comparisons.find((c) => c.approach === "KG-Based QA System")
+  const otherSampleCounts =
+    modelComparison?.comparisons
+      .filter((c) => c !== kgComparison)
+      .map((c) => c.training_samples)
+      .filter((n): n is number => n != null) || []
+
   const comparisonData =
     modelComparison?.comparisons.map((c) => ({
       name: c.approach.split(" ")[0],
@@ -214,7 +257,7 @@ export function ResultsContent() {
                       <span className="text-sm text-muted-foreground">Training Time</span>
                       <span className="text-sm">{approach.training_time_min.toFixed(1)}m</span>
                     </div>
-                    {approach.training_samples < 500 && (
+                    {approach.training_samples != null && approach.training_samples < 500 && (
                       <p className="text-xs text-muted-foreground/70 mt-2">
                         Note: Faster training due to smaller dataset and A100 GPU
                       </p>
@@ -236,7 +279,13 @@ export function ResultsContent() {
                 <ResponsiveContainer width="100%" height={400}>
                   <LineChart data={combinedLossData}>
                     <CartesianGrid strokeDasharray="3 3" stroke="rgba(100, 116, 139, 0.1)" />
-                    <XAxis dataKey="epoch" label={{ value: "Epoch", position: "insideBottom", offset: -5 }} stroke="rgba(148, 163, 184, 0.5)" />
+                    <XAxis
+                      dataKey="step"
+                      type="number"
+                      domain={["dataMin", "dataMax"]}
+                      label={{ value: "Training Step", position: "insideBottom", offset: -5 }}
+                      stroke="rgba(148, 163, 184, 0.5)"
+                    />
                     <YAxis label={{ value: "Loss", angle: -90, position: "insideLeft" }} stroke="rgba(148, 163, 184, 0.5)" />
                     <Tooltip
                       contentStyle={{
@@ -252,8 +301,8 @@ export function ResultsContent() {
                       stroke="#f59e0b" 
                       strokeWidth={2} 
                       name="Standard" 
-                      dot={{ r: 4 }} 
-                      connectNulls={false}
+                      dot={false} 
+                      connectNulls
                     />
                     <Line 
                       type="monotone" 
@@ -261,8 +310,8 @@ export function ResultsContent() {
                       stroke="#3b82f6" 
                       strokeWidth={2} 
                       name="Optimized" 
-                      dot={{ r: 4 }} 
-                      connectNulls={false}
+                      dot={false} 
+                      connectNulls
                     />
                     <Line 
                       type="monotone" 
@@ -271,21 +320,22 @@ export function ResultsContent() {
                       strokeWidth={2} 
                       name="KG-Based" 
                       dot={{ r: 4 }} 
-                      connectNulls={false}
+                      connectNulls
                     />
                   </LineChart>
                 </ResponsiveContainer>
               )}
               <div className="mt-4 space-y-2">
                 <p className="text-xs text-muted-foreground/60">
-                  {standardEpochs.length > 100 && "Standard approach data is sampled for comparison. "}
-                  KG-based approach achieves the lowest training loss (0.30), converging faster despite using only 195 training samples vs 2,828 for others.
+                  KG-based approach achieves the lowest training loss ({kgComparison?.final_loss.toFixed(2) ?? "–"}), converging faster despite using only{" "}
+                  {kgComparison?.training_samples?.toLocaleString() ?? "–"} training samples vs{" "}
+                  {otherSampleCounts.map((n) => n.toLocaleString()).join(" / ") || "–"} for the fine-tuned models.
                 </p>
                 <div className="flex items-start gap-2 text-xs text-muted-foreground/60">
                   <Info className="h-3.5 w-3.5 mt-0.5 flex-shrink-0" />
                   <p>
-                    <strong>Note:</strong> KG-Based has only {kgBasedEpochs.length} data points (vs {optimizedEpochs.length} for Optimized, {Math.min(standardEpochs.length, 100)} shown for Standard) 
-                    due to its smaller dataset and faster convergence. The graph shows aligned comparison up to the minimum length.
+                    <strong>Note:</strong> KG-Based logged only {kgBasedSteps} training steps (vs {optimizedSteps} for Optimized and {standardSteps} for Standard)
+                    due to its smaller dataset and faster convergence. Curves are plotted against their training step; longer runs are downsampled for display.
                   </p>
                 </div>
               </div>
@@ -296,7 +346,7 @@ export function ResultsContent() {
           {standardEpochs.length > 50 && (
             <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ duration: 0.5, delay: 0.05 }} className="mb-8">
               <Card className="p-6 bg-card/50 border-border/50">
-                <h3 className="font-semibold text-lg mb-4">Standard Fine-tuning: Detailed Training Loss ({standardEpochs.length} steps)</h3>
+                <h3 className="font-semibold text-lg mb-4">Standard Fine-tuning: Detailed Training Loss ({standardSteps} steps)</h3>
                 {renderChart(
                   <ResponsiveContainer width="100%" height={400}>
                     <LineChart data={standardLossData}>
@@ -337,7 +387,8 @@ export function ResultsContent() {
                   </ResponsiveContainer>
                 )}
                 <p className="text-xs text-muted-foreground/60 mt-4">
-                  Complete training loss curve showing all {standardEpochs.length} training steps from the standard fine-tuning approach.
+                  Training loss curve over all {standardSteps} training steps of the standard fine-tuning approach
+                  ({standardEpochs.length} points shown after downsampling).
                   Final loss: {trainingMetrics?.approaches.standard.final_metrics.final_loss.toFixed(4)} | 
                   Training time: {trainingMetrics?.approaches.standard.final_metrics.training_time_minutes.toFixed(2)} minutes
                 </p>
@@ -578,7 +629,7 @@ export function ResultsContent() {
                           Epochs: <strong>{approach.epochs}</strong>
                         </li>
                         <li>
-                          Training Samples: <strong>{approach.training_samples}</strong>
+                          Training Samples: <strong>{approach.training_samples ?? "–"}</strong>
                         </li>
                       </ul>
                     </Card>
@@ -672,7 +723,7 @@ export function ResultsContent() {
                   <div className="flex items-center justify-between mb-3">
                     <div>
                       <h3 className="font-semibold">{approach.name}</h3>
-                      <p className="text-xs text-muted-foreground">Epochs: {approach.epochs.length}</p>
+                      <p className="text-xs text-muted-foreground">Epochs: {approach.num_epochs}</p>
                     </div>
                     <Badge variant="outline">
                       Final Loss: <span className="ml-1 font-semibold">{approach.final_metrics.final_loss.toFixed(3)}</span>
@@ -694,6 +745,50 @@ export function ResultsContent() {
               ))}
             </motion.div>
           )}
+
+          {latencyMetrics && Object.keys(latencyMetrics.approaches).length > 0 && (
+            <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ duration: 0.5, delay: 0.1 }} className="mt-6">
+              <Card className="p-6 bg-card/30 border-border/60">
+                <h3 className="font-semibold mb-4">Inference Latency per Query</h3>
+                <div className="overflow-x-auto">
+                  <table className="w-full text-sm">
+                    <thead className="text-muted-foreground">
+                      <tr className="border-b border-border/50 text-left">
+                        <th className="py-2 pr-4 font-medium">Approach</th>
+                        <th className="py-2 pr-4 font-medium text-right">Total p50 / p95 ms</th>
+                        <th className="py-2 pr-4 font-medium text-right">Retrieval p50 ms</th>
+                        <th className="py-2 pr-4 font-medium text-right">Prefill p50 ms</th>
+                        <th className="py-2 pr-4 font-medium text-right">Decode p50 ms</th>
+                        <th className="py-2 font-medium text-right">Decode tok/s p50</th>
+                      </tr>
+                    </thead>
+                    <tbody>
+                      {Object.entries(latencyMetrics.approaches).map(([approach, report]) => (
+                        <tr key={approach} className="border-b border-border/30">
+                          <td className="py-2 pr-4">
+                            {approach}
+                            <span className="block text-xs text-muted-foreground">
+                              {report.num_queries} queries, {report.backend}
+                              {report.model ? ` (${report.model})` : ""}
+                            </span>
+                          </td>
+                          <td className="py-2 pr-4 text-right">
+                            {formatMs(report.stages_seconds.total?.p50)} / {formatMs(report.stages_seconds.total?.p95)}
+                          </td>
+                          <td className="py-2 pr-4 text-right">{formatMs(report.stages_seconds.retrieve_subgraph?.p50)}</td>
+                          <td className="py-2 pr-4 text-right">{formatMs(report.stages_seconds.prefill?.p50)}</td>
+                          <td className="py-2 pr-4 text-right">{formatMs(report.stages_seconds.decode?.p50)}</td>
+                          <td className="py-2 text-right">
+                            {report.tokens.decode_tokens_per_second?.p50?.toFixed(1) ?? "–"}
+                          </td>
+                        </tr>
+                      ))}
+                    </tbody>
+                  </table>
+                </div>
+              </Card>
+            </motion.div>
+          )}
         </TabsContent>
       </Tabs>
     </div>
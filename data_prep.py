@@ -1,159 +1,224 @@
+import argparse
 import json
 import sys
 from datetime import datetime
+from pathlib import Path
 
 # Fix Windows console encoding issue
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-# ============================================================================
-# STEP 1: Load all three training metrics files
-# ============================================================================
+# Shared helpers live in utils/ (not a package)
+sys.path.insert(0, str(Path(__file__).parent / 'utils'))
+from build_assets import refresh_assets
+from metrics_store import DEFAULT_POINTS, MetricsStore
+from profiling import add_profile_args, enable_from_args, stage
+from run_registry import build_registry, run_for_notebook
 
-print("Loading training metrics files...")
+PUBLIC_DATA_DIR = Path(__file__).parent / 'public' / 'data'
 
-# Load standard (already in training_metrics.json)
-with open('public/data/training_metrics.json', 'r', encoding='utf-8') as f:
-    merged_metrics = json.load(f)
 
-# Load optimized
-with open('public/data/optimized_ft_training_metrics.json', 'r', encoding='utf-8') as f:
-    optimized_data = json.load(f)
+# Exported training metrics per approach, as written by the notebooks
+SOURCE_METRICS_FILES = ['standard_training_metrics.json', 'optimized_ft_training_metrics.json',
+                        'kg_training_metrics.json']
 
-# Load KG-based
-with open('public/data/kg_training_metrics.json', 'r', encoding='utf-8') as f:
-    kg_data = json.load(f)
-
-# ============================================================================
-# STEP 2: Merge all approaches into one file
-# ============================================================================
+# Notebook each approach was trained in (hyperparameters come from its run registry entry)
+APPROACH_NOTEBOOKS = {
+    'standard': 'Llama3.1_(8B)-finetuning.ipynb',
+    'optimized': 'Llama3.1_(8B)-finetuning-optimized.ipynb',
+    'kg_based': 'Llama3.1_(8B)-KG-QA-System.ipynb',
+}
 
-print("\nMerging training metrics...")
 
-# Update optimized approach (replace if exists, or add if not)
-merged_metrics['approaches']['optimized'] = optimized_data['approaches']['optimized']
-print(f"[OK] Updated optimized approach: {len(optimized_data['approaches']['optimized']['epochs'])} epochs")
+# Count epochs (count unique epoch numbers)
+def count_epochs(approach):
+    if 'num_epochs' in approach:  # Downsampled curves may skip epochs; the store counts them all
+        return approach['num_epochs']
+    unique_epochs = set()
+    for entry in approach['epochs']:
+        unique_epochs.add(entry.get('epoch', 0))
+    return len(unique_epochs)
 
-# Update KG-based approach (replace placeholder with real data)
-merged_metrics['approaches']['kg_based'] = kg_data['approaches']['kg_based']
-print(f"[OK] Updated KG-based approach: {len(kg_data['approaches']['kg_based']['epochs'])} epochs")
 
-# Update metadata
-merged_metrics['_metadata'] = {
-    "note": "Real training metrics from all three approaches (Standard, Optimized, KG-Based)",
-    "exported_at": datetime.now().isoformat(),
-    "standard_epochs": len(merged_metrics['approaches']['standard']['epochs']),
-    "optimized_epochs": len(merged_metrics['approaches']['optimized']['epochs']),
-    "kg_based_epochs": len(merged_metrics['approaches']['kg_based']['epochs'])
-}
+def notebook_config(registry, approach):
+    """training_samples / lora_rank / learning_rate of an approach's notebook run."""
+    notebook = APPROACH_NOTEBOOKS[approach]
+    run = run_for_notebook(registry, notebook)
+    if run is None:
+        print(f"[WARN] {notebook} not in the run registry, hyperparameters left empty")
+        return {"notebook": notebook, "training_samples": None, "lora_rank": None, "learning_rate": None}
+    return {
+        "notebook": notebook,
+        "run_id": run["run_id"],
+        "training_samples": run["dataset"].get("total_examples"),
+        "lora_rank": run["lora"].get("r"),
+        "learning_rate": run["training"].get("learning_rate"),
+    }
 
-# Save merged file
-with open('public/data/training_metrics.json', 'w', encoding='utf-8') as f:
-    json.dump(merged_metrics, f, indent=2, ensure_ascii=False)
+# ============================================================================
+# STEP 1: Ingest all three training metrics files into the metrics store
+# ============================================================================
 
-print(f"\n[OK] Saved merged training_metrics.json")
-print(f"  - Standard: {merged_metrics['approaches']['standard']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['standard']['final_metrics']['training_time_minutes']:.2f} min")
-print(f"  - Optimized: {merged_metrics['approaches']['optimized']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['optimized']['final_metrics']['training_time_minutes']:.2f} min")
-print(f"  - KG-Based: {merged_metrics['approaches']['kg_based']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['kg_based']['final_metrics']['training_time_minutes']:.2f} min")
+def ingest_metrics(store):
+    print("Ingesting training metrics files...")
+    for filename in SOURCE_METRICS_FILES:
+        path = PUBLIC_DATA_DIR / filename
+        if not path.exists():
+            print(f"[WARN] {filename} not found, skipping")
+            continue
+        run_ids = store.ingest_metrics_file(path)
+        print(f"[OK] {filename}: {', '.join(run_ids)}")
 
 # ============================================================================
-# STEP 3: Update model_comparison.json with REAL data from notebooks
+# STEP 2: Export the latest run of each approach, downsampled, into one file
 # ============================================================================
 
-print("\nUpdating model_comparison.json with real data from notebooks...")
-
-# Load existing comparison file
-with open('public/data/model_comparison.json', 'r', encoding='utf-8') as f:
-    comparison = json.load(f)
+def merge_training_metrics(store, points):
+    print("\nMerging training metrics...")
+    merged_metrics = store.export(PUBLIC_DATA_DIR / 'training_metrics.json', points=points)
+    for name, approach in merged_metrics['approaches'].items():
+        print(f"[OK] {name}: {approach['total_points']} points -> {len(approach['epochs'])} (LTTB)")
 
-# Extract real metrics
-standard_metrics = merged_metrics['approaches']['standard']['final_metrics']
-optimized_metrics = merged_metrics['approaches']['optimized']['final_metrics']
-kg_metrics = merged_metrics['approaches']['kg_based']['final_metrics']
+    print(f"\n[OK] Saved merged training_metrics.json")
+    print(f"  - Standard: {merged_metrics['approaches']['standard']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['standard']['final_metrics']['training_time_minutes']:.2f} min")
+    print(f"  - Optimized: {merged_metrics['approaches']['optimized']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['optimized']['final_metrics']['training_time_minutes']:.2f} min")
+    print(f"  - KG-Based: {merged_metrics['approaches']['kg_based']['final_metrics']['final_loss']:.4f} loss, {merged_metrics['approaches']['kg_based']['final_metrics']['training_time_minutes']:.2f} min")
+    return merged_metrics
 
-# Count epochs (count unique epoch numbers)
-def count_epochs(epochs_data):
-    unique_epochs = set()
-    for entry in epochs_data:
-        unique_epochs.add(entry.get('epoch', 0))
-    return len(unique_epochs)
+# ============================================================================
+# STEP 3: Update model_comparison.json with REAL data from notebooks
+# ============================================================================
 
-# HYPERPARAMETERS EXTRACTED FROM NOTEBOOKS:
-# Standard: r=16, lr=2e-4, epochs=3, samples=2828 (from Llama3.1_(8B)-finetuning.ipynb)
-# Optimized: r=32, lr=1e-4, epochs=5, samples=2828 (from Llama3.1_(8B)-finetuning-optimized.ipynb)
-# KG: r=32, lr=1e-4, epochs=5, samples=195 (from Llama3.1_(8B)-KG-QA-System.ipynb)
-
-# Update comparison data with REAL values from notebooks
-comparison['comparisons'] = [
-    {
-        "approach": "Standard Fine-tuning",
-        "notebook": "Llama3.1_(8B)-finetuning.ipynb",
-        "training_samples": 2828,  # From course_finetune.jsonl
-        "epochs": count_epochs(merged_metrics['approaches']['standard']['epochs']),
-        "lora_rank": 16,  # From notebook: r = 16
-        "learning_rate": 0.0002,  # From notebook: learning_rate = 2e-4
-        "final_loss": standard_metrics['final_loss'],
-        "accuracy": standard_metrics.get('accuracy', 0),
-        "training_time_min": standard_metrics['training_time_minutes'],
-        "strengths": ["Fast training", "Simple setup", "Good for basic Q&A"],
-        "weaknesses": ["Repetition issues", "No multi-hop reasoning", "Simple pattern matching"],
-        "use_cases": ["Basic course lookups", "Single-fact queries"]
-    },
-    {
-        "approach": "Optimized Fine-tuning",
-        "notebook": "Llama3.1_(8B)-finetuning-optimized.ipynb",
-        "training_samples": 2828,  # From course_finetune.jsonl (2262 train + 566 val split)
-        "epochs": count_epochs(merged_metrics['approaches']['optimized']['epochs']),
-        "lora_rank": 32,  # From notebook: r = 32
-        "learning_rate": 0.0001,  # From notebook: learning_rate = 1e-4
-        "final_loss": optimized_metrics['final_loss'],
-        "validation_loss": optimized_metrics.get('val_loss'),
-        "accuracy": optimized_metrics.get('accuracy', 0),
-        "training_time_min": optimized_metrics['training_time_minutes'],
-        "strengths": ["Better generalization", "Early stopping", "Validation tracking", "Higher capacity"],
-        "weaknesses": ["Longer training", "Still no multi-hop reasoning"],
-        "use_cases": ["Production deployment", "General Q&A", "Better accuracy needed"]
-    },
-    {
-        "approach": "KG-Based QA System",
-        "notebook": "Llama3.1_(8B)-KG-QA-System.ipynb",
-        "training_samples": 195,  # From notebook output: "Created RAG dataset with 195 examples"
-        "epochs": count_epochs(merged_metrics['approaches']['kg_based']['epochs']),
-        "lora_rank": 32,  # From notebook: r=32
-        "learning_rate": 0.0001,  # From notebook: learning_rate=1e-4
-        "final_loss": kg_metrics['final_loss'],
-        "validation_loss": kg_metrics.get('val_loss'),
-        "accuracy": kg_metrics.get('accuracy', 0),
-        "training_time_min": kg_metrics['training_time_minutes'],
-        "strengths": ["Multi-hop reasoning", "Prerequisite chain queries", "Graph-aware context", "Structured knowledge"],
-        "weaknesses": ["Requires graph construction", "More complex pipeline"],
-        "use_cases": ["Complex reasoning", "Prerequisites planning", "Cross-department queries", "Path finding"]
+def update_model_comparison(merged_metrics, registry):
+    print("\nUpdating model_comparison.json with real data from notebooks...")
+
+    # Load existing comparison file
+    with open(PUBLIC_DATA_DIR / 'model_comparison.json', 'r', encoding='utf-8') as f:
+        comparison = json.load(f)
+
+    # Extract real metrics
+    standard_metrics = merged_metrics['approaches']['standard']['final_metrics']
+    optimized_metrics = merged_metrics['approaches']['optimized']['final_metrics']
+    kg_metrics = merged_metrics['approaches']['kg_based']['final_metrics']
+
+    # Hyperparameters and dataset sizes parsed from the notebooks (utils/run_registry.py)
+    standard_config = notebook_config(registry, 'standard')
+    optimized_config = notebook_config(registry, 'optimized')
+    kg_config = notebook_config(registry, 'kg_based')
+
+    # Evaluation scores (f1_score, bleu, rouge*) come from the evaluation runs, not the
+    # notebooks; keep whatever the existing entries have and only refresh the training fields
+    previous = {c['approach']: c for c in comparison.get('comparisons', [])}
+
+    # Sample counts are None when a notebook is missing from the run registry
+    other_samples = [c["training_samples"] for c in (standard_config, optimized_config)
+                     if c["training_samples"] is not None]
+    kg_data_weakness = "Less training data"
+    if kg_config["training_samples"] is not None and other_samples:
+        kg_data_weakness += f" ({kg_config['training_samples']} vs {min(other_samples)}+ samples)"
+
+    # Update comparison data with REAL values from notebooks
+    comparison['comparisons'] = [
+        {
+            "approach": "Standard Fine-tuning",
+            "notebook": standard_config["notebook"],
+            "run_id": standard_config.get("run_id"),
+            "training_samples": standard_config["training_samples"],  # Train + validation examples
+            "epochs": count_epochs(merged_metrics['approaches']['standard']),
+            "lora_rank": standard_config["lora_rank"],
+            "learning_rate": standard_config["learning_rate"],
+            "final_loss": standard_metrics['final_loss'],
+            "accuracy": standard_metrics.get('accuracy', 0),
+            "training_time_min": standard_metrics['training_time_minutes'],
+            "strengths": ["Fast training", "Simple setup", "Good for basic Q&A"],
+            "weaknesses": ["Repetition issues", "No multi-hop reasoning", "Simple pattern matching"],
+            "use_cases": ["Basic course lookups", "Single-fact queries"]
+        },
+        {
+            "approach": "Optimized Fine-tuning",
+            "notebook": optimized_config["notebook"],
+            "run_id": optimized_config.get("run_id"),
+            "training_samples": optimized_config["training_samples"],  # Train + validation examples
+            "epochs": count_epochs(merged_metrics['approaches']['optimized']),
+            "lora_rank": optimized_config["lora_rank"],
+            "learning_rate": optimized_config["learning_rate"],
+            "final_loss": optimized_metrics['final_loss'],
+            "validation_loss": optimized_metrics.get('val_loss'),
+            "accuracy": optimized_metrics.get('accuracy', 0),
+            "training_time_min": optimized_metrics['training_time_minutes'],
+            "strengths": ["Better generalization", "Early stopping", "Validation tracking", "Higher capacity"],
+            "weaknesses": ["Longer training", "Still no multi-hop reasoning"],
+            "use_cases": ["Production deployment", "General Q&A", "Better accuracy needed"]
+        },
+        {
+            "approach": "KG-Based QA System",
+            "notebook": kg_config["notebook"],
+            "run_id": kg_config.get("run_id"),
+            "training_samples": kg_config["training_samples"],  # Train + validation examples
+            "epochs": count_epochs(merged_metrics['approaches']['kg_based']),
+            "lora_rank": kg_config["lora_rank"],
+            "learning_rate": kg_config["learning_rate"],
+            "final_loss": kg_metrics['final_loss'],
+            "validation_loss": kg_metrics.get('val_loss'),
+            "accuracy": kg_metrics.get('accuracy', 0),
+            "training_time_min": kg_metrics['training_time_minutes'],
+            "strengths": ["Multi-hop reasoning", "Prerequisite chain queries", "Graph-aware context", "Structured knowledge"],
+            "weaknesses": ["Requires graph construction", "More complex pipeline", kg_data_weakness],
+            "use_cases": ["Complex reasoning", "Prerequisites planning", "Cross-department queries", "Path finding"]
+        }
+    ]
+
+    comparison['comparisons'] = [{**previous.get(c['approach'], {}), **c} for c in comparison['comparisons']]
+
+    comparison['_metadata'] = {
+        "note": "Real comparison data extracted from training metrics and notebook configurations",
+        **comparison.get('_metadata', {}),
+        "exported_at": datetime.now().isoformat(),
+        "source": "Notebooks: Llama3.1_(8B)-finetuning.ipynb, Llama3.1_(8B)-finetuning-optimized.ipynb, Llama3.1_(8B)-KG-QA-System.ipynb"
     }
-]
-
-comparison['_metadata'] = {
-    "note": "Real comparison data extracted from training metrics and notebook configurations",
-    "exported_at": datetime.now().isoformat(),
-    "source": "Notebooks: Llama3.1_(8B)-finetuning.ipynb, Llama3.1_(8B)-finetuning-optimized.ipynb, Llama3.1_(8B)-KG-QA-System.ipynb"
-}
 
-# Save updated comparison
-with open('public/data/model_comparison.json', 'w', encoding='utf-8') as f:
-    json.dump(comparison, f, indent=2, ensure_ascii=False)
-
-print("[OK] Updated model_comparison.json with real metrics")
-print("\nSummary:")
-for comp in comparison['comparisons']:
-    print(f"  - {comp['approach']}:")
-    print(f"    Loss={comp['final_loss']:.4f}, Time={comp['training_time_min']:.2f}min")
-    print(f"    Epochs={comp['epochs']}, LoRA r={comp['lora_rank']}, LR={comp['learning_rate']}")
-    print(f"    Samples={comp['training_samples']}")
-
-print("\n" + "="*60)
-print("[OK] All data merged and updated with REAL values from notebooks!")
-print("="*60)
-print("\nFiles updated:")
-print("  [OK] public/data/training_metrics.json (merged all 3 approaches)")
-print("  [OK] public/data/model_comparison.json (updated with real hyperparameters)")
-print("\nThe frontend should now display all accurate training data!")
\ No newline at end of file
+    # Save updated comparison
+    with open(PUBLIC_DATA_DIR / 'model_comparison.json', 'w', encoding='utf-8') as f:
+        json.dump(comparison, f, indent=2, ensure_ascii=False)
+
+    print("[OK] Updated model_comparison.json with real metrics")
+    print("\nSummary:")
+    for comp in comparison['comparisons']:
+        print(f"  - {comp['approach']}:")
+        print(f"    Loss={comp['final_loss']:.4f}, Time={comp['training_time_min']:.2f}min")
+        print(f"    Epochs={comp['epochs']}, LoRA r={comp['lora_rank']}, LR={comp['learning_rate']}")
+        print(f"    Samples={comp['training_samples']}")
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge notebook training metrics into the frontend JSON files.")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS,
+                        help="Max points per training curve in training_metrics.json")
+    add_profile_args(parser)
+    args = parser.parse_args()
+    enable_from_args(args, "data_prep")
+
+    store = MetricsStore()
+    with stage("run_registry"):
+        registry = build_registry()
+    with stage("ingest_metrics"):
+        ingest_metrics(store)
+    with stage("merge_training_metrics"):
+        merged_metrics = merge_training_metrics(store, args.points)
+    with stage("update_model_comparison"):
+        update_model_comparison(merged_metrics, registry)
+    with stage("build_assets"):
+        refresh_assets(PUBLIC_DATA_DIR)
+
+    print("\n" + "="*60)
+    print("[OK] All data merged and updated with REAL values from notebooks!")
+    print("="*60)
+    print("\nFiles updated:")
+    print("  [OK] public/data/training_metrics.json (merged all 3 approaches, downsampled)")
+    print("  [OK] public/data/model_comparison.json (updated with real hyperparameters)")
+    print("\nThe frontend should now display all accurate training data!")
+
+if __name__ == "__main__":
+    main()
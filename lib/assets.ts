@@ -0,0 +1,36 @@
+// Resolves logical data file names (e.g. "knowledge_graph.json") to the
+// fingerprinted, immutable-cached copies listed in /data/asset_manifest.json
+// (written by utils/build_assets.py). Falls back to /data/<name> when the
+// manifest is missing or doesn't list the file, or when the hashed copy it
+// points at can't be fetched (e.g. removed by a concurrent rebuild).
+
+type AssetManifest = { assets: Record<string, { path: string }> }
+
+let manifestPromise: Promise<AssetManifest | null> | null = null
+
+function loadManifest(): Promise<AssetManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetch("/data/asset_manifest.json", { cache: "no-cache" })
+      .then((r) => (r.ok ? r.json() : null))
+      .catch(() => null)
+  }
+  return manifestPromise
+}
+
+export async function assetUrl(name: string): Promise<string> {
+  const manifest = await loadManifest()
+  return manifest?.assets?.[name]?.path ?? `/data/${name}`
+}
+
+export async function fetchAsset(name: string, init?: RequestInit): Promise<Response> {
+  const fallback = `/data/${name}`
+  const url = await assetUrl(name)
+  if (url === fallback) return fetch(fallback, init)
+  try {
+    const response = await fetch(url, init)
+    if (response.ok) return response
+  } catch {
+    // fall through to the plain URL
+  }
+  return fetch(fallback, init)
+}
@@ -12,6 +12,15 @@ const nextConfig = {
       root: process.cwd(),
     },
   },
+  // Fingerprinted data assets (utils/build_assets.py) never change content
+  async headers() {
+    return [
+      {
+        source: '/data/assets/:path*',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+    ]
+  },
   // Ignore CSV files during build
   webpack: (config, { isServer }) => {
     config.module.rules.push({
@@ -0,0 +1,7 @@
+"""Make the flat utils/ modules importable the way the scripts import each other."""
+
+import sys
+from pathlib import Path
+
+UTILS_DIR = Path(__file__).parent.parent / 'utils'
+sys.path.insert(0, str(UTILS_DIR))
@@ -0,0 +1,78 @@
+import pytest
+
+from answer_cache import AnswerCache, anchors, cosine, ngram_vector, normalize_query
+
+
+def similarity(a: str, b: str) -> float:
+    return cosine(ngram_vector(normalize_query(a)), ngram_vector(normalize_query(b)))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    snapshot = tmp_path / "schedule.csv"
+    snapshot.write_text("crn,course_code\n10001,CSCI 6212\n")
+    return AnswerCache(threshold=0.8, snapshot_path=snapshot, snapshot_check_seconds=0)
+
+
+def test_paraphrase_is_a_near_hit(cache):
+    cache.put("Who teaches CSCI 6212?", "Dr. Smith", context="ctx")
+    assert similarity("Who teaches CSCI 6212?", "CSCI 6212 instructor?") >= 0.8
+    answer, score = cache.get("CSCI 6212 instructor?", context="ctx")
+    assert answer == "Dr. Smith" and 0.8 <= score < 1.0
+    # Contractions, glued codes and synonyms normalize to the stored query: an exact hit
+    assert cache.get("who's teaching csci-6212", context="ctx") == ("Dr. Smith", 1.0)
+    assert cache.stats["near_hits"] == 1 and cache.stats["hits"] == 1
+
+
+def test_threshold_boundary(tmp_path):
+    query, paraphrase = "Who teaches CSCI 6212?", "CSCI 6212 instructor?"
+    score = similarity(query, paraphrase)
+    for threshold, expected in ((score, "Dr. Smith"), (score + 1e-6, None)):
+        cache = AnswerCache(threshold=threshold, snapshot_path=tmp_path / "missing.csv")
+        cache.put(query, "Dr. Smith")
+        assert cache.get(paraphrase)[0] == expected
+
+
+def test_different_intent_misses_despite_high_similarity(cache):
+    # Similar enough to pass the threshold, but the intent word differs
+    assert similarity("When is CSCI 6212 offered?", "Where does CSCI 6212 meet?") >= 0.8
+    assert anchors(normalize_query("When is CSCI 6212 offered?"))[0] == "when"
+    cache.put("When is CSCI 6212 offered?", "TR 12:45PM")
+    assert cache.get("Where does CSCI 6212 meet?")[0] is None
+    assert cache.get("Does CSCI 6212 require CSCI 6221?")[0] is None
+
+
+def test_course_numbers_and_their_order_must_match(cache):
+    cache.put("Does CSCI 6212 require CSCI 6221?", "No")
+    assert cache.get("Does CSCI 6212 require CSCI 6222?")[0] is None
+    assert cache.get("Does CSCI 6221 require CSCI 6212?")[0] is None
+    assert cache.get("Does CSCI 6212 need CSCI 6221?")[0] == "No"
+
+
+def test_context_and_history_partition_the_cache(cache):
+    history = [["user", "I took CSCI 6212"], ["assistant", "Noted."]]
+    cache.put("Who teaches CSCI 6221?", "Dr. Jones", context="ctx", history=history)
+    assert cache.get("Who teaches CSCI 6221?", context="other")[0] is None
+    assert cache.get("Who teaches CSCI 6221?", context="ctx")[0] is None
+    assert cache.get("Who teaches CSCI 6221?", context="ctx", history=history) == ("Dr. Jones", 1.0)
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = AnswerCache(max_entries=2, ttl_seconds=0, snapshot_path=tmp_path / "missing.csv")
+    cache.put("Who teaches CSCI 6212?", "Dr. Smith")
+    assert cache.get("Who teaches CSCI 6212?")[0] is None
+    assert cache.stats["expired"] == 1
+
+    cache = AnswerCache(max_entries=2, snapshot_path=tmp_path / "missing.csv")
+    for code in ("6212", "6221", "6364"):
+        cache.put(f"Who teaches CSCI {code}?", code)
+    assert len(cache) == 2 and cache.stats["evictions"] == 1
+    assert cache.get("Who teaches CSCI 6212?")[0] is None
+    assert cache.get("Who teaches CSCI 6364?")[0] == "6364"
+
+
+def test_snapshot_change_clears_cache(cache):
+    cache.put("Who teaches CSCI 6212?", "Dr. Smith")
+    cache.snapshot_path.write_text("crn,course_code\n10001,CSCI 6212\n10002,CSCI 6221\n")
+    assert cache.check_snapshot(force=True)
+    assert len(cache) == 0 and cache.stats["invalidations"] == 1
@@ -0,0 +1,92 @@
+import csv
+import os
+
+import pytest
+
+from course_catalog import BULLETIN_FIELDS, SCHEDULE_FIELDS, Catalog, load_catalog, normalize_code
+
+
+def write_csv(path, fields, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def section(crn, code, instructor="", **extra):
+    return {**dict.fromkeys(SCHEDULE_FIELDS, ""), "subject": "CSCI", "crn": crn, "course_code": code,
+            "instructor": instructor, "day_time": "TR 12:45PM - 02:00PM", **extra}
+
+
+@pytest.fixture
+def csvs(tmp_path):
+    schedule, bulletin = tmp_path / "schedule.csv", tmp_path / "bulletin.csv"
+    write_csv(schedule, SCHEDULE_FIELDS, [
+        section("10001", "CSCI CSCI 6212", "Smith"),
+        section("10002", "CSCI 6221 Details", "Jones"),
+        section("10002", "CSCI 6221 Details", "Jones"),  # scraped twice
+        section("10003", "CSCI 6212", ""),
+        {**section("20001", "MATH 2184", "Smith"), "subject": "MATH"},
+    ])
+    course = dict.fromkeys(BULLETIN_FIELDS, "")
+    write_csv(bulletin, BULLETIN_FIELDS, [
+        {**course, "subject": "CSCI", "course_code": "CSCI 6212", "title": "Algorithms", "description": "Old text"},
+        {**course, "subject": "CSCI", "course_code": "CSCI 6212", "title": "Algorithms", "description": "Graphs."},
+        {**course, "subject": "CSCI", "course_code": "CSCI 6221", "title": "Software Paradigms",
+         "description": "Languages ünïcode."},
+    ])
+    return schedule, bulletin
+
+
+def test_normalize_code():
+    assert normalize_code("CSCI CSCI 1012") == "CSCI 1012"
+    assert normalize_code(" CSCI 1012 Details") == "CSCI 1012"
+
+
+def test_indexes(csvs):
+    catalog = Catalog.from_csv(*csvs)
+    assert len(catalog.sections) == 5 and len(catalog.by_crn) == 4
+    assert [s.crn for s in catalog.by_code["CSCI 6212"]] == ["10001", "10003"]
+    assert [s.crn for s in catalog.by_instructor["Smith"]] == ["10001", "20001"]
+    assert "" not in catalog.by_instructor
+    assert catalog.subjects == ["CSCI", "MATH"]
+    # The last bulletin row per code wins, as with a dict built from the CSV
+    assert catalog.description("CSCI 6212 Details") == "Graphs."
+    assert catalog.description("CSCI 9999") == ""
+    # Pooled: equal values share one string object
+    assert catalog.sections[0].day_time is catalog.sections[4].day_time
+
+
+def test_binary_round_trip(csvs, tmp_path):
+    catalog = Catalog.from_csv(*csvs)
+    path = tmp_path / "catalog.bin"
+    catalog.save(path, source_key="key")
+    loaded = Catalog.load(path, source_key="key")
+    assert loaded.sections == catalog.sections
+    assert loaded.bulletin == catalog.bulletin  # duplicate bulletin rows survive
+    assert len(loaded.bulletin_rows()) == 3
+    assert loaded.schedule_rows(exclude_subjects=["MATH"]) == catalog.schedule_rows(exclude_subjects=["MATH"])
+    assert loaded.courses == catalog.courses and loaded.by_crn == catalog.by_crn
+    assert loaded.description("CSCI 6221") == "Languages ünïcode."
+
+    assert Catalog.load(path, source_key="other") is None
+    assert Catalog.load(tmp_path / "missing.bin") is None
+    path.write_bytes(b"\x00garbage")
+    assert Catalog.load(path) is None
+
+
+def test_load_catalog_rebuilds_when_a_csv_changes(csvs, tmp_path):
+    schedule, bulletin = csvs
+    cache = tmp_path / "catalog.bin"
+    assert len(load_catalog(schedule, bulletin, cache).by_crn) == 4
+    assert cache.exists()
+    mtime = cache.stat().st_mtime_ns
+    assert len(load_catalog(schedule, bulletin, cache).by_crn) == 4
+    assert cache.stat().st_mtime_ns == mtime  # served from the cache
+
+    with open(schedule, "a", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=SCHEDULE_FIELDS).writerow(section("10004", "CSCI 6364"))
+    stat = schedule.stat()
+    os.utime(schedule, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert "10004" in load_catalog(schedule, bulletin, cache).by_crn
+    assert "10004" in Catalog.load(cache).by_crn
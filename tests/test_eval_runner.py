@@ -0,0 +1,34 @@
+from eval_runner import plan_batches
+
+
+def padded_tokens(batch: list, lengths: list, max_new_tokens: int = 0) -> int:
+    return len(batch) * (max(lengths[i] for i in batch) + max_new_tokens)
+
+
+def test_every_index_planned_once():
+    lengths = [5, 300, 42, 42, 7, 1000, 64, 3]
+    batches = plan_batches(lengths, max_batch_tokens=600, max_batch_size=3)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+
+def test_batches_are_length_sorted_and_within_budget():
+    lengths = [10, 80, 20, 70, 30, 60, 40, 50]
+    batches = plan_batches(lengths, max_batch_tokens=200, max_new_tokens=10)
+    flat = [lengths[i] for batch in batches for i in batch]
+    assert flat == sorted(lengths, reverse=True)
+    for batch in batches:
+        assert padded_tokens(batch, lengths, 10) <= 200
+
+
+def test_oversized_prompt_gets_its_own_batch():
+    lengths = [5000, 10, 10]
+    assert plan_batches(lengths, max_batch_tokens=100) == [[0], [1, 2]]
+
+
+def test_max_batch_size():
+    batches = plan_batches([1] * 10, max_batch_tokens=10 ** 6, max_batch_size=4)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_empty():
+    assert plan_batches([]) == []
@@ -0,0 +1,55 @@
+import json
+from collections import Counter
+
+import pytest
+
+from eval_set import EvalSet, index_path_for
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "eval.jsonl"
+    query_types = ["simple"] * 70 + ["multi_hop"] * 25 + ["rare"] * 5
+    with open(path, "w", encoding="utf-8") as f:
+        for i, query_type in enumerate(query_types):
+            f.write(json.dumps({"id": i, "query_type": query_type}) + "\n")
+        f.write("not json\n")
+        f.write(json.dumps({"id": 100}) + "\n")
+    return path
+
+
+def test_index_and_random_access(jsonl):
+    eval_set = EvalSet(jsonl)
+    assert len(eval_set) == 101  # the malformed line is skipped
+    assert eval_set[42]["id"] == 42
+    assert eval_set[100] == {"id": 100}
+    assert eval_set.stratum_counts() == {"default": 1, "multi_hop": 25, "rare": 5, "simple": 70}
+    assert index_path_for(jsonl).exists()
+    # A second instance reuses the saved index
+    assert EvalSet(jsonl).offsets.tolist() == eval_set.offsets.tolist()
+
+
+def test_stratified_sample_counts(jsonl):
+    eval_set = EvalSet(jsonl)
+    indices = eval_set.sample_indices(20, seed=3)
+    assert len(indices) == 20 and indices == sorted(set(indices))
+    counts = Counter(str(eval_set.strata[i]) for i in indices)
+    # 20 * (70, 25, 5, 1) / 101 with largest-remainder rounding
+    assert counts == {"simple": 14, "multi_hop": 5, "rare": 1}
+    assert eval_set.sample_indices(20, seed=3) == indices
+    assert [r["id"] for r in eval_set.sample(20, seed=3)] == indices
+
+
+def test_sample_everything_or_unstratified(jsonl):
+    eval_set = EvalSet(jsonl)
+    assert eval_set.sample_indices(None) == list(range(101))
+    assert eval_set.sample_indices(500) == list(range(101))
+    assert len(eval_set.sample_indices(10, stratify=False)) == 10
+
+
+def test_index_rebuilt_when_file_changes(jsonl):
+    assert len(EvalSet(jsonl)) == 101
+    with open(jsonl, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": 101, "query_type": "rare"}) + "\n")
+    eval_set = EvalSet(jsonl)
+    assert len(eval_set) == 102 and eval_set[101]["id"] == 101
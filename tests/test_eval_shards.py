@@ -0,0 +1,60 @@
+import argparse
+
+import pytest
+
+from eval_shards import (add_run_arguments, append_checkpoint, read_checkpoint, run_config, run_shard, shard_path,
+                         write_manifest)
+
+
+def config_for(*argv) -> dict:
+    parser = argparse.ArgumentParser()
+    add_run_arguments(parser)
+    return run_config(parser.parse_args(list(argv)))
+
+
+def test_partial_line_is_dropped_and_truncated(tmp_path):
+    path = tmp_path / "shard.jsonl"
+    append_checkpoint(path, [{"index": 0, "prediction": "a"}, {"index": 3, "prediction": "b"}])
+    complete = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"index": 6, "predic')  # crash mid-write
+
+    done = read_checkpoint(path)
+    assert sorted(done) == [0, 3]
+    assert path.stat().st_size == complete
+    # The next append starts on a clean line
+    append_checkpoint(path, [{"index": 6, "prediction": "c"}])
+    assert sorted(read_checkpoint(path)) == [0, 3, 6]
+
+
+def test_missing_checkpoint_is_empty(tmp_path):
+    assert read_checkpoint(tmp_path / "none.jsonl") == {}
+
+
+def test_manifest_refuses_different_settings(tmp_path):
+    config = config_for("--dataset", "kg", "--backend", "stub", "--num-shards", "2")
+    assert config["generation_kwargs"] == {"repetition_penalty": 1.2}
+    write_manifest(tmp_path, config)
+    write_manifest(tmp_path, dict(config))  # same run: resumable
+    with pytest.raises(ValueError, match="num_shards"):
+        write_manifest(tmp_path, {**config, "num_shards": 3})
+    with pytest.raises(ValueError, match="generation_kwargs"):
+        write_manifest(tmp_path, {**config, "generation_kwargs": {}})
+
+
+def test_run_shard_resumes_after_a_crash(tmp_path):
+    config = config_for("--dataset", "kg", "--backend", "stub", "--num-shards", "2", "--max-samples", "8")
+    write_manifest(tmp_path, config)
+    first = run_shard(config, str(tmp_path), 0, chunk_size=2, use_cache=False)
+    assert first == {"shard": 0, "total": 4, "resumed": 0, "generated": 4}
+
+    path = shard_path(tmp_path, 0, 2)
+    lines = path.read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[:2]) + lines[2][:10])  # lose the last chunk mid-line
+    resumed = run_shard(config, str(tmp_path), 0, chunk_size=2, use_cache=False)
+    assert resumed == {"shard": 0, "total": 4, "resumed": 2, "generated": 2}
+
+    items = read_checkpoint(path)
+    assert sorted(items) == [0, 2, 4, 6]
+    assert all(isinstance(item["prediction"], str) for item in items.values())
+    assert run_shard(config, str(tmp_path), 0, use_cache=False)["generated"] == 0
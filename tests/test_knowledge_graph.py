@@ -0,0 +1,49 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from knowledge_graph import PageRankIndex
+
+
+@pytest.fixture
+def graph():
+    g = nx.DiGraph()
+    g.add_edge("course:CSCI 6212", "course:CSCI 6221", weight=2.0)
+    g.add_edge("course:CSCI 6221", "topic:algorithms", weight=1.0)
+    g.add_edge("instructor:Smith", "course:CSCI 6212", weight=1.0)
+    g.add_edge("course:CSCI 6364", "topic:algorithms", weight=0.5)
+    g.add_node("course:CSCI 6999")  # isolated, so dangling
+    return g
+
+
+def test_matches_networkx_personalized_pagerank(graph):
+    index = PageRankIndex(graph)
+    seed_sets = [["course:CSCI 6212"], ["topic:algorithms", "instructor:Smith"], ["course:CSCI 6999"]]
+    scores = index.personalized_pagerank(index.seed_matrix(seed_sets), alpha=0.85, tol=1e-12, max_iter=1000)
+
+    undirected = graph.to_undirected()
+    for row, seeds in zip(scores, seed_sets):
+        personalization = {node: 1.0 if node in seeds else 0.0 for node in graph}
+        expected = nx.pagerank(undirected, alpha=0.85, personalization=personalization,
+                               dangling=personalization, tol=1e-12, max_iter=1000)
+        np.testing.assert_allclose(row, [expected[node] for node in index.nodes], atol=1e-8)
+        assert row.sum() == pytest.approx(1.0)
+
+
+def test_seed_matrix_ignores_unknown_nodes(graph):
+    index = PageRankIndex(graph)
+    seeds = index.seed_matrix([["course:CSCI 6212", "course:NOPE 0000"], []])
+    assert seeds[0].sum() == pytest.approx(1.0)
+    assert seeds[0, index.node_index["course:CSCI 6212"]] == pytest.approx(1.0)
+    assert not seeds[1].any()
+
+
+def test_top_k_nodes(graph):
+    index = PageRankIndex(graph)
+    scores = index.personalized_pagerank(index.seed_matrix([["course:CSCI 6212"]]))
+    top = index.top_k_nodes(scores, 2)[0]
+    assert top[0] == "course:CSCI 6212"
+    assert top[1] == "course:CSCI 6221"
+    # Unreachable nodes score 0 and are never returned
+    assert "course:CSCI 6999" not in index.top_k_nodes(scores, 10)[0]
+    assert index.top_k_nodes(scores, 0) == [[]]
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+
+from knowledge_graph import GraphRetriever
+from lexical_index import LexicalIndex, tokenize
+
+CODES = ["CSCI 6212", "CSCI 6364", "CSCI 6221", "MATH 2184"]
+DOCUMENTS = [
+    "Design and Analysis of Algorithms. Algorithms for sorting, graph algorithms, dynamic programming.",
+    "Machine Learning. Supervised learning, neural networks and learning theory.",
+    "Advanced Software Paradigms. Object-oriented and functional programming languages.",
+    "Linear Algebra. Matrices, vector spaces and eigenvalues.",
+]
+
+
+@pytest.fixture
+def index():
+    return LexicalIndex.build(CODES, DOCUMENTS)
+
+
+def test_tokenize_drops_question_words_and_plurals():
+    assert tokenize("Which courses teach Neural Networks?") == ["neural", "network"]
+
+
+@pytest.mark.parametrize("method", ["bm25", "tfidf"])
+def test_ranking(index, method):
+    results = index.search("Which class covers graph algorithms?", top_k=5, method=method)
+    assert results[0][0] == "CSCI 6212"
+    assert [code for code, _ in results] == ["CSCI 6212"]  # zero scores are dropped
+    ranked = index.search("programming with neural networks", top_k=5, method=method)
+    assert {code for code, _ in ranked} == {"CSCI 6212", "CSCI 6221", "CSCI 6364"}
+    assert all(a[1] >= b[1] for a, b in zip(ranked, ranked[1:]))
+    assert len(index.search("programming with neural networks", top_k=1, method=method)) == 1
+
+
+def test_unknown_or_stopword_query_is_empty(index):
+    assert index.search("what does it cover?") == []
+    assert index.search("quantum chromodynamics") == []
+
+
+def test_save_load_round_trip(index, tmp_path):
+    path = tmp_path / "lexical.npz"
+    index.save(path)
+    loaded = LexicalIndex.load(path)
+    for method in ("bm25", "tfidf"):
+        assert loaded.search("learning algorithms", method=method) == index.search("learning algorithms", method=method)
+
+
+def test_retriever_falls_back_to_lexical_seeds(index):
+    kg = SimpleNamespace(course_nodes={"CSCI 6212": "course_0", "CSCI 6364": "course_1"},
+                         professor_nodes={}, topic_nodes={})
+    retriever = GraphRetriever(kg, lexical_index=index)
+    # No entity matches: the best lexical hits present in the graph seed the search
+    assert retriever.seed_nodes("courses about neural networks", []) == ["course_1"]
+    # MATH 2184 ranks first but isn't in the graph, so it is skipped
+    assert retriever.seed_nodes("matrices and eigenvalues of graphs", [], lexical_top_k=1) == ["course_0"]
+    # Matched entities win over the lexical fallback
+    assert retriever.seed_nodes("neural networks", ["CSCI 6212"]) == ["course_0"]
+    assert GraphRetriever(kg).seed_nodes("neural networks", []) == []
@@ -0,0 +1,66 @@
+import pytest
+
+from course_catalog import SCHEDULE_FIELDS, Section
+from meeting_times import MeetingIndex, parse_clock, parse_meeting_times, window_mask
+
+
+def section(crn: str, course_code: str, day_time: str) -> Section:
+    row = dict.fromkeys(SCHEDULE_FIELDS, "")
+    row.update(crn=crn, course_code=course_code, subject=course_code.split()[0], day_time=day_time,
+               status="OPEN")
+    return Section(**row)
+
+
+def test_parse_single_and_multiple_meetings():
+    assert parse_meeting_times("M 03:45PM - 05:00PM") == ((0, 945, 1020),)
+    assert parse_meeting_times("TR 12:45PM - 02:00PM AND TR 02:30PM - 03:20PM") == (
+        (1, 765, 840), (1, 870, 920), (3, 765, 840), (3, 870, 920))
+
+
+def test_parse_noon_midnight_and_missing():
+    assert parse_meeting_times("F 12:00PM - 12:50PM") == ((4, 720, 770),)
+    assert parse_meeting_times("S 12:00AM - 01:00AM") == ((5, 0, 60),)
+    assert parse_meeting_times("TBA") == ()
+    assert parse_meeting_times("") == ()
+
+
+def test_parse_clock():
+    assert parse_clock("5pm") == 17 * 60
+    assert parse_clock("5:30 PM") == 17 * 60 + 30
+    assert parse_clock("17:00") == 17 * 60
+    with pytest.raises(ValueError):
+        parse_clock("noon")
+
+
+def test_window_mask_rejects_unknown_days():
+    with pytest.raises(ValueError):
+        window_mask("X")
+
+
+@pytest.fixture
+def index():
+    return MeetingIndex([
+        section("10001", "CSCI 6212", "TR 12:45PM - 02:00PM"),
+        section("10002", "DATS 6101", "T 01:30PM - 04:00PM"),
+        section("10003", "CSCI 6221", "T 02:00PM - 03:00PM"),  # starts as 10001 ends
+        section("10004", "CSCI 6364", "W 06:10PM - 08:40PM"),
+        section("10005", "CSCI 6999", "TBA"),
+    ])
+
+
+def test_conflicts(index):
+    assert index.conflicts(["10001", "10002", "10003", "10004", "10005"]) == [
+        ("10001", "10002"), ("10002", "10003")]
+    assert index.conflicts(["10001", "10003"]) == []
+    assert index.conflicts(["10001"]) == []
+
+
+def test_overlap_reports_meetings(index):
+    assert index.overlap("10001", "10002") == [((1, 765, 840), (1, 810, 960))]
+
+
+def test_available_and_compatible(index):
+    evening = [s.crn for s in index.available("W", after=parse_clock("5pm"))]
+    assert evening == ["10004"]
+    assert [s.crn for s in index.available("T", only_days=True)] == ["10002", "10003"]
+    assert [s.crn for s in index.compatible_with(["10001"])] == ["10003", "10004"]
@@ -0,0 +1,36 @@
+import numpy as np
+
+from metrics_store import lttb
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50.0)
+    keep = lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_returns_everything_when_not_downsampling():
+    x = np.arange(10, dtype=np.float64)
+    np.testing.assert_array_equal(lttb(x, x, 10), np.arange(10))
+    np.testing.assert_array_equal(lttb(x, x, 50), np.arange(10))
+    np.testing.assert_array_equal(lttb(x, x, 2), np.arange(10))
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[[123, 321]] = [5.0, -5.0]
+    keep = lttb(x, y, 20)
+    assert 123 in keep and 321 in keep
+
+
+def test_lttb_one_point_per_bucket():
+    x = np.arange(102, dtype=np.float64)
+    y = np.random.default_rng(0).normal(size=102)
+    keep = lttb(x, y, 12)
+    # 100 interior points in 10 buckets of 10
+    buckets = (keep[1:-1] - 1) // 10
+    np.testing.assert_array_equal(buckets, np.arange(10))
@@ -0,0 +1,53 @@
+import networkx as nx
+import pytest
+
+from path_queries import PathQueryEngine, synthetic_curriculum
+
+
+@pytest.fixture
+def engine():
+    g = nx.DiGraph()
+    for u, v in [("A", "B"), ("B", "D"), ("A", "C"), ("C", "D"), ("A", "D"), ("D", "E"), ("C", "E")]:
+        g.add_edge(u, v, edge_type="prerequisite")
+    g.add_edge("A", "T", edge_type="covers_topic")
+    g.add_edge("T", "E", edge_type="covers_topic")
+    return PathQueryEngine(g)
+
+
+def test_paths_are_shortest_first_and_within_max_length(engine):
+    paths = engine.find_paths("A", "E", max_length=3, max_paths=100)
+    assert [len(p) - 1 for p in paths] == sorted(len(p) - 1 for p in paths)
+    assert all(len(p) - 1 <= 3 for p in paths)
+    expected = {tuple(p) for p in nx.all_simple_paths(engine.graph, "A", "E", cutoff=3)}
+    assert {tuple(p) for p in paths} == expected
+
+    assert all(len(p) - 1 <= 2 for p in engine.find_paths("A", "E", max_length=2, max_paths=100))
+    assert engine.find_paths("A", "E", max_length=1) == []
+
+
+def test_max_paths_caps_the_result(engine):
+    assert len(engine.find_paths("A", "E", max_length=10, max_paths=2)) == 2
+    assert engine.find_paths("A", "E", max_paths=0) == []
+
+
+def test_edge_types_and_direction(engine):
+    assert engine.find_paths("A", "E", edge_types=["covers_topic"]) == [["A", "T", "E"]]
+    assert engine.find_paths("E", "A") == []
+    assert engine.find_paths("E", "A", edge_types=["covers_topic"], undirected=True) == [["E", "T", "A"]]
+    assert engine.shortest_path("A", "E", edge_types=["prerequisite"]) in (["A", "D", "E"], ["A", "C", "E"])
+
+
+def test_missing_and_identical_nodes(engine):
+    assert engine.find_paths("A", "nope") == []
+    assert engine.find_paths("A", "A") == [["A"]]
+    assert engine.shortest_path("nope", "A") == []
+
+
+def test_bounds_hold_on_a_dense_curriculum():
+    graph = synthetic_curriculum(200, prereqs_per_course=16, levels=6, seed=1)
+    engine = PathQueryEngine(graph)
+    source, target = "course_L5_0", "course_L0_0"
+    paths = engine.find_paths(source, target, edge_types=["prerequisite"], max_length=4, max_paths=25)
+    assert 0 < len(paths) <= 25
+    assert all(len(p) - 1 <= 4 and p[0] == source and p[-1] == target for p in paths)
+    assert all(len(set(p)) == len(p) for p in paths)  # simple paths
@@ -0,0 +1,86 @@
+import pytest
+
+import pipeline
+from pipeline import Stage, affected_stages, dependencies
+
+# Copies its input upper-cased, logs each run, and records whether the
+# pipeline told it to defer asset refreshes
+SCRIPT = """
+import os, sys
+src, dst = sys.argv[1:3]
+with open(src) as f:
+    text = f.read()
+with open(dst, "w") as f:
+    f.write(text.upper())
+with open("runs.log", "a") as f:
+    f.write(f"{dst} {os.environ.get('DEFER_ASSET_REFRESH')}\\n")
+"""
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(pipeline, "STATE_PATH", tmp_path / "state.json")
+    (tmp_path / "copy.py").write_text(SCRIPT)
+    (tmp_path / "raw.txt").write_text("cs 6212\n")
+    stages = [Stage("first", "copy.py", ["raw.txt"], ["mid.txt"], args=["raw.txt", "mid.txt"]),
+              Stage("second", "copy.py", ["mid.txt"], ["out.txt"], args=["mid.txt", "out.txt"])]
+    # run_pipeline resolves dependencies over the module's STAGES
+    monkeypatch.setattr(pipeline, "dependencies", lambda selected=stages: dependencies(selected))
+    return stages
+
+
+def runs(tmp_path) -> list:
+    log = tmp_path / "runs.log"
+    lines = log.read_text().splitlines() if log.exists() else []
+    log.unlink(missing_ok=True)
+    return lines
+
+
+def statuses(results: list) -> dict:
+    return {result["stage"]: result["status"] for result in results}
+
+
+def test_dependencies_follow_inputs_and_outputs(stages, tmp_path):
+    assert dependencies(stages) == {"first": [], "second": ["first"]}
+    assert [s.name for s in affected_stages({tmp_path / "raw.txt"}, stages)] == ["first", "second"]
+    assert [s.name for s in affected_stages({tmp_path / "mid.txt"}, stages)] == ["second"]
+    assert [s.name for s in affected_stages({tmp_path / "copy.py"}, stages)] == ["first", "second"]
+
+
+def test_stage_cache_invalidation(stages, tmp_path):
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "ran", "second": "ran"}
+    assert runs(tmp_path) == ["mid.txt 1", "out.txt 1"]
+    assert (tmp_path / "out.txt").read_text() == "CS 6212\n"
+
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "cached", "second": "cached"}
+    assert runs(tmp_path) == []
+
+    # Changed input: the stage reruns, but its output is identical so downstream stays cached
+    (tmp_path / "raw.txt").write_text("CS 6212\n")
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "ran", "second": "cached"}
+
+    # Changed output content propagates
+    (tmp_path / "raw.txt").write_text("cs 6221\n")
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "ran", "second": "ran"}
+
+    # A deleted or edited output forces its own stage only
+    (tmp_path / "out.txt").unlink()
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "cached", "second": "ran"}
+    assert statuses(pipeline.run_pipeline(stages, force=True)) == {"first": "ran", "second": "ran"}
+
+
+def test_args_change_invalidates_but_extra_args_do_not(stages, tmp_path):
+    pipeline.run_pipeline(stages)
+    assert statuses(pipeline.run_pipeline(stages, extra_args=["--ignored"])) == {"first": "cached",
+                                                                                 "second": "cached"}
+    stages[1].args = ["mid.txt", "out.txt", "--verbose"]
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "cached", "second": "ran"}
+
+
+def test_failure_skips_downstream_and_is_not_recorded(stages, tmp_path):
+    (tmp_path / "raw.txt").unlink()
+    results = pipeline.run_pipeline(stages)
+    assert statuses(results) == {"first": "failed", "second": "skipped"}
+    (tmp_path / "raw.txt").write_text("cs 6212\n")
+    assert statuses(pipeline.run_pipeline(stages)) == {"first": "ran", "second": "ran"}
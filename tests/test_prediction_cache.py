@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from prediction_cache import PredictionCache, cache_key, local_revision, prompt_hash
+
+PARAMS = {"max_new_tokens": 256, "temperature": 0.0, "repetition_penalty": 1.2}
+BASE = ("org/llama-3.1-8b", "abc123", prompt_hash([1, 2, 3]), PARAMS)
+
+
+@pytest.mark.parametrize("changed", [
+    ("org/llama-3.1-8b-instruct", "abc123", BASE[2], PARAMS),
+    ("org/llama-3.1-8b", "def456", BASE[2], PARAMS),
+    ("org/llama-3.1-8b", None, BASE[2], PARAMS),
+    ("org/llama-3.1-8b", "abc123", prompt_hash([1, 2, 4]), PARAMS),
+    ("org/llama-3.1-8b", "abc123", BASE[2], {**PARAMS, "repetition_penalty": 1.0}),
+    ("org/llama-3.1-8b", "abc123", BASE[2], {**PARAMS, "top_p": 0.9}),
+], ids=["model", "revision", "no-revision", "prompt", "param-value", "extra-param"])
+def test_key_changes_with_each_component(changed):
+    assert cache_key(*changed) != cache_key(*BASE)
+
+
+def test_key_ignores_param_order():
+    reordered = dict(reversed(list(PARAMS.items())))
+    assert cache_key(*BASE[:3], reordered) == cache_key(*BASE)
+    assert prompt_hash((1, 2, 3)) == BASE[2]
+
+
+def test_local_revision_tracks_weight_files(tmp_path):
+    assert local_revision(tmp_path / "missing") is None
+    assert local_revision("org/llama-3.1-8b") is None
+
+    weights = tmp_path / "adapter_model.safetensors"
+    weights.write_bytes(b"\0" * 16)
+    (tmp_path / "README.md").write_text("notes")
+    revision = local_revision(tmp_path)
+    assert revision.startswith("local-") and revision == local_revision(tmp_path)
+
+    (tmp_path / "README.md").write_text("other notes")  # not a weight file
+    assert local_revision(tmp_path) == revision
+
+    stat = weights.stat()
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # retrained in place
+    assert local_revision(tmp_path) != revision
+
+
+def test_round_trip_and_hit_counts(tmp_path):
+    cache = PredictionCache(tmp_path / "cache.sqlite3")
+    key = cache_key(*BASE)
+    cache.put_many([(key, BASE[0], BASE[1], BASE[2], PARAMS, "Dr. Smith", 3, 0.5)])
+    other = cache_key(*BASE[:3], {**PARAMS, "temperature": 0.7})
+    assert cache.get_many([key, other, key]) == {key: ("Dr. Smith", 3, 0.5)}
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.stats()["models"][0]["entries"] == 1
+    cache.clear(BASE[0])
+    assert cache.get_many([key]) == {}
+    cache.close()
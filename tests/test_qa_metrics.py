@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from qa_metrics import evaluate_qa_predictions, f1_scores, lcs_length, rouge_scores, tokenize_13a
+
+PREDICTIONS = [
+    "CSCI 6212 is taught by Dr. Smith on Tuesdays.",
+    "The prerequisite for CSCI 6221 is CSCI 6212 and CSCI 6461.",
+    "Machine learning covers regression, classification and clustering.",
+    "CRN 41234 meets on MW 03:30PM - 04:45PM in SEH 1300.",
+]
+REFERENCES = [
+    "CSCI 6212 is taught by Dr. Smith.",
+    "CSCI 6221 requires CSCI 6212 as a prerequisite.",
+    "Machine learning covers regression, classification and clustering.",
+    "CRN 41234 meets on TR 03:30PM - 04:45PM in SEH 1300.",
+]
+
+
+def test_rouge_matches_rouge_score():
+    rouge_scorer = pytest.importorskip("rouge_score.rouge_scorer")
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=False)
+    expected = [scorer.score(r, p) for p, r in zip(PREDICTIONS, REFERENCES)]
+    ours = rouge_scores(PREDICTIONS, REFERENCES)
+    for key in ("rouge1", "rouge2", "rougeL"):
+        np.testing.assert_allclose(ours[key], [s[key].fmeasure for s in expected], atol=1e-9)
+
+
+def test_bleu_matches_nltk_corpus_bleu():
+    bleu_score = pytest.importorskip("nltk.translate.bleu_score")
+    # Every hypothesis has at least four tokens, where nltk and evaluate's BLEU agree
+    expected = bleu_score.corpus_bleu([[tokenize_13a(r)] for r in REFERENCES],
+                                      [tokenize_13a(p) for p in PREDICTIONS])
+    assert evaluate_qa_predictions(PREDICTIONS, REFERENCES)["bleu"] == pytest.approx(expected, abs=1e-9)
+
+
+def test_exact_match_and_set_f1():
+    scores = evaluate_qa_predictions(["Dr. Smith ", "no answer"], ["dr. smith", "Dr. Smith"])
+    assert scores["exact_match"] == 0.5
+    # Unique lowercased whitespace tokens: {"dr.", "smith"} vs {"no", "answer"}
+    np.testing.assert_allclose(f1_scores(["a a b", "x"], ["a b", "y"]), [1.0, 0.0])
+
+
+def test_lcs_length():
+    assert lcs_length([1, 2, 3, 4], [1, 3, 4]) == 3
+    assert lcs_length([], [1, 2]) == 0
+    assert lcs_length(list("ABCBDAB"), list("BDCABA")) == 4
+
+
+def test_empty_and_mismatched_inputs():
+    assert evaluate_qa_predictions([], [])["rougeL"] == 0.0
+    with pytest.raises(ValueError):
+        evaluate_qa_predictions(["a"], [])
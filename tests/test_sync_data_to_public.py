@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+import sync_data_to_public as sync
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    data, public = tmp_path / "data", tmp_path / "public" / "data"
+    data.mkdir()
+    monkeypatch.setattr(sync, "DATA_DIR", data)
+    monkeypatch.setattr(sync, "PUBLIC_DATA_DIR", public)
+    monkeypatch.setattr(sync, "SYNC_STATE_PATH", data / ".sync_state.json")
+    (data / "courses.csv").write_text("crn,course_code\n10001,CSCI 6212\n")
+    return data, public
+
+
+def test_unchanged_files_are_skipped(dirs, monkeypatch):
+    data, public = dirs
+    assert sync.sync_data_files(["courses.csv", "missing.csv"]) == {
+        "synced": ["courses.csv"], "unchanged": [], "skipped": ["missing.csv"]}
+    manifest = json.loads((public / sync.MANIFEST_NAME).read_text())
+    assert manifest["files"]["courses.csv"] == {"sha256": sync.file_sha256(data / "courses.csv"),
+                                               "size": (data / "courses.csv").stat().st_size}
+    inode = (public / "courses.csv").stat().st_ino
+
+    hashed = []
+    file_sha256 = sync.file_sha256
+    monkeypatch.setattr(sync, "file_sha256", lambda path: hashed.append(path.name) or file_sha256(path))
+
+    # Same size and mtime: not even hashed
+    assert sync.sync_data_files(["courses.csv"])["unchanged"] == ["courses.csv"]
+    assert hashed == []
+
+    # Touched but identical: hashed, not republished
+    stat = (data / "courses.csv").stat()
+    os.utime(data / "courses.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert sync.sync_data_files(["courses.csv"])["unchanged"] == ["courses.csv"]
+    assert hashed == ["courses.csv"]
+    assert (public / "courses.csv").stat().st_ino == inode
+
+    assert sync.sync_data_files(["courses.csv"], force=True)["synced"] == ["courses.csv"]
+
+
+def test_changed_file_is_replaced_atomically(dirs):
+    data, public = dirs
+    sync.sync_data_files(["courses.csv"])
+    with open(public / "courses.csv") as reader:
+        (data / "courses.csv").write_text("crn,course_code\n10001,CSCI 6212\n10002,CSCI 6221\n")
+        assert sync.sync_data_files(["courses.csv"])["synced"] == ["courses.csv"]
+        # A reader that opened the old file keeps seeing the complete old version
+        assert reader.read() == "crn,course_code\n10001,CSCI 6212\n"
+    assert (public / "courses.csv").read_text().endswith("10002,CSCI 6221\n")
+    assert not [p.name for p in public.iterdir() if ".tmp-" in p.name]
+
+
+def test_damaged_published_copy_is_republished(dirs):
+    data, public = dirs
+    sync.sync_data_files(["courses.csv"])
+    (public / "courses.csv").write_text("crn")
+    assert sync.sync_data_files(["courses.csv"])["synced"] == ["courses.csv"]
+    assert (public / "courses.csv").read_text() == (data / "courses.csv").read_text()
+
+
+def test_publish_methods(dirs):
+    data, public = dirs
+    public.mkdir(parents=True)
+    source = data / "courses.csv"
+    assert sync.publish(source, public / "linked.csv", link="hardlink") == "hardlink"
+    assert (public / "linked.csv").stat().st_ino == source.stat().st_ino
+    assert sync.publish(source, public / "copied.csv", link="copy") == "copy"
+    assert (public / "copied.csv").stat().st_ino != source.stat().st_ino
+    assert sync.publish(source, public / "auto.csv") in ("reflink", "copy")
+    assert (public / "auto.csv").read_text() == source.read_text()
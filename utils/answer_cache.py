@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Semantic answer cache in front of the chat model.
+
+Chat traffic repeats with small variations ("who teaches CSCI 6212",
+"CSCI 6212 instructor?", "who's teaching csci6212"). AnswerCache keys
+entries by the hash of the retrieved graph context and of the earlier
+conversation turns (a follow-up like "who teaches it?" means something
+different in every conversation), and finds near-duplicate
+questions within that context by cosine similarity of character n-gram
+vectors of the normalized query. Course codes, CRNs and other numbers must
+match exactly and in order, and so must the question's intent (who / when
+/ where / require / prerequisite), so "CSCI 6212" never answers for "CSCI
+6221", "Does CSCI 6212 require CSCI 6221?" never answers for "Is CSCI 6212
+a prerequisite for CSCI 6221?", and "when" never answers for "where".
+
+Entries expire after a TTL, the least recently used are evicted beyond
+max_entries, and everything is dropped when the schedule snapshot
+(data/spring_2026_courses.csv) changes.
+
+Usage:
+    python utils/answer_cache.py    # demo of near-duplicate hits and timings
+"""
+
+import hashlib
+import json
+import math
+import re
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+SCHEDULE_CSV = PROJECT_ROOT / "data" / "spring_2026_courses.csv"
+
+CONTRACTIONS = {"who's": "who is", "what's": "what is", "when's": "when is", "where's": "where is",
+                "how's": "how is", "it's": "it is"}
+FILLER = {"please", "can", "you", "tell", "me", "the", "a", "an", "for", "of", "course", "class",
+          "is", "are", "does", "do"}
+# Different words for the same intent; mapped to one form so they share n-grams
+SYNONYMS = {
+    "teaching": "teaches", "teach": "teaches", "taught": "teaches", "instructor": "teaches",
+    "instructors": "teaches", "professor": "teaches", "prof": "teaches", "teacher": "teaches",
+    "offered": "schedule", "scheduled": "schedule", "meet": "schedule", "meets": "schedule",
+    "time": "schedule", "times": "schedule",
+    "prereq": "prerequisite", "prereqs": "prerequisite", "prerequisites": "prerequisite",
+    "requirements": "prerequisite", "requires": "require", "required": "require", "needs": "require",
+    "need": "require", "room": "where", "building": "where", "location": "where",
+}
+# Words (after normalization) that decide what a question asks; the first one found is its intent
+INTENTS = {"who": "who", "teaches": "who", "when": "when", "schedule": "when", "where": "where",
+           "require": "require", "prerequisite": "prerequisite"}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, expand contractions, split glued course codes, drop filler, unify synonyms."""
+    text = query.lower()
+    for contraction, expansion in CONTRACTIONS.items():
+        text = text.replace(contraction, expansion)
+    text = re.sub(r"\b([a-z]{2,4})-?(\d{4}[a-z]?)\b", r"\1 \2", text)
+    words = [SYNONYMS.get(w, w) for w in re.findall(r"[a-z0-9]+", text) if w not in FILLER]
+    return " ".join(words)
+
+
+def anchors(normalized: str) -> tuple:
+    """
+    What must match exactly: the intent, then every token containing a digit
+    (codes, CRNs, years) in question order, since "A requires B" and "B requires A" differ.
+    """
+    words = normalized.split()
+    intent = next((INTENTS[w] for w in words if w in INTENTS), "")
+    numbers = tuple(dict.fromkeys(w for w in words if any(c.isdigit() for c in w)))
+    return (intent,) + numbers
+
+
+def ngram_vector(text: str, n: int = 3, dim: int = 1 << 18) -> dict:
+    """
+    L2-normalized hashed character n-gram counts of text.
+
+    N-grams are taken per padded word, so reordering words ("CSCI 6212
+    instructor" / "who teaches CSCI 6212") doesn't change the vector.
+    """
+    counts = {}
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - n + 1):
+            key = zlib.crc32(padded[i:i + n].encode('utf-8')) % dim
+            counts[key] = counts.get(key, 0) + 1
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {k: v / norm for k, v in counts.items()}
+
+
+def cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha1((context or "").encode('utf-8')).hexdigest()
+
+
+def history_hash(history) -> str:
+    """Hash of the prior conversation turns (any JSON-serializable value); "" for none."""
+    if not history:
+        return ""
+    return hashlib.sha1(json.dumps(history, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def snapshot_fingerprint(path=SCHEDULE_CSV) -> str:
+    """Content hash of the schedule snapshot (empty if it is missing)."""
+    try:
+        return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+class AnswerCache:
+    """TTL/LRU cache of model answers with near-duplicate query matching."""
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 24 * 3600, threshold: float = 0.8,
+                 snapshot_path=SCHEDULE_CSV, snapshot_check_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.snapshot_path = snapshot_path
+        self.snapshot_check_seconds = snapshot_check_seconds
+        self.snapshot = snapshot_fingerprint(snapshot_path)
+        self._snapshot_checked = time.monotonic()
+        self._snapshot_mtime = self._mtime()
+        # (context hash, history hash, anchors) -> OrderedDict of normalized query -> entry; plus global LRU order
+        self._buckets = {}
+        self._lru = OrderedDict()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def _mtime(self):
+        try:
+            return Path(self.snapshot_path).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def check_snapshot(self, force: bool = False) -> bool:
+        """Clear the cache if the schedule snapshot changed; returns True when it did."""
+        now = time.monotonic()
+        if not force and now - self._snapshot_checked < self.snapshot_check_seconds:
+            return False
+        self._snapshot_checked = now
+        mtime = self._mtime()
+        if mtime == self._snapshot_mtime and not force:
+            return False
+        self._snapshot_mtime = mtime
+        fingerprint = snapshot_fingerprint(self.snapshot_path)
+        if fingerprint == self.snapshot:
+            return False
+        self.snapshot = fingerprint
+        self.clear()
+        self.stats["invalidations"] += 1
+        return True
+
+    def clear(self):
+        self._buckets.clear()
+        self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _remove(self, lru_key):
+        bucket_key, normalized = lru_key
+        self._lru.pop(lru_key, None)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.pop(normalized, None)
+            if not bucket:
+                del self._buckets[bucket_key]
+
+    def get(self, query: str, context: str = "", history=None):
+        """
+        Cached answer for query under this retrieved context and conversation history.
+
+        Returns:
+            (answer, similarity) or (None, 0.0) on a miss
+        """
+        self.check_snapshot()
+        normalized = normalize_query(query)
+        bucket_key = (context_hash(context), history_hash(history), anchors(normalized))
+        bucket = self._buckets.get(bucket_key)
+        if not bucket:
+            self.stats["misses"] += 1
+            return None, 0.0
+
+        now = time.time()
+        entry = bucket.get(normalized)
+        similarity = 1.0
+        if entry is None:
+            vector = ngram_vector(normalized)
+            best, similarity = None, 0.0
+            for candidate in bucket.values():
+                score = cosine(vector, candidate["vector"])
+                if score > similarity:
+                    best, similarity = candidate, score
+            entry = best if similarity >= self.threshold else None
+        if entry is not None and now - entry["created_at"] > self.ttl_seconds:
+            self._remove((bucket_key, entry["normalized"]))
+            self.stats["expired"] += 1
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None, 0.0
+
+        self._lru.move_to_end((bucket_key, entry["normalized"]))
+        self.stats["hits" if similarity == 1.0 else "near_hits"] += 1
+        return entry["answer"], similarity
+
+    def put(self, query: str, answer: str, context: str = "", history=None):
+        self.check_snapshot()
+        normalized = normalize_query(query)
+        bucket_key = (context_hash(context), history_hash(history), anchors(normalized))
+        self._buckets.setdefault(bucket_key, {})[normalized] = {
+            "normalized": normalized,
+            "vector": ngram_vector(normalized),
+            "answer": answer,
+            "created_at": time.time(),
+        }
+        lru_key = (bucket_key, normalized)
+        self._lru[lru_key] = True
+        self._lru.move_to_end(lru_key)
+        while len(self._lru) > self.max_entries:
+            self._remove(next(iter(self._lru)))
+            self.stats["evictions"] += 1
+
+    def get_or_generate(self, query: str, generate, context: str = "", history=None) -> str:
+        """Return a cached answer, or call generate(query) and cache its result."""
+        answer, _ = self.get(query, context, history)
+        if answer is None:
+            answer = generate(query)
+            self.put(query, answer, context, history)
+        return answer
+
+    def summary(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["near_hits"] + self.stats["misses"]
+        return {
+            "entries": len(self),
+            "lookups": lookups,
+            "hit_rate": (self.stats["hits"] + self.stats["near_hits"]) / lookups if lookups else 0.0,
+            "snapshot": self.snapshot[:12],
+            **self.stats,
+        }
+
+
+def main():
+    cache = AnswerCache()
+    cache.put("Who teaches CSCI 6212?", "CSCI 6212 is taught by Dr. Example.", context="ctx")
+
+    def slow_model(query):
+        time.sleep(0.5)
+        return f"(generated answer for {query!r})"
+
+    for query in ["who teaches csci 6212", "CSCI 6212 instructor?", "Who's teaching CSCI-6212?",
+                  "Who teaches CSCI 6221?"]:
+        start = time.perf_counter()
+        answer, similarity = cache.get(query, context="ctx")
+        if answer is None:
+            answer = slow_model(query)
+            cache.put(query, answer, context="ctx")
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r:32} sim={similarity:.2f} {elapsed:8.2f} ms -> {answer}")
+    print(cache.summary())
+
+if __name__ == "__main__":
+    main()
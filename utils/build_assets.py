@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Fingerprinted copies of the frontend data assets.
+
+For every JSON/JSONL/CSV file in public/data/ this writes
+public/data/assets/<name>.<hash><ext> and public/data/asset_manifest.json
+mapping each logical name to its hashed path. `pnpm build` runs it before
+`next build`, so deployments always ship a current manifest. Hashed paths never change content, so they are served with an
+immutable Cache-Control header (next.config.mjs) and the frontend resolves
+them through lib/assets.ts, falling back to the plain /data/<name> URL
+when the manifest hasn't been built. Every script that writes to
+public/data calls refresh_assets() when it finishes, so the manifest never
+points at an older copy of a file.
+
+No .gz/.br variants are written: Next's public/ has no precompressed
+negotiation, and `next start` (or the host's CDN) compresses responses
+itself.
+
+Usage:
+    python utils/build_assets.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from profiling import add_profile_args, enable_from_args, profiled
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+PUBLIC_DATA_DIR = PROJECT_ROOT / 'public' / 'data'
+ASSETS_DIR = PUBLIC_DATA_DIR / 'assets'
+ASSET_MANIFEST_NAME = 'asset_manifest.json'
+
+ASSET_SUFFIXES = {'.json', '.jsonl', '.csv'}
+# Generated by the sync/build steps themselves
+EXCLUDED = {ASSET_MANIFEST_NAME, 'data_manifest.json'}
+HASH_LENGTH = 12
+# Set by pipeline.py for its stages: the final `assets` stage rebuilds once,
+# instead of parallel stages racing each other's stale-file cleanup
+DEFER_ASSETS_ENV = 'DEFER_ASSET_REFRESH'
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fingerprinted_name(path: Path, digest: str) -> str:
+    return f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"
+
+
+@profiled()
+def build_asset(path: Path, assets_dir: Path = ASSETS_DIR) -> dict:
+    """Write the hashed copy unless it already exists."""
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    name = fingerprinted_name(path, digest)
+    target = assets_dir / name
+    entry = {"path": f"/data/assets/{name}", "sha256": digest, "size": len(data)}
+
+    if not target.exists():
+        _write_atomic(target, data)
+    return entry
+
+
+def build_assets(public_data_dir: Path = PUBLIC_DATA_DIR, verbose: bool = True) -> dict:
+    """
+    Fingerprint every data asset, write the manifest and remove
+    hashed files no longer referenced by it.
+
+    Returns:
+        The asset manifest
+    """
+    assets_dir = public_data_dir / 'assets'
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    assets = {}
+    for path in sorted(public_data_dir.iterdir()):
+        if path.is_file() and path.suffix in ASSET_SUFFIXES and path.name not in EXCLUDED:
+            assets[path.name] = build_asset(path, assets_dir)
+
+    # Also drops .gz/.br variants left by earlier builds
+    referenced = {entry["path"].rsplit('/', 1)[-1] for entry in assets.values()}
+    removed = 0
+    for path in assets_dir.iterdir():
+        if path.is_file() and path.name not in referenced and not path.name.startswith('.'):
+            path.unlink()
+            removed += 1
+
+    manifest = {"assets": assets}
+    _write_atomic(public_data_dir / ASSET_MANIFEST_NAME,
+                  (json.dumps(manifest, indent=2) + "\n").encode('utf-8'))
+
+    if verbose:
+        size = sum(e["size"] for e in assets.values())
+        print(f"✓ Fingerprinted {len(assets)} assets, {size / 1024:.0f} KB ({removed} stale files removed)")
+    return manifest
+
+
+def refresh_assets(public_data_dir: Path = PUBLIC_DATA_DIR):
+    """
+    Rebuild the manifest after a script has written to public/data.
+
+    The manifest must never point at hashed copies of an older version of a
+    file (they are served as immutable), so if the rebuild fails it is
+    removed and the frontend falls back to the plain /data/<name> URLs.
+    Skipped under pipeline.py, whose `assets` stage rebuilds after all others.
+    """
+    if os.environ.get(DEFER_ASSETS_ENV):
+        print("✓ Asset manifest refresh deferred to the pipeline's assets stage")
+        return
+    try:
+        manifest = build_assets(public_data_dir, verbose=False)
+        print(f"✓ Refreshed asset manifest ({len(manifest['assets'])} assets)")
+    except OSError as e:
+        print(f"⚠ Could not rebuild assets: {e}")
+        (public_data_dir / ASSET_MANIFEST_NAME).unlink(missing_ok=True)
+        print("  Removed the stale asset manifest; run: python utils/build_assets.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted public/data assets.")
+    parser.add_argument("--public-data-dir", default=str(PUBLIC_DATA_DIR))
+    add_profile_args(parser)
+    args = parser.parse_args()
+    enable_from_args(args, "build_assets")
+    build_assets(Path(args.public_data_dir))
+
+if __name__ == "__main__":
+    main()
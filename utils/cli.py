@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the data, export and evaluation scripts.
+
+Each subcommand maps to a script's main() and imports that script only when
+it runs, so `--help` and the light subcommands never pay for pandas, bs4,
+torch or transformers. Arguments after the subcommand go to the script's
+own parser, e.g. `cli.py prepare --profile` or `cli.py eval --help`.
+
+Usage:
+    python utils/cli.py --help
+    python utils/cli.py scrape
+    python utils/cli.py prepare
+    python utils/cli.py export-kg
+    python utils/cli.py merge-metrics
+    python utils/cli.py sync --no-assets
+    python utils/cli.py eval --backend stub --dataset kg --max-samples 20
+"""
+
+import sys
+from pathlib import Path
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# subcommand -> (module, help); modules in utils/ unless noted in ROOT_MODULES
+COMMANDS = {
+    "scrape": ("scrape_courses", "Scrape schedule and bulletin data into data/ (network)"),
+    "prepare": ("prepare_dataset", "Build data/course_finetune.jsonl from the scraped CSVs"),
+    "catalog": ("course_catalog", "Load the joined course catalog cache and benchmark it"),
+    "schedule": ("meeting_times", "Meeting-time conflicts and availability (e.g. Tuesday evenings)"),
+    "export-kg": ("convert_kg_to_json", "Export utils/kg_graph.pkl to the frontend KG JSON files"),
+    "merge-metrics": ("data_prep", "Merge notebook training metrics into public/data/"),
+    "registry": ("run_registry", "Index training runs parsed from notebooks/"),
+    "sync": ("sync_data_to_public", "Publish changed data/ files to public/data/"),
+    "assets": ("build_assets", "Build fingerprinted public/data assets"),
+    "eval": ("eval_runner", "Batched model evaluation (eval_runner.py)"),
+    "pipeline": ("pipeline", "Run or watch the whole data/export pipeline"),
+    "profile": ("profiling", "Show --profile reports"),
+}
+ROOT_MODULES = {"data_prep"}
+
+
+def usage() -> str:
+    lines = ["usage: cli.py <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<15}{help_text}" for name, (_, help_text) in COMMANDS.items()]
+    lines += ["", "Run `cli.py <command> --help` for a command's options."]
+    return "\n".join(lines)
+
+
+def run(command: str, args: list):
+    """Import the command's module and run its main() with args as its argv."""
+    module_name, _ = COMMANDS[command]
+    if module_name in ROOT_MODULES and str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    import importlib
+    module = importlib.import_module(module_name)
+    sys.argv = [f"{Path(sys.argv[0]).name} {command}", *args]
+    return module.main()
+
+
+def main():
+    # Dispatch by hand rather than with argparse subparsers: building every
+    # subcommand's parser would mean importing every script
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"cli.py: error: unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+    run(command, args)
+
+if __name__ == "__main__":
+    main()
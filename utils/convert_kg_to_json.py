@@ -3,36 +3,27 @@
 Convert NetworkX knowledge graph pickle to JSON files for frontend
 """
 
+import argparse
 import json
 import os
-import pickle
+from pathlib import Path
+
+from build_assets import refresh_assets
+from profiling import add_profile_args, enable_from_args, stage
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
 
 
 def load_graph(pkl_path):
     """Load NetworkX graph from pickle file"""
     print(f"Loading graph from {pkl_path}...")
-    with open(pkl_path, 'rb') as f:
-        # The pickle contains a KnowledgeGraph object, not a raw NetworkX graph
-        # We need to define the class structure to unpickle it
-        import types
-
-        # Create a minimal KnowledgeGraph class to unpickle
-        class KnowledgeGraph:
-            def __init__(self):
-                self.graph = None
-                self.course_nodes = {}
-                self.professor_nodes = {}
-                self.topic_nodes = {}
-                self.node_features = {}
-                self.edge_types = {}
-                self.node_id_counter = 0
-
-        # Make it available for unpickling
-        import sys
-        sys.modules[__name__].KnowledgeGraph = KnowledgeGraph
-
-        kg = pickle.load(f)
-        G = kg.graph  # Extract the NetworkX graph from KnowledgeGraph object
+    # The pickle holds the notebook's KnowledgeGraph object; load_pickle maps
+    # it onto knowledge_graph.KnowledgeGraph whichever module runs this
+    from knowledge_graph import load_pickle
+    kg = load_pickle(pkl_path)
+    G = kg.graph  # Extract the NetworkX graph from KnowledgeGraph object
 
     print(f"✓ Loaded graph with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
     return G
@@ -206,21 +197,32 @@ def export_instructors_map(G, output_path):
     print(f"✓ Saved to: {output_path}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Export the knowledge graph pickle to frontend JSON files.")
+    add_profile_args(parser)
+    enable_from_args(parser.parse_args(), "convert_kg_to_json")
+
     # Paths
-    pkl_path = 'kg_graph.pkl'
-    output_dir = 'public/data'
+    pkl_path = SCRIPT_DIR / 'kg_graph.pkl'
+    output_dir = PROJECT_ROOT / 'public' / 'data'
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
     # Load graph
-    G = load_graph(pkl_path)
+    with stage("load_graph"):
+        G = load_graph(pkl_path)
 
     # Export all formats
-    export_knowledge_graph(G, os.path.join(output_dir, 'knowledge_graph.json'))
-    export_prerequisites_map(G, os.path.join(output_dir, 'prerequisites_map.json'))
-    export_topics_map(G, os.path.join(output_dir, 'topics_map.json'))
-    export_instructors_map(G, os.path.join(output_dir, 'instructors_map.json'))
+    with stage("export_knowledge_graph"):
+        export_knowledge_graph(G, os.path.join(output_dir, 'knowledge_graph.json'))
+    with stage("export_prerequisites_map"):
+        export_prerequisites_map(G, os.path.join(output_dir, 'prerequisites_map.json'))
+    with stage("export_topics_map"):
+        export_topics_map(G, os.path.join(output_dir, 'topics_map.json'))
+    with stage("export_instructors_map"):
+        export_instructors_map(G, os.path.join(output_dir, 'instructors_map.json'))
+    with stage("build_assets"):
+        refresh_assets(output_dir)
 
     print("\n" + "="*60)
     print("✅ All exports complete!")
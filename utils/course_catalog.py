@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Compact, indexed catalog of the scraped schedule joined with the bulletin.
+
+spring_2026_courses.csv and bulletin_courses.csv are loaded once into
+immutable __slots__ records (namedtuple subclasses) whose field values come
+from one string pool, so the hundreds of repeated subjects, instructors,
+rooms, meeting times and scrape dates are each stored once. Course codes are normalized on load ("CSCI CSCI
+1012" and "CSCI 1012 Details" become "CSCI 1012"), and sections are indexed
+by CRN, course code and instructor and joined with their bulletin entry.
+
+The parsed catalog is cached in data/course_catalog.bin: the string pool
+plus one flat int32 array of string ids per table, written with marshal
+and array (no numpy, so loading it costs no import time). The cache is keyed
+by the CSVs' size and mtime and the Python version, and rebuilt when any of
+them changes.
+
+Usage:
+    from course_catalog import load_catalog
+    catalog = load_catalog()
+    catalog.by_code["CSCI 6221"], catalog.description("CSCI 6221")
+
+    python utils/course_catalog.py            # load and benchmark against csv/pandas
+    python utils/course_catalog.py --rebuild  # ignore the binary cache
+"""
+
+import argparse
+import csv
+import marshal
+import os
+import sys
+import time
+from array import array
+from collections import namedtuple
+from pathlib import Path
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+SCHEDULE_CSV = PROJECT_ROOT / "data" / "spring_2026_courses.csv"
+BULLETIN_CSV = PROJECT_ROOT / "data" / "bulletin_courses.csv"
+CACHE_PATH = PROJECT_ROOT / "data" / "course_catalog.bin"
+# Bump when the record layout or normalization changes so old caches are rebuilt
+CACHE_VERSION = 2
+
+SCHEDULE_FIELDS = ("subject", "status", "crn", "course_code", "section", "title", "credits", "instructor",
+                   "building_room", "day_time", "date_range", "scraped_date", "scraped_term", "data_source")
+BULLETIN_FIELDS = ("subject", "course_code", "title", "credits", "description", "scraped_date", "data_source",
+                   "source_url")
+
+
+def normalize_code(course_code: str) -> str:
+    """Canonical "SUBJ 1234" form of a scraped course code."""
+    course_code = " ".join(str(course_code).replace("Details", " ").split())
+    # Older scrapes repeated the subject: "CSCI CSCI 1012"
+    parts = course_code.split()
+    if len(parts) >= 2 and parts[0] == parts[1]:
+        course_code = " ".join(parts[1:])
+    return course_code
+
+
+class Section(namedtuple("Section", SCHEDULE_FIELDS)):
+    """One schedule row; every field is a pooled string ("" when the cell was empty)."""
+    __slots__ = ()
+
+    def as_row(self) -> dict:
+        return dict(zip(SCHEDULE_FIELDS, self))
+
+
+class BulletinCourse(namedtuple("BulletinCourse", BULLETIN_FIELDS)):
+    """One bulletin row; every field is a pooled string."""
+    __slots__ = ()
+
+    def as_row(self) -> dict:
+        return dict(zip(BULLETIN_FIELDS, self))
+
+
+def _read_csv(path, fields: tuple, pool: dict) -> list:
+    """Rows of a CSV as tuples of pooled, stripped strings in `fields` order."""
+    rows = []
+    if not Path(path).exists():
+        return rows
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            values = []
+            for name in fields:
+                value = (row.get(name) or "").strip()
+                if name == "course_code":
+                    value = normalize_code(value)
+                values.append(pool.setdefault(value, value))
+            rows.append(tuple(values))
+    return rows
+
+
+def _source_key(*paths) -> str:
+    # marshal's format may change between Python versions
+    parts = [f"v{CACHE_VERSION}", f"py{sys.version_info[0]}.{sys.version_info[1]}"]
+    for path in paths:
+        stat = Path(path).stat() if Path(path).exists() else None
+        parts.append(f"{Path(path).name}:{stat.st_size}:{stat.st_mtime_ns}" if stat else f"{Path(path).name}:-")
+    return "|".join(parts)
+
+
+class Catalog:
+    """Schedule sections joined with bulletin courses, indexed by CRN, course code and instructor."""
+    def __init__(self, sections: list, courses: list):
+        self.sections = sections
+        self.bulletin = courses
+        # Later bulletin rows win, as with the dict the CSV loaders used to build
+        self.courses = {course.course_code: course for course in courses}
+        self.by_crn = {}
+        self.by_code = {}
+        self.by_instructor = {}
+        for section in sections:
+            # The scrape repeats some sections verbatim; index the first copy
+            if section.crn in self.by_crn:
+                continue
+            self.by_crn[section.crn] = section
+            self.by_code.setdefault(section.course_code, []).append(section)
+            if section.instructor:
+                self.by_instructor.setdefault(section.instructor, []).append(section)
+
+    @classmethod
+    def from_csv(cls, schedule_path=SCHEDULE_CSV, bulletin_path=BULLETIN_CSV):
+        pool = {}
+        sections = list(map(Section._make, _read_csv(schedule_path, SCHEDULE_FIELDS, pool)))
+        courses = list(map(BulletinCourse._make, _read_csv(bulletin_path, BULLETIN_FIELDS, pool)))
+        return cls(sections, courses)
+
+    def save(self, path=CACHE_PATH, source_key: str = ""):
+        """Write the catalog as a string pool plus int32 id arrays (atomic replace)."""
+        ids = {}
+        def encode(records):
+            return array('i', [ids.setdefault(value, len(ids)) for record in records for value in record]).tobytes()
+        payload = {"source_key": source_key, "schedule": encode(self.sections),
+                   "bulletin": encode(self.bulletin)}
+        payload["strings"] = list(ids)
+
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CACHE_PATH, source_key: str = None):
+        """Read a saved catalog; None when it is missing, unreadable or was built from other sources."""
+        try:
+            with open(path, 'rb') as f:
+                payload = marshal.load(f)
+            if source_key is not None and payload["source_key"] != source_key:
+                return None
+            strings = payload["strings"]
+            tables = []
+            for key, fields in (("schedule", SCHEDULE_FIELDS), ("bulletin", BULLETIN_FIELDS)):
+                ids = array('i')
+                ids.frombytes(payload[key])
+                values = [strings[i] for i in ids]
+                width = len(fields)
+                tables.append([values[i:i + width] for i in range(0, len(values), width)])
+        except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError):
+            return None
+        sections = list(map(Section._make, tables[0]))
+        courses = list(map(BulletinCourse._make, tables[1]))
+        return cls(sections, courses)
+
+    @property
+    def subjects(self) -> list:
+        return sorted({section.subject for section in self.sections})
+
+    def description(self, course_code: str) -> str:
+        course = self.courses.get(normalize_code(course_code))
+        return course.description if course else ""
+
+    def schedule_rows(self, exclude_subjects=()) -> list:
+        """Schedule rows as dicts (CSV column order), e.g. to merge with a fresh scrape."""
+        exclude = set(exclude_subjects)
+        return [section.as_row() for section in self.sections if section.subject not in exclude]
+
+    def bulletin_rows(self, exclude_subjects=()) -> list:
+        """Every bulletin row as a dict (CSV column order), duplicates included."""
+        exclude = set(exclude_subjects)
+        return [course.as_row() for course in self.bulletin if course.subject not in exclude]
+
+
+def load_catalog(schedule_path=SCHEDULE_CSV, bulletin_path=BULLETIN_CSV, cache_path=CACHE_PATH,
+                 rebuild: bool = False) -> Catalog:
+    """The catalog from the binary cache, re-parsing the CSVs (and re-caching) when they changed."""
+    source_key = _source_key(schedule_path, bulletin_path)
+    catalog = None if rebuild or cache_path is None else Catalog.load(cache_path, source_key)
+    if catalog is None:
+        catalog = Catalog.from_csv(schedule_path, bulletin_path)
+        if cache_path is not None:
+            try:
+                catalog.save(cache_path, source_key)
+            except OSError as e:
+                print(f"⚠ Could not write catalog cache {cache_path}: {e}")
+    return catalog
+
+
+def _measure(load, repeat: int = 5):
+    """(best load seconds, MB held by the result: traced Python memory, or pandas' deep usage)."""
+    import tracemalloc
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = load()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    if isinstance(result, tuple) and hasattr(result[0], "memory_usage"):
+        # Arrow-backed string columns live outside tracemalloc's view
+        held = sum(int(df.memory_usage(deep=True).sum()) for df in result)
+    return best, held / (1024 * 1024)
+
+
+def benchmark():
+    """Compare the cached catalog with the dict-of-strings and pandas loads it replaces."""
+    def csv_dicts():
+        with open(SCHEDULE_CSV, newline='', encoding='utf-8') as f:
+            schedule = list(csv.DictReader(f))
+        with open(BULLETIN_CSV, newline='', encoding='utf-8') as f:
+            bulletin = list(csv.DictReader(f))
+        return schedule, bulletin
+
+    def pandas_frames():
+        import pandas as pd
+        return pd.read_csv(SCHEDULE_CSV), pd.read_csv(BULLETIN_CSV)
+
+    candidates = [("csv.DictReader dicts", csv_dicts),
+                  ("Catalog.from_csv", Catalog.from_csv),
+                  ("load_catalog (binary cache)", load_catalog)]
+    try:
+        import pandas  # noqa: F401
+        candidates.insert(1, ("pandas.read_csv", pandas_frames))
+    except ImportError:
+        pass
+    load_catalog()  # make sure the cache is warm
+
+    print(f"{'Loader':<28}{'load ms':>10}{'memory MB':>12}")
+    for name, load in candidates:
+        seconds, megabytes = _measure(load)
+        print(f"{name:<28}{seconds * 1000:>10.2f}{megabytes:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the joined course catalog and report its cost.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-parse the CSVs and rewrite the cache")
+    parser.add_argument("--no-benchmark", action="store_true", help="Skip the load-time/memory comparison")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = load_catalog(rebuild=args.rebuild)
+    print(f"✓ {len(catalog.sections)} sections ({len(catalog.by_crn)} unique CRNs), "
+          f"{len(catalog.by_code)} scheduled courses, {len(catalog.courses)} bulletin courses, "
+          f"{len(catalog.by_instructor)} instructors in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if CACHE_PATH.exists():
+        print(f"✓ Cache: {CACHE_PATH} ({CACHE_PATH.stat().st_size / 1024:.1f} KB)")
+    if not args.no_benchmark:
+        print()
+        benchmark()
+
+if __name__ == "__main__":
+    main()
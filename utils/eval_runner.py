@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Batched evaluation runner for the KG-QA and fine-tuned models.
+
+evaluate_models_colab.py generates one query at a time. This runner tokenizes
+every prompt up front, groups prompts into length-sorted, left-padded batches
+under a token budget, and restores the original order afterwards, reporting
+throughput for the whole run.
+
+Generation goes through an inference backend (see inference_backends.py), so
+the same run works with Unsloth on GPU, a small local model on CPU, or the
+deterministic stub:
+    python utils/eval_runner.py --backend hf --model path/to/tiny-model --dataset kg
+    python utils/eval_runner.py --backend stub --dataset kg
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from inference_backends import BACKENDS, load_backend
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DATASETS = {
+    "standard": "course_finetune.jsonl",
+    "kg": "course_finetune_kg_rag.jsonl",
+}
+
+# Display names used in evaluation_results.json / model_comparison.json
+APPROACHES = {
+    "kg": "KG-Based QA System",
+    "standard": "Optimized Fine-tuning",
+}
+
+# Prompts must match evaluate_models_colab.py so results stay comparable
+KG_SYSTEM_PROMPT = """You are a helpful assistant providing information about GWU Computer Science and Data Science courses for Spring 2026.
+You have access to a knowledge graph with course relationships, prerequisites, instructors, and topics.
+Use the provided graph context to answer questions accurately. Provide concise, direct answers."""
+
+STANDARD_SYSTEM_PROMPT = "You are a helpful assistant providing information about GWU Computer Science and Data Science courses for Spring 2026."
+
+NO_GRAPH_CONTEXT = "No relevant graph information found."
+
+# Decoding options beyond the backends' defaults (temperature=0.1, sampling), as in
+# evaluate_models_colab.py; HF/unsloth backends include them in prediction cache keys
+GENERATION_KWARGS = {
+    "kg": {"repetition_penalty": 1.2},
+    "standard": {},
+}
+
+CHAT_ARTIFACTS = ['assistant', 'user', 'system', '<|assistant|>', '<|user|>', '<|eot_id|>']
+KG_ARTIFACTS = CHAT_ARTIFACTS + ['Question:', 'Answer:', 'Reasoning Path:']
+
+
+def get_data_path(filename):
+    """Get path to a file in the data/ directory, relative to project root."""
+    return PROJECT_ROOT / "data" / filename
+
+
+def parse_example(record: dict):
+    """Extract (query, reference answer) from a chat-format training record."""
+    messages = record.get("messages", [])
+    query = None
+    for msg in messages:
+        if msg.get("role") == "user":
+            user_content = msg.get("content", "")
+            if "Question:" in user_content:
+                query = user_content.split("Question:")[-1].strip()
+            elif "Graph Context:" in user_content:
+                query = user_content.replace("Graph Context:", "").strip()
+            else:
+                query = user_content.strip()
+            break
+    for msg in messages:
+        if msg.get("role") == "assistant":
+            content = msg.get("content", "")
+            reference = content.split("Answer:")[-1].strip() if "Answer:" in content else content.strip()
+            if reference and query:
+                return query, reference
+            break
+    return None
+
+
+def build_kg_messages(query: str, graph_context: str) -> list:
+    if graph_context != NO_GRAPH_CONTEXT:
+        user_content = f"""Graph Context:
+{graph_context}
+
+Question: {query}"""
+    else:
+        user_content = f"Question: {query}"
+    return [{"role": "system", "content": KG_SYSTEM_PROMPT}, {"role": "user", "content": user_content}]
+
+
+def build_standard_messages(query: str) -> list:
+    return [{"role": "system", "content": STANDARD_SYSTEM_PROMPT}, {"role": "user", "content": query}]
+
+
+def clean_output(text: str, artifacts=CHAT_ARTIFACTS) -> str:
+    text = text.replace('\xa0', ' ').replace('\u00a0', ' ')
+    text = re.sub(r'[\u0400-\u04FF]+', '', text)
+    text = re.sub(r'[\u00C0-\u00FF]+', '', text)
+    for artifact in artifacts:
+        text = text.replace(artifact, '')
+    return text.strip()
+
+
+def extract_answer(text: str, dataset: str) -> str:
+    """Clean a raw completion into the prediction that gets scored."""
+    answer = clean_output(text, KG_ARTIFACTS if dataset == "kg" else CHAT_ARTIFACTS)
+    if "Answer:" in answer:
+        answer = answer.split("Answer:")[-1].strip()
+    return answer
+
+
+def plan_batches(lengths: list, max_batch_tokens: int = 16384, max_batch_size: int = 32,
+                 max_new_tokens: int = 0) -> list:
+    """
+    Group prompt indices into length-sorted batches under a padded-token budget.
+
+    Prompts are sorted longest first, so the first prompt of each batch sets
+    its padded width; a batch grows while batch_size * (width + max_new_tokens)
+    stays within max_batch_tokens. A prompt that exceeds the budget alone
+    still gets a batch of one.
+
+    Returns:
+        List of lists of original indices
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches = []
+    current, width = [], 0
+    for i in order:
+        if current and ((len(current) + 1) * (width + max_new_tokens) > max_batch_tokens
+                        or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        if not current:
+            width = lengths[i]
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batched_generation(backend, messages_list: list, max_batch_tokens: int = 16384,
+                           max_batch_size: int = 32, cache=None, verbose: bool = True):
+    """
+    Generate completions for every message list, batched by prompt length.
+
+    Args:
+        backend: An InferenceBackend
+        messages_list: Chat messages per prompt
+        max_batch_tokens: Padded token budget per batch (prompt width + max_new_tokens)
+        max_batch_size: Maximum prompts per batch
+        cache: Optional PredictionCache; only misses are sent to the backend
+
+    Returns:
+        (completions in input order, throughput stats dict)
+    """
+    start = time.perf_counter()
+    token_lists = [backend.tokenize(messages) for messages in messages_list]
+    tokenize_seconds = time.perf_counter() - start
+
+    completions = [None] * len(token_lists)
+    keys = []
+    cached = {}
+    if cache is not None:
+        from prediction_cache import cache_key, prompt_hash
+
+        params = backend.generation_params()
+        prompt_shas = [prompt_hash(tokens) for tokens in token_lists]
+        keys = [cache_key(backend.model_id, backend.revision, sha, params) for sha in prompt_shas]
+        cached = cache.get_many(keys)
+        for i, key in enumerate(keys):
+            if key in cached:
+                completions[i] = cached[key][0]
+    todo = [i for i in range(len(token_lists)) if completions[i] is None]
+
+    lengths = [len(tokens) for tokens in token_lists]
+    batches = [[todo[j] for j in batch]
+               for batch in plan_batches([lengths[i] for i in todo], max_batch_tokens,
+                                         max_batch_size, backend.max_new_tokens)]
+
+    generated_tokens = 0
+    padded_tokens = 0
+    new_entries = []
+    generate_start = time.perf_counter()
+    for n, batch in enumerate(batches, 1):
+        batch_start = time.perf_counter()
+        texts, counts = backend.batch_generate([token_lists[i] for i in batch])
+        per_prompt = (time.perf_counter() - batch_start) / len(batch)
+        for i, text, count in zip(batch, texts, counts):
+            completions[i] = text
+            if cache is not None:
+                new_entries.append((keys[i], backend.model_id, backend.revision, prompt_shas[i],
+                                    params, text, count, per_prompt))
+        generated_tokens += sum(counts)
+        padded_tokens += len(batch) * max(lengths[i] for i in batch)
+        if verbose:
+            print(f"  batch {n}/{len(batches)}: {len(batch)} prompts, width {max(lengths[i] for i in batch)}")
+    generate_seconds = time.perf_counter() - generate_start
+    if new_entries:
+        cache.put_many(new_entries)
+
+    prompt_tokens = sum(lengths[i] for i in todo)
+    stats = {
+        "num_prompts": len(token_lists),
+        "cache_hits": len(token_lists) - len(todo),
+        "num_generated": len(todo),
+        "num_batches": len(batches),
+        "prompt_tokens": prompt_tokens,
+        "generated_tokens": generated_tokens,
+        "padding_efficiency": prompt_tokens / padded_tokens if padded_tokens else 1.0,
+        "tokenize_seconds": tokenize_seconds,
+        "generate_seconds": generate_seconds,
+        "cached_generate_seconds": sum(cached[key][2] or 0.0 for key in keys if key in cached),
+        "prompts_per_second": len(todo) / generate_seconds if generate_seconds else 0.0,
+        "generated_tokens_per_second": generated_tokens / generate_seconds if generate_seconds else 0.0,
+    }
+    return completions, stats
+
+
+def load_local_examples(dataset: str, max_samples: int = None, seed: int = 0, stratify: bool = True):
+    """
+    Read (queries, references) from data/<dataset>.jsonl.
+
+    With max_samples set, a reproducible sample (stratified by query_type)
+    is drawn through the byte-offset index instead of taking the first lines.
+    """
+    from eval_set import EvalSet
+
+    eval_set = EvalSet(get_data_path(DATASETS[dataset]))
+    queries, references = [], []
+    for record in eval_set.sample(max_samples, seed=seed, stratify=stratify):
+        example = parse_example(record)
+        if example:
+            queries.append(example[0])
+            references.append(example[1])
+    return queries, references
+
+
+def build_messages(dataset: str, queries: list) -> list:
+    """Chat messages for each query, retrieving graph context for the KG dataset."""
+    if dataset != "kg":
+        return [build_standard_messages(query) for query in queries]
+    from knowledge_graph import GraphRetriever, load_pickle
+
+    retriever = GraphRetriever(load_pickle(SCRIPT_DIR / "kg_graph.pkl"))
+    contexts = retriever.retrieve_batch(queries, max_hops=3)
+    return [build_kg_messages(query, context) for query, context in zip(queries, contexts)]
+
+
+def print_stats(stats: dict):
+    print("\n" + "="*70)
+    print("⚡ GENERATION THROUGHPUT")
+    print("="*70)
+    print(f"Prompts: {stats['num_prompts']} ({stats['cache_hits']} from cache, "
+          f"{stats['num_generated']} generated in {stats['num_batches']} batches)")
+    print(f"Padding efficiency: {stats['padding_efficiency']:.1%}")
+    print(f"Generation time: {stats['generate_seconds']:.2f}s "
+          f"({stats['prompts_per_second']:.2f} prompts/s, {stats['generated_tokens_per_second']:.1f} tokens/s)")
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched model evaluation runner.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="hf")
+    parser.add_argument("--model", help="Local path or Hugging Face repo id (not needed for --backend stub)")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="kg")
+    parser.add_argument("--max-samples", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed when --max-samples is set")
+    parser.add_argument("--no-stratify", action="store_true", help="Sample uniformly instead of by query_type")
+    parser.add_argument("--max-batch-tokens", type=int, default=16384)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument("--device", default=None, help="Defaults to cuda for unsloth, cpu otherwise")
+    parser.add_argument("--prefix-cache", action="store_true",
+                        help="Prefill the shared system-prompt prefix once and reuse its KV cache")
+    parser.add_argument("--output", default="predictions.json")
+    parser.add_argument("--cache", default=None, help="Prediction cache path (default: data/prediction_cache.sqlite3)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run inference")
+    args = parser.parse_args()
+
+    queries, references = load_local_examples(args.dataset, args.max_samples, args.seed, not args.no_stratify)
+    print(f"✓ Loaded {len(queries)} {args.dataset} examples")
+
+    backend = load_backend(args.backend, args.model, device=args.device, max_new_tokens=args.max_new_tokens,
+                           prefix_cache=args.prefix_cache, **GENERATION_KWARGS[args.dataset])
+    print(f"✓ Using {backend.name} backend")
+
+    cache = None
+    if not args.no_cache:
+        from prediction_cache import DEFAULT_CACHE_PATH, PredictionCache
+        cache = PredictionCache(args.cache or DEFAULT_CACHE_PATH)
+
+    completions, stats = run_batched_generation(backend, build_messages(args.dataset, queries),
+                                                args.max_batch_tokens, args.max_batch_size, cache=cache)
+    predictions = [extract_answer(text, args.dataset) for text in completions]
+
+    # NumPy-backed; imported here so --help and the CLI start fast
+    from qa_metrics import evaluate_qa_predictions
+    metrics = evaluate_qa_predictions(predictions, references)
+    with open(args.output, 'w') as f:
+        json.dump({"queries": queries, "references": references, "predictions": predictions,
+                   "metrics": metrics, "throughput": stats}, f, indent=2)
+    print_stats(stats)
+    print("Metrics: " + ", ".join(f"{name}={value:.4f}" for name, value in metrics.items()))
+    print(f"✓ Saved predictions to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Local, streaming access to the evaluation JSONL files in data/.
+
+load_test_data_from_github downloads a whole dataset and always takes its
+first N lines. EvalSet instead reads data/*.jsonl directly, keeps a
+persistent byte-offset index next to the file (data/<name>.idx.npz) so any
+record can be read with a single seek, and draws reproducible samples,
+optionally stratified by query_type, without loading the file into memory.
+
+Usage:
+    python utils/eval_set.py --dataset course_finetune_kg_rag.jsonl --samples 50 --seed 0
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_STRATUM = "default"
+
+
+def index_path_for(jsonl_path) -> Path:
+    jsonl_path = Path(jsonl_path)
+    return jsonl_path.with_name(jsonl_path.stem + ".idx.npz")
+
+
+class EvalSet:
+    """Byte-offset indexed view of a JSONL file with lazy record access."""
+    def __init__(self, path, strata_key: str = "query_type"):
+        self.path = Path(path)
+        self.strata_key = strata_key
+        self.index_path = index_path_for(self.path)
+        self.offsets, self.strata = self._load_or_build_index()
+
+    def _load_or_build_index(self):
+        """Reuse the saved index if it matches the file's size and mtime, else rebuild."""
+        stat = self.path.stat()
+        if self.index_path.exists():
+            try:
+                with np.load(self.index_path, allow_pickle=False) as saved:
+                    if (int(saved["size"]) == stat.st_size and int(saved["mtime_ns"]) == stat.st_mtime_ns
+                            and str(saved["strata_key"]) == self.strata_key):
+                        return saved["offsets"], saved["strata"]
+            except (OSError, KeyError, ValueError):
+                pass
+
+        offsets, strata = [], []
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if isinstance(record, dict):
+                    offsets.append(offset)
+                    strata.append(str(record.get(self.strata_key) or DEFAULT_STRATUM))
+                offset += len(line)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        strata = np.asarray(strata, dtype=str)
+        try:
+            # Write via a temp file so a concurrent reader never sees half an index
+            tmp_path = self.index_path.with_suffix(".tmp.npz")
+            np.savez(tmp_path, offsets=offsets, strata=strata, size=stat.st_size,
+                     mtime_ns=stat.st_mtime_ns, strata_key=self.strata_key)
+            tmp_path.replace(self.index_path)
+        except OSError as e:
+            print(f"⚠ Could not save index {self.index_path}: {e}")
+        return offsets, strata
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> dict:
+        with open(self.path, 'rb') as f:
+            f.seek(int(self.offsets[i]))
+            return json.loads(f.readline())
+
+    def iter_records(self, indices=None):
+        """Yield records lazily, in the given order (all records by default)."""
+        if indices is None:
+            indices = range(len(self))
+        with open(self.path, 'rb') as f:
+            for i in indices:
+                f.seek(int(self.offsets[i]))
+                yield json.loads(f.readline())
+
+    def stratum_counts(self) -> dict:
+        labels, counts = np.unique(self.strata, return_counts=True)
+        return {str(label): int(count) for label, count in zip(labels, counts)}
+
+    def sample_indices(self, n: int = None, seed: int = 0, stratify: bool = True) -> list:
+        """
+        Reproducible sample of record indices.
+
+        With stratify=True each stratum gets a share of n proportional to its
+        size (largest remainder rounding), so rare query types are kept.
+        Indices come back sorted, which keeps reads sequential on disk.
+        """
+        total = len(self)
+        if n is None or n >= total:
+            return list(range(total))
+        rng = random.Random(seed)
+        if not stratify:
+            return sorted(rng.sample(range(total), n))
+
+        groups = {}
+        for i, label in enumerate(self.strata):
+            groups.setdefault(str(label), []).append(i)
+        labels = sorted(groups)
+        quotas = {label: n * len(groups[label]) / total for label in labels}
+        allocation = {label: int(quotas[label]) for label in labels}
+        by_remainder = sorted(labels, key=lambda label: (quotas[label] - allocation[label], label), reverse=True)
+        for label in by_remainder[:n - sum(allocation.values())]:
+            allocation[label] += 1
+
+        chosen = []
+        for label in labels:
+            chosen.extend(rng.sample(groups[label], allocation[label]))
+        return sorted(chosen)
+
+    def sample(self, n: int = None, seed: int = 0, stratify: bool = True):
+        """Lazily yield a reproducible (optionally stratified) sample of records."""
+        return self.iter_records(self.sample_indices(n, seed, stratify))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and sample a local evaluation JSONL file.")
+    parser.add_argument("--dataset", default="course_finetune_kg_rag.jsonl", help="File name in data/ or a path")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-stratify", action="store_true")
+    args = parser.parse_args()
+
+    path = Path(args.dataset)
+    if not path.exists():
+        path = PROJECT_ROOT / "data" / args.dataset
+    eval_set = EvalSet(path)
+    print(f"✓ {path.name}: {len(eval_set)} records, index at {eval_set.index_path}")
+    print(f"  Strata: {eval_set.stratum_counts()}")
+    indices = eval_set.sample_indices(args.samples, args.seed, not args.no_stratify)
+    print(f"  Sample (seed {args.seed}): {indices}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Resumable, sharded model evaluation.
+
+The query set is split into N shards (query i goes to shard i % N). Each
+shard appends its predictions to its own checkpoint file as soon as a chunk
+of prompts finishes, so a crash or Colab disconnect only loses the chunk in
+flight: rerunning the same command skips everything already recorded.
+
+Shards can run in a local process pool (--workers) or on separate machines
+(--shard-index on each, sharing or copying the checkpoint directory). The
+merge step scores all shards and writes evaluation_results.json and
+model_comparison_update.json in the same shape as evaluate_models_colab.py.
+
+Usage:
+    python utils/eval_shards.py run --dataset kg --backend stub --num-shards 4 --workers 4
+    python utils/eval_shards.py run --dataset kg --backend hf --model path --num-shards 4 --shard-index 2
+    python utils/eval_shards.py merge --dataset kg --backend stub
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from eval_runner import (APPROACHES, GENERATION_KWARGS, build_messages, extract_answer, load_local_examples,
+                         run_batched_generation)
+from inference_backends import BACKENDS, load_backend
+from qa_metrics import evaluate_qa_predictions
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_CHECKPOINT_ROOT = PROJECT_ROOT / "eval_checkpoints"
+
+# Run settings that must match for shards to be resumed or merged together
+RUN_KEYS = ("dataset", "backend", "model", "max_samples", "seed", "stratify", "num_shards", "max_new_tokens",
+            "generation_kwargs")
+
+
+def run_config(args) -> dict:
+    return {
+        "dataset": args.dataset,
+        "backend": args.backend,
+        "model": args.model,
+        "max_samples": args.max_samples,
+        "seed": args.seed,
+        "stratify": not args.no_stratify,
+        "num_shards": args.num_shards,
+        "max_new_tokens": args.max_new_tokens,
+        # Same decoding settings as eval_runner.py (e.g. repetition_penalty for kg)
+        "generation_kwargs": GENERATION_KWARGS[args.dataset],
+    }
+
+
+def checkpoint_dir(args) -> Path:
+    if args.checkpoint_dir:
+        return Path(args.checkpoint_dir)
+    return DEFAULT_CHECKPOINT_ROOT / (args.run_name or f"{args.dataset}-{args.backend}")
+
+
+def shard_path(directory: Path, shard_index: int, num_shards: int) -> Path:
+    return directory / f"shard-{shard_index:03d}-of-{num_shards:03d}.jsonl"
+
+
+def write_manifest(directory: Path, config: dict):
+    """Record the run settings; refuse to mix checkpoints from different settings."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "manifest.json"
+    if path.exists():
+        with open(path, encoding='utf-8') as f:
+            existing = json.load(f)
+        mismatched = [key for key in RUN_KEYS if existing.get(key) != config.get(key)]
+        if mismatched:
+            raise ValueError(f"{directory} holds checkpoints for a different run "
+                             f"(differs in {', '.join(mismatched)}); use --run-name or --checkpoint-dir")
+        return
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({**config, "created_at": datetime.now().isoformat()}, f, indent=2)
+    tmp_path.replace(path)
+
+
+def read_checkpoint(path: Path) -> dict:
+    """
+    Completed items of one shard, keyed by query index.
+
+    A line cut off by a crash mid-write is dropped and truncated away so
+    the next append starts on a clean line.
+    """
+    done = {}
+    if not path.exists():
+        return done
+    valid_bytes = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            done[item["index"]] = item
+            valid_bytes += len(line)
+    if valid_bytes != path.stat().st_size:
+        with open(path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+def append_checkpoint(path: Path, items: list):
+    """Append finished items and flush them to disk before moving on."""
+    with open(path, 'a', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_shard(config: dict, directory: str, shard_index: int, chunk_size: int = 32,
+              max_batch_tokens: int = 16384, max_batch_size: int = 32, device: str = None,
+              use_cache: bool = True) -> dict:
+    """Evaluate the unfinished queries of one shard, checkpointing every chunk."""
+    directory = Path(directory)
+    path = shard_path(directory, shard_index, config["num_shards"])
+    queries, references = load_local_examples(config["dataset"], config["max_samples"],
+                                              config["seed"], config["stratify"])
+    mine = list(range(shard_index, len(queries), config["num_shards"]))
+    done = read_checkpoint(path)
+    todo = [i for i in mine if i not in done]
+    label = f"shard {shard_index + 1}/{config['num_shards']}"
+    if not todo:
+        print(f"✓ {label}: all {len(mine)} queries already done")
+        return {"shard": shard_index, "total": len(mine), "resumed": len(done), "generated": 0}
+    print(f"→ {label}: {len(done)} done, {len(todo)} to go")
+
+    backend = load_backend(config["backend"], config["model"], device=device,
+                           max_new_tokens=config["max_new_tokens"], **config["generation_kwargs"])
+    cache = None
+    if use_cache:
+        from prediction_cache import DEFAULT_CACHE_PATH, PredictionCache
+        cache = PredictionCache(DEFAULT_CACHE_PATH)
+
+    # Retrieval for the whole shard at once; generation and checkpoints per chunk
+    messages = build_messages(config["dataset"], [queries[i] for i in todo])
+    for start in range(0, len(todo), chunk_size):
+        chunk = todo[start:start + chunk_size]
+        completions, _ = run_batched_generation(backend, messages[start:start + chunk_size],
+                                                max_batch_tokens, max_batch_size, cache=cache, verbose=False)
+        append_checkpoint(path, [
+            {"index": i, "query": queries[i], "reference": references[i],
+             "prediction": extract_answer(text, config["dataset"]), "completed_at": time.time()}
+            for i, text in zip(chunk, completions)
+        ])
+        print(f"  {label}: {len(done) + start + len(chunk)}/{len(mine)}")
+    if cache is not None:
+        cache.close()
+    return {"shard": shard_index, "total": len(mine), "resumed": len(done), "generated": len(todo)}
+
+
+def merge_shards(directory: Path) -> tuple:
+    """
+    Collect every shard's items in query order.
+
+    Returns:
+        (config, items, missing shard indices)
+    """
+    with open(directory / "manifest.json", encoding='utf-8') as f:
+        config = json.load(f)
+    queries, _ = load_local_examples(config["dataset"], config["max_samples"], config["seed"], config["stratify"])
+    items = {}
+    for shard_index in range(config["num_shards"]):
+        items.update(read_checkpoint(shard_path(directory, shard_index, config["num_shards"])))
+    missing = sorted({i % config["num_shards"] for i in range(len(queries)) if i not in items})
+    return config, [items[i] for i in sorted(items)], missing
+
+
+def update_results_files(approach: str, metrics: dict, output_dir: Path):
+    """Merge one approach's metrics into evaluation_results.json and model_comparison_update.json."""
+    results_path = output_dir / "evaluation_results.json"
+    results = {"evaluation_date": None, "models_evaluated": [], "metrics": {}}
+    if results_path.exists():
+        with open(results_path, encoding='utf-8') as f:
+            results = json.load(f)
+    results["evaluation_date"] = datetime.now().isoformat()
+    if approach not in results["models_evaluated"]:
+        results["models_evaluated"].append(approach)
+    results["metrics"][approach] = metrics
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    comparison_path = output_dir / "model_comparison_update.json"
+    comparison = {"comparisons": []}
+    if comparison_path.exists():
+        with open(comparison_path, encoding='utf-8') as f:
+            comparison = json.load(f)
+    entry = {
+        "approach": approach,
+        "accuracy": metrics['exact_match'] * 100,
+        "f1_score": metrics['f1'],
+        "bleu": metrics['bleu'],
+        "rouge1": metrics['rouge1'],
+        "rouge2": metrics['rouge2'],
+        "rougeL": metrics['rougeL'],
+    }
+    comparison["comparisons"] = [c for c in comparison["comparisons"] if c.get("approach") != approach] + [entry]
+    with open(comparison_path, 'w') as f:
+        json.dump(comparison, f, indent=2)
+    return results_path, comparison_path
+
+
+def add_run_arguments(parser):
+    parser.add_argument("--dataset", choices=sorted(APPROACHES), default="kg")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="hf")
+    parser.add_argument("--model", help="Local path or Hugging Face repo id (not needed for --backend stub)")
+    parser.add_argument("--max-samples", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-stratify", action="store_true")
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument("--num-shards", type=int, default=1)
+    parser.add_argument("--run-name", default=None, help="Checkpoint subdirectory (default: <dataset>-<backend>)")
+    parser.add_argument("--checkpoint-dir", default=None, help="Explicit checkpoint directory")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable, sharded model evaluation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Evaluate shards (resuming from checkpoints)")
+    add_run_arguments(run_parser)
+    run_parser.add_argument("--shard-index", type=int, default=None,
+                            help="Run only this shard (e.g. one per machine); default runs all")
+    run_parser.add_argument("--workers", type=int, default=1, help="Processes for running shards locally")
+    run_parser.add_argument("--chunk-size", type=int, default=32, help="Prompts per checkpoint write")
+    run_parser.add_argument("--max-batch-tokens", type=int, default=16384)
+    run_parser.add_argument("--max-batch-size", type=int, default=32)
+    run_parser.add_argument("--device", default=None)
+    run_parser.add_argument("--no-cache", action="store_true", help="Don't use the prediction cache")
+
+    merge_parser = subparsers.add_parser("merge", help="Score all shards and write the results files")
+    add_run_arguments(merge_parser)
+    merge_parser.add_argument("--output-dir", default=".", help="Where to write the results JSON files")
+    args = parser.parse_args()
+
+    directory = checkpoint_dir(args)
+    if args.command == "merge":
+        config, items, missing = merge_shards(directory)
+        if missing:
+            print(f"❌ Shards {missing} are incomplete; rerun them before merging")
+            raise SystemExit(1)
+        metrics = evaluate_qa_predictions([item["prediction"] for item in items],
+                                          [item["reference"] for item in items])
+        approach = APPROACHES[config["dataset"]]
+        paths = update_results_files(approach, metrics, Path(args.output_dir))
+        print(f"✓ Merged {len(items)} predictions from {config['num_shards']} shards for {approach}")
+        print("  " + ", ".join(f"{name}={value:.4f}" for name, value in metrics.items()))
+        for path in paths:
+            print(f"✓ Saved {path}")
+        return
+
+    config = run_config(args)
+    write_manifest(directory, config)
+    shards = [args.shard_index] if args.shard_index is not None else list(range(args.num_shards))
+    options = dict(chunk_size=args.chunk_size, max_batch_tokens=args.max_batch_tokens,
+                   max_batch_size=args.max_batch_size, device=args.device, use_cache=not args.no_cache)
+    start = time.perf_counter()
+    if args.workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_shard, config, str(directory), i, **options) for i in shards]
+            summaries = [future.result() for future in futures]
+    else:
+        summaries = [run_shard(config, str(directory), i, **options) for i in shards]
+    generated = sum(s["generated"] for s in summaries)
+    resumed = sum(s["resumed"] for s in summaries)
+    print(f"\n✓ {len(shards)} shard(s) finished in {time.perf_counter() - start:.1f}s "
+          f"({generated} generated, {resumed} resumed from checkpoints) in {directory}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Structured-data fast path for templated course questions.
+
+Most chat and evaluation questions come from the create_chat_message
+templates in prepare_dataset.py:
+    Tell me about CSCI 6221.
+    Who teaches Advanced Software Paradigms?
+    When is CSCI 6221 offered?
+    What is the schedule for CRN 12345?
+    What is covered in CSCI 6221?
+Those are exact lookups over the schedule/bulletin CSVs. FastPath matches
+them with a few anchored regexes, answers from the indexed course_catalog in
+microseconds, and only falls through to the model on a miss, counting hits,
+misses and lookup latency per intent.
+
+Usage:
+    python utils/fast_path.py "Who teaches Machine Learning?"
+    python utils/fast_path.py --evaluate     # hit rate/agreement on course_finetune.jsonl
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from course_catalog import load_catalog, normalize_code
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+MISSING = "TBA"
+
+COURSE_CODE = r"([A-Za-z]{2,4})\s*-?\s*(\d{4}[A-Za-z]?)"
+
+# (intent, pattern); the first match wins
+INTENTS = [
+    ("about", re.compile(rf"^(?:tell me about|what is|what's)\s+{COURSE_CODE}\s*[.?!]?$", re.I)),
+    ("schedule", re.compile(rf"^when is\s+{COURSE_CODE}\s+(?:offered|scheduled|taught)\s*[.?!]?$", re.I)),
+    ("crn", re.compile(r"^what is the schedule for crn\s*#?\s*(\d{5})\s*[.?!]?$", re.I)),
+    ("description", re.compile(rf"^what is covered in\s+{COURSE_CODE}\s*[.?!]?$", re.I)),
+    ("instructor", re.compile(r"^who teaches\s+(.+?)\s*[.?!]?$", re.I)),
+]
+
+
+def _code(subject: str, number: str) -> str:
+    return normalize_code(f"{subject} {number}".upper())
+
+
+def _field(section, name: str) -> str:
+    return getattr(section, name) or MISSING
+
+
+def _slot(section) -> str:
+    if not section.building_room:
+        return _field(section, "day_time")
+    return f"{_field(section, 'day_time')} in {section.building_room}"
+
+
+def _join(items: list) -> str:
+    items = list(dict.fromkeys(items))
+    if len(items) <= 2:
+        return " and ".join(items)
+    return ", ".join(items[:-1]) + f", and {items[-1]}"
+
+
+class FastPath:
+    """Deterministic intent matcher answering templated questions from the catalog."""
+    def __init__(self, catalog=None):
+        self.catalog = catalog or load_catalog()
+        self.by_title = {}
+        for section in self.catalog.by_crn.values():
+            self.by_title.setdefault(section.title.lower(), []).append(section)
+        self.stats = {"hits": 0, "misses": 0, "lookup_seconds": 0.0, "max_lookup_seconds": 0.0, "intents": {}}
+
+    def match(self, question: str):
+        """Return (intent, match groups) for a templated question, or None."""
+        text = " ".join(question.split())
+        for intent, pattern in INTENTS:
+            m = pattern.match(text)
+            if m:
+                return intent, m.groups()
+        return None
+
+    def _title(self, code: str):
+        sections = self.catalog.by_code.get(code)
+        if sections:
+            return sections[0].title
+        course = self.catalog.courses.get(code)
+        return course.title if course else None
+
+    def _about(self, code: str):
+        sections = self.catalog.by_code.get(code)
+        if not sections:
+            return None
+        first = sections[0]
+        if len(sections) == 1:
+            answer = (f"The course {code}: {first.title} is taught by {_field(first, 'instructor')}. "
+                      f"It meets on {_field(first, 'day_time')} in {_field(first, 'building_room')}. "
+                      f"The status is {first.status} (CRN: {first.crn}).")
+        else:
+            listing = "; ".join(f"{_field(s, 'day_time')} in {_field(s, 'building_room')} with "
+                                f"{_field(s, 'instructor')} ({s.status}, CRN: {s.crn})" for s in sections)
+            answer = f"The course {code}: {first.title} has {len(sections)} sections: {listing}."
+        description = self.catalog.description(code)
+        if description:
+            answer += f"\n\nDescription: {description}"
+        return answer
+
+    def _schedule(self, code: str):
+        sections = self.catalog.by_code.get(code)
+        if not sections:
+            return None
+        slots = _join([_slot(s) for s in sections])
+        return f"{code} is scheduled for {slots}."
+
+    def _crn(self, crn: str):
+        section = self.catalog.by_crn.get(crn)
+        if not section:
+            return None
+        return (f"CRN {crn} corresponds to {section.course_code}: {section.title}. "
+                f"It meets on {_field(section, 'day_time')}.")
+
+    def _description(self, code: str):
+        description = self.catalog.description(code)
+        title = self._title(code)
+        if not description or not title:
+            return None
+        return f"{code}: {title}. {description}"
+
+    def _instructor(self, title: str):
+        sections = self.by_title.get(title.lower())
+        code = re.fullmatch(COURSE_CODE, title)
+        if not sections and code:
+            sections = self.catalog.by_code.get(_code(*code.groups()))
+        if not sections:
+            return None
+        by_code = {}
+        for section in sections:
+            by_code.setdefault(section.course_code, []).append(_field(section, "instructor"))
+        # Unstaffed sections only matter when no section has an instructor yet
+        parts = [f"{sections[0].title} ({code}) is taught by "
+                 f"{_join([i for i in instructors if i != MISSING] or [MISSING])}"
+                 for code, instructors in by_code.items()]
+        return "; ".join(parts) + "."
+
+    def answer(self, question: str):
+        """
+        Answer a templated question from the catalog.
+
+        Returns:
+            (answer, intent) on a hit, (None, None) when the model is needed
+        """
+        start = time.perf_counter()
+        matched = self.match(question)
+        answer = intent = None
+        if matched:
+            intent, groups = matched
+            if intent == "crn":
+                answer = self._crn(groups[0])
+            elif intent == "instructor":
+                answer = self._instructor(groups[0])
+            else:
+                code = _code(*groups)
+                answer = {"about": self._about, "schedule": self._schedule,
+                          "description": self._description}[intent](code)
+        elapsed = time.perf_counter() - start
+
+        self.stats["lookup_seconds"] += elapsed
+        self.stats["max_lookup_seconds"] = max(self.stats["max_lookup_seconds"], elapsed)
+        if answer is None:
+            self.stats["misses"] += 1
+            return None, None
+        self.stats["hits"] += 1
+        self.stats["intents"][intent] = self.stats["intents"].get(intent, 0) + 1
+        return answer, intent
+
+    def answer_or_generate(self, question: str, generate) -> str:
+        """Answer from the catalog when possible, otherwise call generate(question)."""
+        answer, _ = self.answer(question)
+        return answer if answer is not None else generate(question)
+
+    def summary(self) -> dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            "requests": total,
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "hit_rate": self.stats["hits"] / total if total else 0.0,
+            "mean_lookup_us": self.stats["lookup_seconds"] / total * 1e6 if total else 0.0,
+            "max_lookup_us": self.stats["max_lookup_seconds"] * 1e6,
+            "intents": dict(self.stats["intents"]),
+        }
+
+
+def evaluate(fast_path: FastPath, path=PROJECT_ROOT / "data" / "course_finetune.jsonl") -> dict:
+    """Hit rate on the dataset's questions and how often hits reproduce the reference answer."""
+    agree = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            messages = json.loads(line)["messages"]
+            question = next(m["content"] for m in messages if m["role"] == "user")
+            reference = next(m["content"] for m in messages if m["role"] == "assistant")
+            answer, _ = fast_path.answer(question)
+            if answer is not None and answer.strip() == reference.strip():
+                agree += 1
+    summary = fast_path.summary()
+    summary["exact_agreement"] = agree / summary["hits"] if summary["hits"] else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer templated course questions without the LLM.")
+    parser.add_argument("question", nargs="*")
+    parser.add_argument("--evaluate", action="store_true", help="Run over course_finetune.jsonl questions")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fast_path = FastPath()
+    print(f"✓ Indexed {len(fast_path.catalog.by_crn)} sections, {len(fast_path.catalog.by_code)} courses "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.evaluate:
+        summary = evaluate(fast_path)
+        print(f"Hit rate: {summary['hit_rate']:.1%} of {summary['requests']} questions "
+              f"(exact agreement with references on hits: {summary['exact_agreement']:.1%})")
+        print(f"Lookup latency: mean {summary['mean_lookup_us']:.1f} µs, max {summary['max_lookup_us']:.1f} µs")
+        print(f"Hits by intent: {summary['intents']}")
+    if args.question:
+        answer, intent = fast_path.answer(" ".join(args.question))
+        print(f"[{intent}] {answer}" if answer else "Miss: this question needs the model.")
+
+if __name__ == "__main__":
+    main()
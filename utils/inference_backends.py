@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Pluggable inference backends for evaluation and serving.
+
+Every backend exposes the same three operations:
+    tokenize(messages)            -> prompt token ids (chat template applied)
+    batch_generate(token_lists)   -> (completion texts, generated token counts)
+    generate(messages)            -> completion text for a single chat
+
+Backends:
+    unsloth - FastLanguageModel in 4-bit on CUDA (what evaluate_models_colab.py uses)
+    hf      - any local/Hub Hugging Face causal LM via transformers, CPU or GPU
+    stub    - deterministic, dependency-free CPU stub for profiling and regression tests
+
+Measure shared system-prompt prefix caching on a local model:
+    python utils/inference_backends.py --model path/to/tiny-model --dataset kg
+"""
+
+import argparse
+import re
+import time
+import zlib
+
+from prediction_cache import local_revision
+
+
+class InferenceBackend:
+    """Base class; subclasses implement tokenize() and batch_generate()."""
+    name = "base"
+
+    def __init__(self, max_new_tokens: int = 256):
+        self.max_new_tokens = max_new_tokens
+        # Identify the weights for caching; set by from_pretrained()
+        self.model_id = None
+        self.revision = None
+        # Prefill/decode split of the most recent batch_generate() call
+        self.last_timings = {}
+
+    def generation_params(self) -> dict:
+        """Decoding settings that affect the output (part of prediction cache keys)."""
+        return {"max_new_tokens": self.max_new_tokens}
+
+    def tokenize(self, messages: list) -> list:
+        raise NotImplementedError
+
+    def batch_generate(self, token_lists: list):
+        raise NotImplementedError
+
+    def generate(self, messages: list) -> str:
+        texts, _ = self.batch_generate([self.tokenize(messages)])
+        return texts[0]
+
+
+class _StepTimer:
+    """Logits processor that timestamps each decoding step; the first marks the end of prefill."""
+    def __init__(self):
+        self.steps = []
+
+    def __call__(self, input_ids, scores):
+        self.steps.append(time.perf_counter())
+        return scores
+
+
+class HFBackend(InferenceBackend):
+    """
+    Batched chat generation for a Hugging Face (or Unsloth) causal LM.
+
+    With prefix_cache=True, the chat-template prefix up to and including
+    each distinct system message is prefilled once; its KV cache is then
+    copied into every batch that starts with it, so only the per-query
+    suffix is prefilled. Suffixes are left-padded after the shared prefix
+    (positions come from the attention mask, so padding in the middle is
+    harmless).
+    """
+    name = "hf"
+
+    def __init__(self, model, tokenizer, max_new_tokens: int = 256, prefix_cache: bool = False,
+                 **generate_kwargs):
+        super().__init__(max_new_tokens)
+        self.model = model
+        self.tokenizer = tokenizer
+        self.generate_kwargs = {"temperature": 0.1, "do_sample": True, **generate_kwargs}
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        self.prefix_cache = prefix_cache
+        # System message -> shared prefix token ids, and prefix ids -> its KV cache
+        self._prefixes = {}
+        self._prefix_kv = {}
+
+    @classmethod
+    def from_pretrained(cls, model_name: str, device: str = "cpu", revision: str = None, **kwargs):
+        """Load a (small) local or Hub model with plain transformers."""
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+        model = AutoModelForCausalLM.from_pretrained(model_name, revision=revision).to(device).eval()
+        backend = cls(model, tokenizer, **kwargs)
+        backend.model_id = model_name
+        backend.revision = revision or getattr(model.config, "_commit_hash", None) or local_revision(model_name)
+        return backend
+
+    def generation_params(self) -> dict:
+        return {"max_new_tokens": self.max_new_tokens, **self.generate_kwargs}
+
+    def _template_prefix(self, system_message: dict) -> tuple:
+        """Tokens every prompt with this system message starts with, whatever the user says."""
+        a = self.tokenizer.apply_chat_template([system_message, {"role": "user", "content": "a"}], tokenize=True)
+        b = self.tokenizer.apply_chat_template([system_message, {"role": "user", "content": "b"}], tokenize=True)
+        n = 0
+        while n < min(len(a), len(b)) and a[n] == b[n]:
+            n += 1
+        return tuple(a[:n])
+
+    def tokenize(self, messages: list) -> list:
+        if self.prefix_cache and messages and messages[0].get("role") == "system":
+            system = messages[0].get("content", "")
+            if system not in self._prefixes:
+                self._prefixes[system] = self._template_prefix(messages[0])
+        return list(self.tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True))
+
+    def _match_prefix(self, tokens: list) -> tuple:
+        """Longest known prefix that tokens start with (and extend), or ()."""
+        best = ()
+        for prefix in self._prefixes.values():
+            if len(best) < len(prefix) < len(tokens) and tuple(tokens[:len(prefix)]) == prefix:
+                best = prefix
+        return best
+
+    def _prefix_cache_for(self, prefix: tuple):
+        """KV cache of the prefix, computed once per model and prefix."""
+        import torch
+
+        if prefix not in self._prefix_kv:
+            with torch.no_grad():
+                outputs = self.model(input_ids=torch.tensor([list(prefix)], device=self.model.device), use_cache=True)
+            self._prefix_kv[prefix] = outputs.past_key_values
+        return self._prefix_kv[prefix]
+
+    def batch_generate(self, token_lists: list):
+        """Generate for pre-tokenized prompts; returns (texts, generated token counts)."""
+        groups = {}
+        for i, tokens in enumerate(token_lists):
+            prefix = self._match_prefix(tokens) if self.prefix_cache else ()
+            groups.setdefault(prefix, []).append(i)
+
+        texts, counts = [None] * len(token_lists), [0] * len(token_lists)
+        timings = {"prefill_seconds": 0.0, "decode_seconds": 0.0}
+        for prefix, indices in groups.items():
+            group_texts, group_counts, group_timings = self._generate([token_lists[i] for i in indices], prefix)
+            for i, text, count in zip(indices, group_texts, group_counts):
+                texts[i] = text
+                counts[i] = count
+            for key in timings:
+                timings[key] += group_timings[key]
+        self.last_timings = timings
+        return texts, counts
+
+    def _generate(self, token_lists: list, prefix: tuple = ()):
+        import copy
+
+        import torch
+        from transformers import LogitsProcessorList
+
+        p = len(prefix)
+        suffixes = [t[p:] for t in token_lists]
+        width = max(len(t) for t in suffixes)
+        # Left padding keeps every prompt's last token adjacent to its generation
+        input_ids = torch.tensor([list(prefix) + [self.pad_token_id] * (width - len(t)) + t for t in suffixes],
+                                 device=self.model.device)
+        attention_mask = torch.tensor([[1] * p + [0] * (width - len(t)) + [1] * len(t) for t in suffixes],
+                                      device=self.model.device)
+        cache_kwargs = {}
+        if prefix:
+            cache = copy.deepcopy(self._prefix_cache_for(prefix))
+            cache.batch_repeat_interleave(len(token_lists))
+            cache_kwargs["past_key_values"] = cache
+
+        timer = _StepTimer()
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=input_ids, attention_mask=attention_mask, max_new_tokens=self.max_new_tokens,
+                pad_token_id=self.pad_token_id, eos_token_id=self.tokenizer.eos_token_id,
+                logits_processor=LogitsProcessorList([timer]), **cache_kwargs, **self.generate_kwargs
+            )
+        end = time.perf_counter()
+        first_step = timer.steps[0] if timer.steps else end
+
+        texts, counts = [], []
+        for row in outputs[:, p + width:].tolist():
+            if self.tokenizer.eos_token_id in row:
+                row = row[:row.index(self.tokenizer.eos_token_id) + 1]
+            texts.append(self.tokenizer.decode(row, skip_special_tokens=False))
+            counts.append(len(row))
+        return texts, counts, {"prefill_seconds": first_step - start, "decode_seconds": end - first_step}
+
+
+class UnslothBackend(HFBackend):
+    """4-bit Unsloth model with the llama-3.1 chat template, as used in Colab."""
+    name = "unsloth"
+
+    @classmethod
+    def from_pretrained(cls, model_name: str, device: str = "cuda", revision: str = None,
+                        max_seq_length: int = 2048, **kwargs):
+        import unsloth  # noqa: F401  (must be imported before transformers)
+        from unsloth import FastLanguageModel
+        from unsloth.chat_templates import get_chat_template
+
+        model, tokenizer = FastLanguageModel.from_pretrained(
+            model_name=model_name, max_seq_length=max_seq_length, dtype=None, load_in_4bit=True,
+            revision=revision
+        )
+        tokenizer = get_chat_template(tokenizer, chat_template="llama-3.1")
+        FastLanguageModel.for_inference(model)
+        backend = cls(model, tokenizer, **kwargs)
+        backend.model_id = model_name
+        backend.revision = revision or getattr(model.config, "_commit_hash", None) or local_revision(model_name)
+        return backend
+
+
+class StubBackend(InferenceBackend):
+    """
+    Deterministic CPU stand-in for a chat model.
+
+    Tokens are whitespace/punctuation pieces hashed into a fixed vocabulary,
+    and the "answer" is derived from the prompt: the first graph-context fact
+    when one is present, otherwise an echo of the question. Identical prompts
+    always produce identical outputs, so downstream metrics are reproducible.
+    An optional per-token delay simulates decode cost for profiling.
+    """
+    name = "stub"
+
+    TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\n")
+
+    def __init__(self, max_new_tokens: int = 256, vocab_size: int = 32000,
+                 seconds_per_token: float = 0.0, **_):
+        super().__init__(max_new_tokens)
+        self.vocab_size = vocab_size
+        self.seconds_per_token = seconds_per_token
+        self.eos_token_id = 0
+        self._pieces = {}
+        self._prompts = {}
+        self.model_id = "stub"
+        self.revision = "1"
+
+    def generation_params(self) -> dict:
+        return {"max_new_tokens": self.max_new_tokens, "vocab_size": self.vocab_size}
+
+    def render(self, messages: list) -> str:
+        """Flatten chat messages in a llama-3.1-like layout."""
+        parts = [f"<|{m['role']}|>\n{m['content']}" for m in messages]
+        return "\n".join(parts) + "\n<|assistant|>\n"
+
+    def _encode(self, text: str) -> list:
+        ids = []
+        for piece in self.TOKEN_PATTERN.findall(text):
+            token_id = 1 + zlib.crc32(piece.encode('utf-8')) % (self.vocab_size - 1)
+            self._pieces.setdefault(token_id, piece)
+            ids.append(token_id)
+        return ids
+
+    def _decode(self, ids: list) -> str:
+        text = " ".join(self._pieces.get(i, "<unk>") for i in ids if i != self.eos_token_id)
+        return re.sub(r" ([^\w\s])", r"\1", text).replace(" \n ", "\n")
+
+    def tokenize(self, messages: list) -> list:
+        text = self.render(messages)
+        ids = self._encode(text)
+        # Remember the exact prompt text so generation doesn't depend on detokenizing
+        self._prompts[tuple(ids)] = text
+        return ids
+
+    def _answer(self, prompt: str) -> str:
+        user = prompt.rsplit("<|user|>", 1)[-1].split("<|assistant|>", 1)[0].strip()
+        if "Graph Context:" in user:
+            context = user.split("Graph Context:", 1)[1].split("Question:", 1)[0].strip()
+            first_line = context.splitlines()[0] if context else ""
+            fact = first_line.split(":", 1)[-1].split(";")[0].strip()
+            if fact:
+                return f"Answer: {fact}."
+        question = user.split("Question:")[-1].strip()
+        return f"Answer: I don't have details about {question}"
+
+    def batch_generate(self, token_lists: list):
+        texts, counts = [], []
+        prefill_seconds = decode_seconds = 0.0
+        for tokens in token_lists:
+            start = time.perf_counter()
+            prompt = self._prompts.get(tuple(tokens)) or self._decode(tokens)
+            answer = self._answer(prompt)
+            answer_ids = self._encode(answer)
+            if len(answer_ids) > self.max_new_tokens:
+                answer_ids = answer_ids[:self.max_new_tokens]
+                answer = self._decode(answer_ids)
+            prefill_seconds += time.perf_counter() - start
+            if self.seconds_per_token:
+                time.sleep(self.seconds_per_token * len(answer_ids))
+                decode_seconds += self.seconds_per_token * len(answer_ids)
+            texts.append(answer)
+            counts.append(len(answer_ids))
+        self.last_timings = {"prefill_seconds": prefill_seconds, "decode_seconds": decode_seconds}
+        return texts, counts
+
+
+BACKENDS = {
+    "hf": HFBackend,
+    "unsloth": UnslothBackend,
+    "stub": StubBackend,
+}
+
+
+def load_backend(kind: str, model_name: str = None, device: str = None, **kwargs) -> InferenceBackend:
+    """
+    Construct a backend by name.
+
+    Args:
+        kind: 'hf', 'unsloth' or 'stub'
+        model_name: Local path or Hub repo id (ignored by the stub)
+        device: Torch device; defaults to cuda for unsloth, cpu for hf
+        **kwargs: Passed to the backend (max_new_tokens, generation options, ...)
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown backend '{kind}'. Available: {sorted(BACKENDS)}")
+    if kind == "stub":
+        return StubBackend(**kwargs)
+    if not model_name:
+        raise ValueError(f"Backend '{kind}' needs a model name or path")
+    backend_class = BACKENDS[kind]
+    if device is None:
+        device = "cuda" if kind == "unsloth" else "cpu"
+    return backend_class.from_pretrained(model_name, device=device, **kwargs)
+
+
+def benchmark_prefix_cache(model_name: str, messages_list: list, batch_size: int = 8, max_new_tokens: int = 16,
+                           repeats: int = 3, device: str = "cpu") -> dict:
+    """
+    Compare prefill time with and without the shared-prefix KV cache.
+
+    Decoding is greedy so both paths must produce identical completions;
+    the best of `repeats` runs is reported for each.
+    """
+    results = {}
+    completions = {}
+    for prefix_cache in (False, True):
+        backend = load_backend("hf", model_name, device=device, max_new_tokens=max_new_tokens,
+                               prefix_cache=prefix_cache, do_sample=False, temperature=None)
+        token_lists = [backend.tokenize(messages) for messages in messages_list]
+        batches = [token_lists[i:i + batch_size] for i in range(0, len(token_lists), batch_size)]
+        backend.batch_generate(batches[0])  # warm-up (and builds the prefix cache)
+        best = None
+        for _ in range(repeats):
+            prefill = decode = 0.0
+            texts = []
+            for batch in batches:
+                batch_texts, _ = backend.batch_generate(batch)
+                texts.extend(batch_texts)
+                prefill += backend.last_timings["prefill_seconds"]
+                decode += backend.last_timings["decode_seconds"]
+            if best is None or prefill < best["prefill_seconds"]:
+                best = {"prefill_seconds": prefill, "decode_seconds": decode}
+        best["prompt_tokens"] = sum(len(t) for t in token_lists)
+        best["prefilled_tokens"] = best["prompt_tokens"] - sum(len(backend._match_prefix(t)) for t in token_lists)
+        results["prefix_cache" if prefix_cache else "baseline"] = best
+        completions[prefix_cache] = texts
+    results["identical_outputs"] = completions[False] == completions[True]
+    results["prefill_speedup"] = (results["baseline"]["prefill_seconds"] /
+                                  results["prefix_cache"]["prefill_seconds"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared system-prompt prefix KV caching.")
+    parser.add_argument("--model", required=True, help="Local path or Hugging Face repo id")
+    parser.add_argument("--dataset", choices=["kg", "standard"], default="standard")
+    parser.add_argument("--max-samples", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    from eval_runner import build_messages, load_local_examples
+
+    queries, _ = load_local_examples(args.dataset, args.max_samples)
+    results = benchmark_prefix_cache(args.model, build_messages(args.dataset, queries), args.batch_size,
+                                     args.max_new_tokens, device=args.device)
+    for name in ("baseline", "prefix_cache"):
+        r = results[name]
+        print(f"{name:<13} prefill {r['prefill_seconds'] * 1000:8.1f} ms "
+              f"({r['prefilled_tokens']}/{r['prompt_tokens']} prompt tokens prefilled), "
+              f"decode {r['decode_seconds'] * 1000:8.1f} ms")
+    print(f"Prefill speedup: {results['prefill_speedup']:.2f}x, "
+          f"identical outputs: {'yes' if results['identical_outputs'] else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Importable KnowledgeGraph / GraphRetriever classes for the KG-RAG pipeline.
+
+These mirror the classes defined in the KG-QA notebook (and re-declared in
+evaluate_models_colab.py for unpickling), so kg_graph.pkl and
+graph_retriever.pkl can be loaded from plain Python scripts.
+"""
+
+import os
+import pickle
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from path_queries import PathQueryEngine
+
+# Topics the notebook's entity extractor recognises by name
+KNOWN_TOPICS = ['machine learning', 'deep learning', 'neural networks', 'computer vision']
+
+COURSE_CODE_PATTERN = re.compile(r'[A-Z]{2,4}\s+\d{4}')
+
+
+def extract_entities(query: str) -> list:
+    """Extract course codes and known topics mentioned in a query."""
+    entities = []
+    entities.extend(COURSE_CODE_PATTERN.findall(query))
+    for topic in KNOWN_TOPICS:
+        if topic.lower() in query.lower():
+            entities.append(topic)
+    return entities
+
+
+class KnowledgeGraph:
+    """Knowledge Graph for GW Courses with nodes and edges."""
+    def __init__(self):
+        self.graph = nx.DiGraph()
+        self.course_nodes = {}
+        self.professor_nodes = {}
+        self.topic_nodes = {}
+        self.node_features = {}
+        self.edge_types = {}
+        self.node_id_counter = 0
+
+    def __getstate__(self):
+        # The path engine caches restricted copies of the graph; don't pickle them
+        state = self.__dict__.copy()
+        state.pop('_path_engine', None)
+        return state
+
+    @property
+    def path_engine(self) -> PathQueryEngine:
+        engine = getattr(self, '_path_engine', None)
+        if engine is None:
+            engine = PathQueryEngine(self.graph)
+            self._path_engine = engine
+        return engine
+
+    def add_node(self, node_type: str, node_id: str, features: dict = None):
+        if node_id not in self.graph:
+            self.graph.add_node(node_id, node_type=node_type, **{**(features or {})})
+            self.node_features[node_id] = features or {}
+            self._path_engine = None
+            return True
+        return False
+
+    def add_edge(self, source: str, target: str, edge_type: str, weight: float = 1.0):
+        if source in self.graph and target in self.graph:
+            self.graph.add_edge(source, target, edge_type=edge_type, weight=weight)
+            self.edge_types[(source, target)] = edge_type
+            self._path_engine = None
+            return True
+        return False
+
+    def get_subgraph(self, start_nodes: list, max_hops: int = 2) -> nx.DiGraph:
+        subgraph_nodes = set(start_nodes)
+        for _ in range(max_hops):
+            new_nodes = set()
+            for node in subgraph_nodes:
+                new_nodes.update(self.graph.successors(node))
+                new_nodes.update(self.graph.predecessors(node))
+            subgraph_nodes.update(new_nodes)
+        return self.graph.subgraph(subgraph_nodes)
+
+    def find_paths(self, source: str, target: str, max_length: int = 3, edge_types: list = None,
+                   max_paths: int = 10) -> list:
+        """Shortest-first simple paths, capped at max_paths (see path_queries.py)."""
+        return self.path_engine.find_paths(source, target, edge_types=edge_types,
+                                           max_length=max_length, max_paths=max_paths)
+
+
+class PageRankIndex:
+    """
+    Sparse random-walk transition matrix over a KnowledgeGraph.
+
+    Edges are treated as undirected (the hop-based retriever also walks both
+    successors and predecessors) and weighted by their 'weight' attribute.
+    Built once per graph and reused for every personalized PageRank query.
+    """
+    def __init__(self, graph: nx.DiGraph):
+        self.nodes = list(graph.nodes())
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        rows, cols, weights = [], [], []
+        for u, v, data in graph.edges(data=True):
+            w = float(data.get('weight', 1.0))
+            i, j = self.node_index[u], self.node_index[v]
+            rows.extend((i, j))
+            cols.extend((j, i))
+            weights.extend((w, w))
+
+        adjacency = sp.csr_matrix((weights, (rows, cols)), shape=(n, n), dtype=np.float64)
+        out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+        self.dangling = out_weight == 0
+        inv_weight = np.divide(1.0, out_weight, out=np.zeros(n), where=~self.dangling)
+        # Row-stochastic P; stored transposed so a step is P^T @ R^T
+        self.transition_t = (sp.diags(inv_weight) @ adjacency).T.tocsr()
+
+    def seed_matrix(self, seed_sets: list) -> np.ndarray:
+        """Build a (num_queries, num_nodes) matrix of uniform seed distributions."""
+        seeds = np.zeros((len(seed_sets), len(self.nodes)))
+        for row, seed_nodes in enumerate(seed_sets):
+            idx = [self.node_index[node] for node in set(seed_nodes) if node in self.node_index]
+            if idx:
+                seeds[row, idx] = 1.0 / len(idx)
+        return seeds
+
+    def personalized_pagerank(self, seeds: np.ndarray, alpha: float = 0.85,
+                              max_iter: int = 100, tol: float = 1e-8) -> np.ndarray:
+        """
+        Run batched personalized PageRank by power iteration.
+
+        Args:
+            seeds: (num_queries, num_nodes) restart distributions, one row per query
+            alpha: Probability of following an edge instead of restarting
+            max_iter: Maximum number of power iterations
+            tol: Stop once the largest per-query L1 change falls below this
+
+        Returns:
+            (num_queries, num_nodes) array of PageRank scores
+        """
+        scores = seeds.copy()
+        for _ in range(max_iter):
+            # Mass on dangling nodes restarts at the seeds instead of leaking
+            dangling_mass = scores[:, self.dangling].sum(axis=1, keepdims=True)
+            updated = alpha * (self.transition_t @ scores.T).T
+            updated += (1.0 - alpha + alpha * dangling_mass) * seeds
+            delta = np.abs(updated - scores).sum(axis=1).max(initial=0.0)
+            scores = updated
+            if delta < tol:
+                break
+        return scores
+
+    def top_k_nodes(self, scores: np.ndarray, top_k: int) -> list:
+        """Return the top-k scoring node ids for each row of a score matrix."""
+        k = min(top_k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(scores.shape[0])]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            results.append([self.nodes[i] for i in ordered if row[i] > 0])
+        return results
+
+
+class GraphRetriever:
+    """Retriever that finds relevant graph subgraphs for queries."""
+    def __init__(self, knowledge_graph: KnowledgeGraph, lexical_index=None):
+        self.kg = knowledge_graph
+        self.lexical_index = lexical_index
+
+    def __getstate__(self):
+        # Indexes are derived from the graph; rebuild them after unpickling
+        state = self.__dict__.copy()
+        state.pop('_pagerank_index', None)
+        return state
+
+    def match_entities(self, query_entities: list) -> list:
+        """Map extracted entities to knowledge-graph seed node ids."""
+        start_nodes = []
+        for entity in query_entities:
+            if entity in self.kg.course_nodes:
+                start_nodes.append(self.kg.course_nodes[entity])
+            for prof_name, node_id in self.kg.professor_nodes.items():
+                if entity.lower() in prof_name.lower() or prof_name.lower() in entity.lower():
+                    start_nodes.append(node_id)
+            for topic, node_id in self.kg.topic_nodes.items():
+                if entity.lower() in topic.lower():
+                    start_nodes.append(node_id)
+        return start_nodes
+
+    def seed_nodes(self, query: str, query_entities: list, lexical_top_k: int = 3) -> list:
+        """
+        Seed nodes for a query: matched entities, or, when nothing matches,
+        the best lexical hits over bulletin descriptions (if an index is attached).
+        """
+        start_nodes = self.match_entities(query_entities)
+        lexical_index = getattr(self, 'lexical_index', None)
+        if start_nodes or lexical_index is None or not query:
+            return start_nodes
+        for code, _ in lexical_index.search(query, top_k=lexical_top_k * 3):
+            if code in self.kg.course_nodes:
+                start_nodes.append(self.kg.course_nodes[code])
+                if len(start_nodes) == lexical_top_k:
+                    break
+        return start_nodes
+
+    def retrieve_subgraph(self, query: str, query_entities: list, max_hops: int = 2) -> nx.DiGraph:
+        start_nodes = self.seed_nodes(query, query_entities)
+        if not start_nodes:
+            return nx.DiGraph()
+        return self.kg.get_subgraph(start_nodes, max_hops=max_hops)
+
+    @property
+    def pagerank_index(self) -> PageRankIndex:
+        """Lazily built transition matrix; pickled retrievers predate it."""
+        index = getattr(self, '_pagerank_index', None)
+        if index is None:
+            index = PageRankIndex(self.kg.graph)
+            self._pagerank_index = index
+        return index
+
+    def retrieve_subgraph_pagerank(self, query: str, query_entities: list, top_k: int = 20,
+                                   alpha: float = 0.85) -> nx.DiGraph:
+        """
+        Alternative to retrieve_subgraph that ranks nodes by personalized PageRank
+        seeded on the matched entities, so hub nodes don't flood the context.
+        """
+        return self.retrieve_subgraphs_pagerank([query_entities], top_k=top_k, alpha=alpha,
+                                                queries=[query])[0]
+
+    def retrieve_subgraphs_pagerank(self, entity_lists: list, top_k: int = 20,
+                                    alpha: float = 0.85, queries: list = None) -> list:
+        """
+        Batched personalized PageRank retrieval.
+
+        All seed vectors are stacked into one matrix and scored together, so an
+        entire evaluation set costs one power iteration loop.
+
+        Args:
+            entity_lists: One list of extracted entities per query
+            top_k: Number of highest-scoring nodes kept per query
+            alpha: Damping factor (probability of not restarting at the seeds)
+            queries: Optional query texts, used for the lexical fallback
+
+        Returns:
+            List of subgraphs induced on each query's top-k nodes
+        """
+        index = self.pagerank_index
+        queries = queries or [None] * len(entity_lists)
+        seed_sets = [self.seed_nodes(query, entities) for query, entities in zip(queries, entity_lists)]
+        scores = index.personalized_pagerank(index.seed_matrix(seed_sets), alpha=alpha)
+        subgraphs = []
+        for seed_nodes, top_nodes in zip(seed_sets, index.top_k_nodes(scores, top_k)):
+            if not seed_nodes:
+                subgraphs.append(nx.DiGraph())
+            else:
+                subgraphs.append(self.kg.graph.subgraph(top_nodes))
+        return subgraphs
+
+    def format_subgraph_context(self, subgraph: nx.DiGraph) -> str:
+        if subgraph.number_of_nodes() == 0:
+            return "No relevant graph information found."
+        context_parts = []
+        edges_by_type = defaultdict(list)
+        # Sorted so the same subgraph always yields the same context (and prompt hash)
+        for u, v, data in sorted(subgraph.edges(data=True), key=lambda edge: (edge[0], edge[1])):
+            edge_type = data.get('edge_type', 'unknown')
+            edges_by_type[edge_type].append((u, v))
+        if 'prerequisite' in edges_by_type:
+            prereqs = []
+            for u, v in edges_by_type['prerequisite']:
+                course_u = subgraph.nodes[u].get('code', u)
+                course_v = subgraph.nodes[v].get('code', v)
+                prereqs.append(f"{course_v} is a prerequisite for {course_u}")
+            if prereqs:
+                context_parts.append("Prerequisites: " + "; ".join(prereqs[:10]))
+        if 'taught_by' in edges_by_type:
+            taught_by = []
+            for u, v in edges_by_type['taught_by']:
+                course = subgraph.nodes[u].get('code', u)
+                prof = subgraph.nodes[v].get('name', v)
+                taught_by.append(f"{course} is taught by {prof}")
+            if taught_by:
+                context_parts.append("Instructors: " + "; ".join(taught_by[:10]))
+        if 'covers_topic' in edges_by_type:
+            topics = []
+            for u, v in edges_by_type['covers_topic']:
+                course = subgraph.nodes[u].get('code', u)
+                topic = subgraph.nodes[v].get('name', v)
+                topics.append(f"{course} covers {topic}")
+            if topics:
+                context_parts.append("Topics: " + "; ".join(topics[:10]))
+        return "\n".join(context_parts) if context_parts else "Graph context available."
+
+    def _neighborhood(self, node: str, max_hops: int, cache: dict) -> frozenset:
+        """Nodes within max_hops of a single node (ignoring direction), memoized."""
+        key = (node, max_hops)
+        if key not in cache:
+            reached, frontier = {node}, {node}
+            for _ in range(max_hops):
+                next_frontier = set()
+                for current in frontier:
+                    next_frontier.update(self.kg.graph.successors(current))
+                    next_frontier.update(self.kg.graph.predecessors(current))
+                frontier = next_frontier - reached
+                reached |= frontier
+            cache[key] = frozenset(reached)
+        return cache[key]
+
+    def _contexts_for_seed_sets(self, seed_sets: list, max_hops: int, mode: str, top_k: int) -> list:
+        """Format one context per (already deduplicated) seed set."""
+        if mode == 'pagerank':
+            index = self.pagerank_index
+            scores = index.personalized_pagerank(index.seed_matrix(seed_sets))
+            node_sets = index.top_k_nodes(scores, top_k)
+        else:
+            cache = {}
+            node_sets = []
+            for seed_nodes in seed_sets:
+                nodes = set()
+                for node in seed_nodes:
+                    nodes |= self._neighborhood(node, max_hops, cache)
+                node_sets.append(nodes)
+        return [self.format_subgraph_context(self.kg.graph.subgraph(nodes) if seeds else nx.DiGraph())
+                for seeds, nodes in zip(seed_sets, node_sets)]
+
+    def retrieve_batch(self, queries: list, max_hops: int = 2, mode: str = 'hops', top_k: int = 20,
+                       executor: str = None, max_workers: int = None) -> list:
+        """
+        Retrieve formatted graph contexts for many queries in one pass.
+
+        Entities are extracted for every query, identical seed sets are
+        deduplicated, and per-node neighborhoods are expanded once and shared,
+        so popular courses/topics are only walked a single time per batch.
+
+        Args:
+            queries: Query strings
+            max_hops: Hop radius for mode='hops'
+            mode: 'hops' (same subgraph as retrieve_subgraph) or 'pagerank'
+            top_k: Nodes kept per query for mode='pagerank'
+            executor: None (in-process), 'thread' or 'process' to split the
+                      unique seed sets across a worker pool
+            max_workers: Pool size when an executor is used
+
+        Returns:
+            List of context strings, one per query, in input order
+        """
+        seed_keys = [tuple(sorted(set(self.seed_nodes(query, extract_entities(query)))))
+                     for query in queries]
+        unique_keys = list(dict.fromkeys(seed_keys))
+
+        if executor is None or len(unique_keys) < 2:
+            unique_contexts = self._contexts_for_seed_sets(unique_keys, max_hops, mode, top_k)
+        else:
+            pool_class = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}[executor]
+            workers = max_workers or os.cpu_count() or 1
+            chunk_size = -(-len(unique_keys) // workers)
+            chunks = [unique_keys[i:i + chunk_size] for i in range(0, len(unique_keys), chunk_size)]
+            with pool_class(max_workers=workers) as pool:
+                results = pool.map(_contexts_for_chunk, [self] * len(chunks), chunks,
+                                   [max_hops] * len(chunks), [mode] * len(chunks), [top_k] * len(chunks))
+                unique_contexts = [context for chunk in results for context in chunk]
+
+        context_by_key = dict(zip(unique_keys, unique_contexts))
+        return [context_by_key[key] for key in seed_keys]
+
+    def prefetch_batches(self, queries: list, batch_size: int = 32, **kwargs):
+        """
+        Yield (batch_queries, contexts) while the next batch is retrieved in a
+        background thread, so retrieval overlaps with generation on the caller's side.
+        """
+        batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self.retrieve_batch, batches[0], **kwargs)
+            for i, batch in enumerate(batches):
+                contexts = pending.result()
+                if i + 1 < len(batches):
+                    pending = pool.submit(self.retrieve_batch, batches[i + 1], **kwargs)
+                yield batch, contexts
+
+
+def _contexts_for_chunk(retriever, seed_sets, max_hops, mode, top_k):
+    """Module-level worker so retrieve_batch can use a process pool."""
+    return retriever._contexts_for_seed_sets(seed_sets, max_hops, mode, top_k)
+
+
+class _KGUnpickler(pickle.Unpickler):
+    """Resolve notebook-defined (__main__) KG classes to the ones in this module."""
+    def find_class(self, module, name):
+        if name in ('KnowledgeGraph', 'GraphRetriever') and module in ('__main__', __name__):
+            return globals()[name]
+        return super().find_class(module, name)
+
+
+def load_pickle(path):
+    """Load kg_graph.pkl or graph_retriever.pkl saved from the KG-QA notebook."""
+    with open(path, 'rb') as f:
+        return _KGUnpickler(f).load()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Offline lexical (BM25 / TF-IDF) index over bulletin course titles and descriptions.
+
+Used as a fallback by GraphRetriever when extract_entities finds no course
+code or known topic, e.g. "which courses teach databases?". The index is
+built once from data/bulletin_courses.csv and saved to data/lexical_index.npz.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_CSV_PATH = PROJECT_ROOT / "data" / "bulletin_courses.csv"
+DEFAULT_INDEX_PATH = PROJECT_ROOT / "data" / "lexical_index.npz"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Question words that carry no information about course content
+STOPWORDS = frozenset("""
+a about an and are as at be by can course courses cover covers covered do does
+for from how i in into is it me of on or class classes teach teaches taught
+teaching that the their there these this to what when where which who will
+with you your any offer offered offers
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercase, split on non-alphanumerics, drop stopwords and strip plurals."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    Sparse BM25 and TF-IDF matrices over course documents.
+
+    Per-document weights (BM25 length normalisation, TF-IDF L2 norms) are
+    computed at build time, so a query is a single sparse column slice and sum.
+    """
+    def __init__(self, course_codes, vocabulary, bm25_weights, tfidf_weights):
+        self.course_codes = list(course_codes)
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        # CSC so selecting the query's term columns is cheap
+        self.bm25_weights = bm25_weights.tocsc()
+        self.tfidf_weights = tfidf_weights.tocsc()
+
+    @classmethod
+    def build(cls, course_codes: list, documents: list, k1: float = 1.5, b: float = 0.75):
+        """Build the index from parallel lists of course codes and document texts."""
+        vocabulary = {}
+        rows, cols, counts = [], [], []
+        for doc_id, text in enumerate(documents):
+            term_counts = {}
+            for token in tokenize(text):
+                term_id = vocabulary.setdefault(token, len(vocabulary))
+                term_counts[term_id] = term_counts.get(term_id, 0) + 1
+            for term_id, count in term_counts.items():
+                rows.append(doc_id)
+                cols.append(term_id)
+                counts.append(count)
+
+        num_docs, num_terms = len(documents), len(vocabulary)
+        tf = sp.csr_matrix((np.asarray(counts, dtype=np.float64), (rows, cols)),
+                           shape=(num_docs, num_terms))
+
+        doc_freq = np.bincount(tf.indices, minlength=num_terms)
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if num_docs else 0.0
+
+        # BM25: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+        bm25_idf = np.log1p((num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        length_norm = k1 * (1.0 - b + b * doc_len / avg_len) if avg_len else np.full(num_docs, k1)
+        bm25 = tf.copy()
+        row_of_entry = np.repeat(np.arange(num_docs), np.diff(tf.indptr))
+        bm25.data = (bm25_idf[tf.indices] * tf.data * (k1 + 1.0)
+                     / (tf.data + length_norm[row_of_entry]))
+
+        # TF-IDF with rows pre-normalised to unit length for cosine scoring
+        tfidf_idf = np.log((1.0 + num_docs) / (1.0 + doc_freq)) + 1.0
+        tfidf = tf.copy()
+        tfidf.data = (1.0 + np.log(tf.data)) * tfidf_idf[tf.indices]
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        tfidf = sp.diags(1.0 / norms) @ tfidf
+
+        terms = sorted(vocabulary, key=vocabulary.get)
+        return cls(course_codes, terms, bm25, tfidf)
+
+    @classmethod
+    def from_csv(cls, csv_path=DEFAULT_CSV_PATH):
+        """Build the index from bulletin_courses.csv (title + description)."""
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        df = df.drop_duplicates(subset='course_code', keep='last')
+        codes = df['course_code'].astype(str).str.strip().tolist()
+        documents = (df['title'].fillna('').astype(str) + ". "
+                     + df['description'].fillna('').astype(str)).tolist()
+        return cls.build(codes, documents)
+
+    def search(self, query: str, top_k: int = 5, method: str = 'bm25') -> list:
+        """
+        Rank courses for a free-text query.
+
+        Args:
+            query: Natural-language question
+            top_k: Maximum number of results
+            method: 'bm25' or 'tfidf' (cosine similarity)
+
+        Returns:
+            List of (course_code, score) tuples, best first, scores > 0 only
+        """
+        term_ids = sorted({self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary})
+        if not term_ids or not self.course_codes:
+            return []
+        weights = self.bm25_weights if method == 'bm25' else self.tfidf_weights
+        scores = np.asarray(weights[:, term_ids].sum(axis=1)).ravel()
+        if method != 'bm25':
+            scores /= np.sqrt(len(term_ids))
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.course_codes[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Serialize the index to a single .npz file."""
+        bm25 = self.bm25_weights.tocsr()
+        tfidf = self.tfidf_weights.tocsr()
+        np.savez_compressed(
+            path,
+            course_codes=np.asarray(self.course_codes, dtype=str),
+            vocabulary=np.asarray(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str),
+            shape=np.asarray(bm25.shape),
+            bm25_data=bm25.data, bm25_indices=bm25.indices, bm25_indptr=bm25.indptr,
+            tfidf_data=tfidf.data, tfidf_indices=tfidf.indices, tfidf_indptr=tfidf.indptr,
+        )
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """Load an index written by save()."""
+        with np.load(path, allow_pickle=False) as npz:
+            shape = tuple(npz['shape'])
+            bm25 = sp.csr_matrix((npz['bm25_data'], npz['bm25_indices'], npz['bm25_indptr']), shape=shape)
+            tfidf = sp.csr_matrix((npz['tfidf_data'], npz['tfidf_indices'], npz['tfidf_indptr']), shape=shape)
+            return cls(npz['course_codes'].tolist(), npz['vocabulary'].tolist(), bm25, tfidf)
+
+
+def load_or_build(csv_path=DEFAULT_CSV_PATH, index_path=DEFAULT_INDEX_PATH):
+    """Load the serialized index, rebuilding it if the CSV is newer or it's missing."""
+    csv_path, index_path = Path(csv_path), Path(index_path)
+    if index_path.exists() and (not csv_path.exists()
+                                or index_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return LexicalIndex.load(index_path)
+    index = LexicalIndex.from_csv(csv_path)
+    index.save(index_path)
+    return index
+
+
+def main():
+    import time
+
+    print("\n" + "="*70)
+    print("🔎 Building Lexical Course Index")
+    print("="*70)
+
+    start = time.perf_counter()
+    index = LexicalIndex.from_csv(DEFAULT_CSV_PATH)
+    index.save(DEFAULT_INDEX_PATH)
+    print(f"✓ Indexed {len(index.course_codes)} courses, {len(index.vocabulary)} terms "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"✓ Saved to: {DEFAULT_INDEX_PATH}")
+
+    for query in ["Which courses teach databases?", "Is there a class on computer networks?"]:
+        start = time.perf_counter()
+        results = index.search(query, top_k=3)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n  {query}  ({elapsed:.2f} ms)")
+        for code, score in results:
+            print(f"    • {code}: {score:.3f}")
+
+if __name__ == "__main__":
+    main()
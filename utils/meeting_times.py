@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Meeting-time index for schedule conflict and availability queries.
+
+The schedule's day_time column is free text such as "M 03:45PM - 05:00PM"
+or "TR 12:45PM - 02:00PM AND TR 02:30PM - 03:20PM". parse_meeting_times
+turns it into (day, start minute, end minute) intervals, and MeetingIndex
+stores every section as a bitmap of the week in 5-minute slots (all
+scheduled times fall on 5-minute boundaries), packed 8 slots per byte:
+2016 slots, 252 bytes per section.
+
+With that layout:
+  - availability ("CSCI courses open Tuesday evenings") is a bitwise AND of
+    every section's row with a window mask, vectorized over all sections
+  - conflicts between selected sections are one matrix product of their
+    unpacked occupancy rows, so every pair is checked at once
+
+Sections without meeting times (TBA, online) never conflict and never match
+an availability window.
+
+Usage:
+    python utils/meeting_times.py conflicts "CSCI 6212" "DATS 6101"
+    python utils/meeting_times.py available --days T --after 5pm --subject CSCI --open
+    python utils/meeting_times.py parse "TR 12:45PM - 02:00PM AND TR 02:30PM - 03:20PM"
+"""
+
+import argparse
+import re
+
+import numpy as np
+
+from course_catalog import load_catalog, normalize_code
+
+DAYS = "MTWRFSU"  # GWU day letters: R = Thursday, U = Sunday
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MINUTES_PER_DAY = 24 * 60
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+WEEK_SLOTS = len(DAYS) * SLOTS_PER_DAY
+
+MEETING = re.compile(r"([MTWRFSU]+)\s+(\d{1,2}):(\d{2})\s*([AP]M)\s*-\s*(\d{1,2}):(\d{2})\s*([AP]M)", re.I)
+COURSE_CODE = re.compile(r"([A-Za-z]{2,4})\s*-?\s*(\d{4}[A-Za-z]?)")
+CLOCK = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*([ap]m)?$", re.I)
+
+_parsed = {}
+
+
+def _minutes(hour: str, minute: str, meridiem: str) -> int:
+    hour = int(hour) % 12 + (12 if meridiem.upper() == "PM" else 0)
+    return hour * 60 + int(minute)
+
+
+def parse_meeting_times(day_time: str) -> tuple:
+    """
+    Meeting intervals of a day_time string, deduplicated and sorted.
+
+    Returns:
+        Tuple of (day index into DAYS, start minute, end minute); empty for TBA/blank
+    """
+    if day_time in _parsed:
+        return _parsed[day_time]
+    meetings = set()
+    for m in MEETING.finditer(day_time or ""):
+        start = _minutes(*m.group(2, 3, 4))
+        end = _minutes(*m.group(5, 6, 7))
+        for day in m.group(1).upper():
+            meetings.add((DAYS.index(day), start, end))
+    # day_time strings are pooled by the catalog, so this cache stays small
+    _parsed[day_time] = result = tuple(sorted(meetings))
+    return result
+
+
+def parse_clock(text: str) -> int:
+    """Minute of the day for "17:00", "5pm", "5:30 PM" or "05:00PM"."""
+    m = CLOCK.match(text.strip())
+    if not m:
+        raise ValueError(f"Unrecognized time: {text!r}")
+    hour, minute, meridiem = int(m.group(1)), int(m.group(2) or 0), m.group(3)
+    if meridiem:
+        return _minutes(hour, minute, meridiem)
+    return hour * 60 + minute
+
+
+def format_meeting(meeting: tuple) -> str:
+    day, start, end = meeting
+    return f"{DAYS[day]} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+
+def occupancy(meetings) -> np.ndarray:
+    """Boolean week bitmap (WEEK_SLOTS,) of the slots the meetings touch."""
+    row = np.zeros(WEEK_SLOTS, dtype=bool)
+    for day, start, end in meetings:
+        if end <= start:  # malformed or overnight; treat as not scheduled
+            continue
+        offset = day * SLOTS_PER_DAY
+        row[offset + start // SLOT_MINUTES:offset + -(-end // SLOT_MINUTES)] = True
+    return row
+
+
+def window_mask(days: str, start: int = 0, end: int = MINUTES_PER_DAY) -> np.ndarray:
+    """Week bitmap of [start, end) minutes on each of `days` (e.g. "TR")."""
+    return occupancy((DAYS.index(day), start, end) for day in days.upper())
+
+
+class MeetingIndex:
+    """Packed weekly occupancy bitmaps of schedule sections, one row per unique CRN."""
+    def __init__(self, sections: list):
+        self.sections = list(sections)
+        self.row_of = {section.crn: i for i, section in enumerate(self.sections)}
+        self.meetings = [parse_meeting_times(section.day_time) for section in self.sections]
+        bitmaps = np.zeros((len(self.sections), WEEK_SLOTS), dtype=bool)
+        for i, meetings in enumerate(self.meetings):
+            if meetings:
+                bitmaps[i] = occupancy(meetings)
+        self.packed = np.packbits(bitmaps, axis=1)
+        self.scheduled = self.packed.any(axis=1)
+
+    @classmethod
+    def from_catalog(cls, catalog=None):
+        catalog = catalog or load_catalog()
+        return cls(catalog.by_crn.values())
+
+    def _rows(self, crns) -> np.ndarray:
+        return np.array([self.row_of[crn] for crn in crns], dtype=np.int64)
+
+    def _hits(self, mask: np.ndarray, rows=None) -> np.ndarray:
+        """Per-section "touches any slot of mask", vectorized over the packed rows."""
+        packed = self.packed if rows is None else self.packed[rows]
+        return (packed & np.packbits(mask)).any(axis=1)
+
+    def conflict_matrix(self, crns) -> np.ndarray:
+        """Symmetric boolean matrix: [i, j] is True when sections crns[i] and crns[j] overlap."""
+        rows = self._rows(crns)
+        bitmaps = np.unpackbits(self.packed[rows], axis=1, count=WEEK_SLOTS).astype(np.float32)
+        overlap = bitmaps @ bitmaps.T > 0
+        np.fill_diagonal(overlap, False)
+        return overlap
+
+    def conflicts(self, crns) -> list:
+        """(crn_a, crn_b) for every overlapping pair of the given sections."""
+        crns = list(dict.fromkeys(crns))
+        if len(crns) < 2:
+            return []
+        i, j = np.nonzero(np.triu(self.conflict_matrix(crns), k=1))
+        return [(crns[a], crns[b]) for a, b in zip(i.tolist(), j.tolist())]
+
+    def overlap(self, crn_a: str, crn_b: str) -> list:
+        """The concrete overlapping meetings of two sections, as (meeting_a, meeting_b)."""
+        return [(a, b) for a in self.meetings[self.row_of[crn_a]] for b in self.meetings[self.row_of[crn_b]]
+                if a[0] == b[0] and a[1] < b[2] and b[1] < a[2]]
+
+    def available(self, days: str, after: int = 0, before: int = MINUTES_PER_DAY, only_days: bool = False,
+                  crns=None) -> list:
+        """
+        Sections meeting on any of `days` with all of those days' meetings inside [after, before).
+
+        With only_days, sections that also meet on other days are dropped.
+        `crns` restricts the search (e.g. to one subject's open sections).
+        """
+        rows = None if crns is None else self._rows(crns)
+        on_days = window_mask(days)
+        outside = on_days & ~window_mask(days, after, before)
+        keep = self._hits(on_days, rows) & ~self._hits(outside, rows)
+        if only_days:
+            keep &= ~self._hits(~on_days, rows)
+        selected = np.flatnonzero(keep) if rows is None else rows[keep]
+        return [self.sections[i] for i in selected.tolist()]
+
+    def busy(self, crns) -> np.ndarray:
+        """Week bitmap of the slots taken by the given sections (e.g. a student's schedule)."""
+        rows = self._rows(crns)
+        return np.unpackbits(np.bitwise_or.reduce(self.packed[rows], axis=0), count=WEEK_SLOTS).astype(bool)
+
+    def compatible_with(self, crns, candidates=None) -> list:
+        """Sections (optionally among `candidates`) that fit around the given schedule."""
+        rows = None if candidates is None else self._rows(candidates)
+        keep = ~self._hits(self.busy(crns), rows)
+        scheduled = self.scheduled if rows is None else self.scheduled[rows]
+        selected = np.flatnonzero(keep & scheduled) if rows is None else rows[keep & scheduled]
+        return [self.sections[i] for i in selected.tolist()]
+
+
+def _days_arg(text: str) -> str:
+    days = text.upper()
+    if not days or any(day not in DAYS for day in days):
+        raise argparse.ArgumentTypeError(f"expected letters from {DAYS} (R = Thursday, U = Sunday), got {text!r}")
+    return days
+
+
+def _clock_arg(text: str) -> int:
+    try:
+        return parse_clock(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _describe(section, meetings) -> str:
+    times = ", ".join(format_meeting(m) for m in meetings) or "no meeting time"
+    return f"{section.course_code} (CRN {section.crn}, {section.status}) {section.title}: {times}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule conflict and availability queries.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    conflicts_parser = subparsers.add_parser("conflicts", help="Overlapping sections of courses/CRNs")
+    conflicts_parser.add_argument("courses", nargs="+", help='Course codes ("CSCI 6212") or CRNs')
+    available_parser = subparsers.add_parser("available", help="Sections inside a weekly time window")
+    available_parser.add_argument("--days", required=True, type=_days_arg,
+                                  help="Day letters, e.g. T or MW (R = Thursday)")
+    available_parser.add_argument("--after", default="0:00", type=_clock_arg, help="Earliest start, e.g. 5pm or 17:00")
+    available_parser.add_argument("--before", default="24:00", type=_clock_arg, help="Latest end, e.g. 10pm")
+    available_parser.add_argument("--only-days", action="store_true", help="Skip sections meeting on other days")
+    available_parser.add_argument("--subject", action="append", help="Only these subjects (repeatable)")
+    available_parser.add_argument("--open", action="store_true", help="Only OPEN sections")
+    parse_parser = subparsers.add_parser("parse", help="Show how a day_time string is parsed")
+    parse_parser.add_argument("day_time")
+    args = parser.parse_args()
+
+    if args.command == "parse":
+        for meeting in parse_meeting_times(args.day_time):
+            print(f"{DAY_NAMES[meeting[0]]:<10}{format_meeting(meeting)[2:]}")
+        return
+
+    catalog = load_catalog()
+    index = MeetingIndex.from_catalog(catalog)
+
+    if args.command == "conflicts":
+        crns = []
+        for item in args.courses:
+            if item in index.row_of:
+                crns.append(item)
+                continue
+            m = COURSE_CODE.fullmatch(normalize_code(item))
+            sections = catalog.by_code.get(f"{m.group(1)} {m.group(2)}".upper(), []) if m else []
+            if not sections:
+                print(f"⚠ {item}: no sections in the schedule")
+            crns.extend(section.crn for section in sections)
+        pairs = [(a, b) for a, b in index.conflicts(crns)
+                 if index.sections[index.row_of[a]].course_code != index.sections[index.row_of[b]].course_code]
+        if not pairs:
+            print(f"✓ No conflicts between the {len(crns)} sections")
+        for a, b in pairs:
+            section_a, section_b = index.sections[index.row_of[a]], index.sections[index.row_of[b]]
+            when = "; ".join(f"{format_meeting(x)} / {format_meeting(y)}" for x, y in index.overlap(a, b))
+            print(f"❌ {section_a.course_code} (CRN {a}) conflicts with {section_b.course_code} (CRN {b}): {when}")
+
+    elif args.command == "available":
+        candidates = [section.crn for section in index.sections
+                      if (not args.subject or section.subject in args.subject)
+                      and (not args.open or section.status == "OPEN")]
+        sections = index.available(args.days, args.after, args.before,
+                                   only_days=args.only_days, crns=candidates)
+        for section in sections:
+            print(_describe(section, index.meetings[index.row_of[section.crn]]))
+        print(f"✓ {len(sections)} of {len(candidates)} sections")
+
+if __name__ == "__main__":
+    main()
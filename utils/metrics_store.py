@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Append-only store of training curves with downsampled frontend exports.
+
+Each training run is a directory under data/metrics_store/ holding one
+float64 column file per metric (step, epoch, train_loss, eval_loss,
+learning_rate) plus meta.json. Ingesting a trainer's log_history only
+appends the entries not seen before, so a notebook can call it after every
+evaluation, or once at the end, and re-running an ingest is a no-op.
+
+The export writes public/data/training_metrics.json (the file the results
+page loads) from the latest run of each approach, with every curve reduced
+to a fixed point budget by Largest-Triangle-Three-Buckets, which keeps the
+peaks and dips a uniform stride would drop. Its size no longer grows with
+run length or run count.
+
+Usage (notebook, after trainer.train()):
+    from metrics_store import MetricsStore
+    MetricsStore().ingest_log_history("optimized", trainer.state.log_history,
+                                      final_metrics={"final_loss": ..., "training_time_minutes": ...})
+
+Usage (CLI):
+    python utils/metrics_store.py ingest public/data/kg_training_metrics.json
+    python utils/metrics_store.py list
+    python utils/metrics_store.py export --points 300
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+STORE_DIR = PROJECT_ROOT / 'data' / 'metrics_store'
+TRAINING_METRICS_PATH = PROJECT_ROOT / 'public' / 'data' / 'training_metrics.json'
+
+COLUMNS = ("step", "epoch", "train_loss", "eval_loss", "learning_rate")
+DTYPE = np.dtype('<f8')
+DEFAULT_POINTS = 300
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def _number(value):
+    return None if value is None or (isinstance(value, float) and math.isnan(value)) else value
+
+
+class MetricsStore:
+    """Runs of columnar, append-only training curves."""
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+
+    def _run_dir(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    def load_meta(self, run_id: str) -> dict:
+        with open(self._run_dir(run_id) / 'meta.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self, meta: dict):
+        path = self._run_dir(meta["run_id"]) / 'meta.json'
+        tmp_path = path.with_name(f".meta.json.tmp-{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+
+    def runs(self, approach: str = None) -> list:
+        """Metadata of every run (optionally one approach's), oldest first."""
+        if not self.root.exists():
+            return []
+        metas = [self.load_meta(p.name) for p in self.root.iterdir() if (p / 'meta.json').exists()]
+        metas = [m for m in metas if approach is None or m["approach"] == approach]
+        return sorted(metas, key=lambda m: (m["created_at"], m["run_id"]))
+
+    def create_run(self, approach: str, run_id: str = None, name: str = None, source: str = None) -> str:
+        run_id = run_id or f"{approach}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        run_dir = self._run_dir(run_id)
+        if (run_dir / 'meta.json').exists():
+            return run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        for column in COLUMNS:
+            (run_dir / f"{column}.f64").touch()
+        self._save_meta({"run_id": run_id, "approach": approach, "name": name or approach,
+                         "created_at": datetime.now().isoformat(), "source": source,
+                         "ingested_entries": 0, "final_metrics": {}})
+        return run_id
+
+    def append(self, run_id: str, rows: list):
+        """Append rows (dicts keyed by COLUMNS; missing values become NaN) to every column file."""
+        if not rows:
+            return
+        run_dir = self._run_dir(run_id)
+        for column in COLUMNS:
+            values = np.array([np.nan if _number(row.get(column)) is None else row[column] for row in rows],
+                              dtype=DTYPE)
+            with open(run_dir / f"{column}.f64", 'ab') as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, run_id: str) -> dict:
+        """Column name -> array. A column left longer by an interrupted append is cut to the shortest."""
+        run_dir = self._run_dir(run_id)
+        columns = {column: np.fromfile(run_dir / f"{column}.f64", dtype=DTYPE) for column in COLUMNS}
+        n = min(len(values) for values in columns.values())
+        return {column: values[:n] for column, values in columns.items()}
+
+    def ingest_log_history(self, approach: str, log_history: list, run_id: str = None, name: str = None,
+                           final_metrics: dict = None, source: str = None) -> str:
+        """
+        Append the log_history entries this run hasn't seen yet.
+
+        Accepts Hugging Face Trainer entries ("loss", "eval_loss", ...) as well
+        as the exported metrics format ("train_loss", "val_loss"). The
+        trainer's closing summary entry (train_runtime etc.) is skipped.
+
+        Returns:
+            The run id
+        """
+        run_id = self.create_run(approach, run_id, name, source)
+        meta = self.load_meta(run_id)
+        rows = []
+        for position, entry in enumerate(log_history[meta["ingested_entries"]:], meta["ingested_entries"]):
+            if "train_runtime" in entry:
+                continue
+            rows.append({
+                "step": entry.get("step", position + 1),
+                "epoch": entry.get("epoch"),
+                "train_loss": entry.get("loss", entry.get("train_loss")),
+                "eval_loss": entry.get("eval_loss", entry.get("val_loss")),
+                "learning_rate": entry.get("learning_rate"),
+            })
+        self.append(run_id, rows)
+        meta["ingested_entries"] = len(log_history)
+        if final_metrics:
+            meta["final_metrics"].update(final_metrics)
+        self._save_meta(meta)
+        return run_id
+
+    def ingest_metrics_file(self, path) -> list:
+        """
+        Import every approach of an exported metrics JSON ({"approaches": {...}}).
+
+        The run id includes a hash of the approach's data, so importing the
+        same file again adds nothing.
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        run_ids = []
+        for approach, entry in data.get("approaches", {}).items():
+            digest = hashlib.sha256(json.dumps(entry, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+            run_id = f"{approach}-{digest}"
+            if not (self._run_dir(run_id) / 'meta.json').exists():
+                self.ingest_log_history(approach, entry.get("epochs", []), run_id=run_id, name=entry.get("name"),
+                                        final_metrics=entry.get("final_metrics"), source=Path(path).name)
+            run_ids.append(run_id)
+        return run_ids
+
+    def latest_runs(self) -> dict:
+        """Approach -> id of its most recently created run."""
+        return {meta["approach"]: meta["run_id"] for meta in self.runs()}
+
+    def export_run(self, run_id: str, points: int = DEFAULT_POINTS) -> dict:
+        """One run in the frontend's approach format, each curve reduced to at most `points` points."""
+        meta = self.load_meta(run_id)
+        columns = self.read(run_id)
+        step = columns["step"]
+
+        train = np.flatnonzero(~np.isnan(columns["train_loss"]))
+        train = train[lttb(step[train], columns["train_loss"][train], points)]
+        epochs = [{"step": int(step[i]),
+                   "epoch": _number(float(columns["epoch"][i])),
+                   "train_loss": round(float(columns["train_loss"][i]), 4),
+                   "learning_rate": _number(float(columns["learning_rate"][i]))} for i in train]
+
+        evals = np.flatnonzero(~np.isnan(columns["eval_loss"]))
+        evals = evals[lttb(step[evals], columns["eval_loss"][evals], points)]
+        eval_points = [{"step": int(step[i]), "epoch": _number(float(columns["epoch"][i])),
+                        "val_loss": round(float(columns["eval_loss"][i]), 4)} for i in evals]
+
+        epoch_values = columns["epoch"][~np.isnan(columns["epoch"])]
+        result = {
+            "name": meta["name"],
+            "run_id": run_id,
+            "total_points": int(len(step)),
+            "num_epochs": int(len(np.unique(np.floor(epoch_values)))),
+            "epochs": epochs,
+            "final_metrics": meta["final_metrics"],
+        }
+        if eval_points:
+            result["eval"] = eval_points
+        return result
+
+    def export(self, output_path: Path = TRAINING_METRICS_PATH, points: int = DEFAULT_POINTS,
+               approaches: list = None) -> dict:
+        """Write the latest run of each approach (or only `approaches`) as compact JSON."""
+        latest = self.latest_runs()
+        names = approaches or list(latest)
+        data = {
+            "approaches": {name: self.export_run(latest[name], points) for name in names if name in latest},
+            "_metadata": {
+                "note": f"Latest run per approach from data/metrics_store, curves downsampled to "
+                        f"<= {points} points (LTTB)",
+                "exported_at": datetime.now().isoformat(),
+                "runs": {name: latest[name] for name in names if name in latest},
+            },
+        }
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp-{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, output_path)
+        return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append-only training metrics store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Import exported metrics JSON files")
+    ingest_parser.add_argument("files", nargs="+")
+    subparsers.add_parser("list", help="List stored runs")
+    export_parser = subparsers.add_parser("export", help="Write downsampled training_metrics.json")
+    export_parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="Max points per curve")
+    export_parser.add_argument("--approach", action="append", help="Only export these approaches")
+    export_parser.add_argument("--output", default=str(TRAINING_METRICS_PATH))
+    args = parser.parse_args()
+
+    store = MetricsStore()
+    if args.command == "ingest":
+        for path in args.files:
+            print(f"✓ {path}: {', '.join(store.ingest_metrics_file(path))}")
+    elif args.command == "list":
+        latest = set(store.latest_runs().values())
+        for meta in store.runs():
+            rows = len(store.read(meta["run_id"])["step"])
+            print(f"{'*' if meta['run_id'] in latest else ' '} {meta['run_id']:<32}{meta['approach']:<12}"
+                  f"{rows:>7} rows  {meta['created_at']}")
+    elif args.command == "export":
+        data = store.export(Path(args.output), args.points, args.approach)
+        size = Path(args.output).stat().st_size
+        for name, approach in data["approaches"].items():
+            print(f"✓ {name}: {approach['total_points']} -> {len(approach['epochs'])} points")
+        print(f"✓ Saved {args.output} ({size / 1024:.1f} KB)")
+        if Path(args.output).resolve().parent == TRAINING_METRICS_PATH.parent.resolve():
+            from build_assets import refresh_assets
+            refresh_assets(TRAINING_METRICS_PATH.parent)
+
+if __name__ == "__main__":
+    main()
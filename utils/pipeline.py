@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+The data/export pipeline as declared stages with their inputs and outputs.
+
+    scrape_courses.py      -> data/spring_2026_courses.csv, data/bulletin_courses.csv
+    prepare_dataset.py     -> data/course_finetune.jsonl
+    convert_kg_to_json.py  -> public/data/{knowledge_graph,*_map}.json
+    data_prep.py           -> public/data/{training_metrics,model_comparison}.json
+    sync_data_to_public.py -> public/data/ copies of data/ files
+    build_assets.py        -> public/data/assets/, asset_manifest.json
+
+A stage depends on every stage that produces one of its inputs; each
+stage's own script counts as an input, so editing a script reruns it.
+
+Watch mode polls the stat() of every stage input, waits for a burst of
+changes to settle (debounce), then reruns only the stages reading a changed
+file plus everything downstream of them, printing the time each one took.
+Scraping hits the network, so it never runs from watch mode.
+
+`run` brings stages up to date: a stage is skipped when the SHA-256 of
+its inputs, its arguments and its outputs all match its last successful
+run (data/.pipeline_state.json). Stages start as soon as their upstream
+stages finish, so independent branches (KG export, metrics merge, dataset
+prep) run in parallel subprocesses, and the report at the end shows the
+critical path, the chain of stages that bounds the wall time.
+
+Usage:
+    python utils/pipeline.py list
+    python utils/pipeline.py run                  # everything except scraping
+    python utils/pipeline.py run assets --force   # one stage and its upstream
+    python utils/pipeline.py watch --debounce 1.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from build_assets import DEFER_ASSETS_ENV
+from sync_data_to_public import FRONTEND_DATA_FILES, file_sha256, load_json, write_json_atomic
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Input/output hashes of each stage's last successful run
+STATE_PATH = PROJECT_ROOT / 'data' / '.pipeline_state.json'
+
+
+class Stage:
+    """One pipeline step: a script run from the project root, with input/output paths or globs."""
+    def __init__(self, name: str, script: str, inputs: list, outputs: list, args: list = (),
+                 manual: bool = False):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        # Manual stages (network access) only run when asked for by name
+        self.manual = manual
+
+    def command(self, extra_args: list = ()) -> list:
+        return [sys.executable, str(PROJECT_ROOT / self.script), *self.args, *extra_args]
+
+    def output_paths(self) -> list:
+        return [PROJECT_ROOT / output for output in self.outputs]
+
+    def input_paths(self) -> list:
+        """Script plus inputs, globs expanded; the stage's own outputs never count as inputs."""
+        outputs = set(self.output_paths())
+        paths = [PROJECT_ROOT / self.script]
+        for pattern in self.inputs:
+            if any(c in pattern for c in "*?["):
+                paths.extend(sorted(PROJECT_ROOT.glob(pattern)))
+            else:
+                paths.append(PROJECT_ROOT / pattern)
+        return [p for p in dict.fromkeys(paths) if p not in outputs]
+
+
+# In dependency order
+STAGES = [
+    Stage("scrape", "utils/scrape_courses.py", [],
+          ["data/spring_2026_courses.csv", "data/bulletin_courses.csv"], manual=True),
+    Stage("prepare", "utils/prepare_dataset.py",
+          ["data/spring_2026_courses.csv", "data/bulletin_courses.csv", "utils/course_catalog.py"],
+          ["data/course_finetune.jsonl"]),
+    Stage("export_kg", "utils/convert_kg_to_json.py", ["utils/kg_graph.pkl"],
+          ["public/data/knowledge_graph.json", "public/data/prerequisites_map.json",
+           "public/data/topics_map.json", "public/data/instructors_map.json"]),
+    Stage("merge_metrics", "data_prep.py",
+          ["public/data/standard_training_metrics.json", "public/data/optimized_ft_training_metrics.json",
+           "public/data/kg_training_metrics.json", "notebooks/*.ipynb", "utils/metrics_store.py",
+           "utils/run_registry.py"],
+          ["public/data/training_metrics.json", "public/data/model_comparison.json"]),
+    Stage("sync", "utils/sync_data_to_public.py", [f"data/{name}" for name in FRONTEND_DATA_FILES],
+          [f"public/data/{name}" for name in FRONTEND_DATA_FILES] + ["public/data/data_manifest.json"],
+          args=["--no-assets"]),
+    Stage("assets", "utils/build_assets.py",
+          ["public/data/*.json", "public/data/*.jsonl", "public/data/*.csv"],
+          ["public/data/asset_manifest.json"]),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def dependencies(stages: list = STAGES) -> dict:
+    """Stage name -> names of the earlier stages producing one of its inputs."""
+    producers = {}
+    deps = {}
+    for stage in stages:
+        inputs = set(stage.input_paths())
+        deps[stage.name] = sorted({producers[p] for p in inputs if p in producers})
+        for path in stage.output_paths():
+            producers[path] = stage.name
+    return deps
+
+
+def affected_stages(changed: set, stages: list = STAGES) -> list:
+    """Non-manual stages reading a changed path, plus everything downstream of them, in order."""
+    deps = dependencies(stages)
+    dirty = set()
+    for stage in stages:
+        if stage.manual:
+            continue
+        if changed.intersection(stage.input_paths()) or dirty.intersection(deps[stage.name]):
+            dirty.add(stage.name)
+    return [stage for stage in stages if stage.name in dirty]
+
+
+def run_stage(stage: Stage, quiet: bool = False, extra_args: list = ()) -> dict:
+    """Run one stage as a subprocess from the project root."""
+    start = time.perf_counter()
+    proc = subprocess.run(stage.command(extra_args), cwd=PROJECT_ROOT, env={**os.environ, DEFER_ASSETS_ENV: "1"},
+                          stdout=subprocess.PIPE if quiet else None, stderr=subprocess.STDOUT if quiet else None,
+                          text=True)
+    return {"stage": stage.name, "returncode": proc.returncode, "seconds": time.perf_counter() - start,
+            "output": proc.stdout if quiet else None}
+
+
+def fingerprint(paths) -> dict:
+    """Project-relative path -> SHA-256 of its content (None if missing)."""
+    return {str(path.relative_to(PROJECT_ROOT)): file_sha256(path) if path.exists() else None
+            for path in paths}
+
+
+def execute_stage(stage: Stage, previous: dict, force: bool, quiet: bool, t0: float,
+                  extra_args: list = ()) -> dict:
+    """
+    Run a stage unless its inputs, arguments and outputs match its last successful run.
+
+    Inputs are hashed when the stage is about to start, i.e. after its
+    upstream stages have written them, so an upstream rerun that produces
+    identical files doesn't force this stage to run.
+    """
+    start = time.perf_counter()
+    inputs = fingerprint(stage.input_paths())
+    if (not force and previous and previous.get("inputs") == inputs and previous.get("args") == stage.args
+            and previous.get("outputs") == fingerprint(stage.output_paths())):
+        return {"stage": stage.name, "status": "cached", "returncode": 0, "start": start - t0,
+                "seconds": time.perf_counter() - start, "output": None}
+
+    result = run_stage(stage, quiet=quiet, extra_args=extra_args)
+    result.update({"status": "ran" if result["returncode"] == 0 else "failed", "start": start - t0,
+                   "seconds": time.perf_counter() - start})
+    if result["returncode"] == 0:
+        result["record"] = {"inputs": inputs, "outputs": fingerprint(stage.output_paths()), "args": stage.args}
+    return result
+
+
+def select_stages(names: list = None) -> list:
+    """
+    The named stages plus everything upstream of them, in order.
+
+    With no names, all non-manual stages. Manual stages (scrape) are only
+    included when named explicitly.
+    """
+    if not names:
+        return [stage for stage in STAGES if not stage.manual]
+    unknown = [name for name in names if name not in STAGES_BY_NAME]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES_BY_NAME)})")
+    deps = dependencies()
+    selected = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name in selected:
+            continue
+        selected.add(name)
+        todo.extend(d for d in deps[name] if not STAGES_BY_NAME[d].manual or d in names)
+    return [stage for stage in STAGES if stage.name in selected]
+
+
+def run_pipeline(stages: list, jobs: int = 4, force: bool = False, quiet: bool = True,
+                 extra_args: list = ()) -> list:
+    """
+    Run stages as soon as their upstream stages finish, up to `jobs` at a
+    time, skipping stages whose input hashes are unchanged since their last
+    successful run. A failure skips everything downstream of it.
+    extra_args (e.g. --profile) are passed to every stage without affecting
+    the cache.
+
+    Returns:
+        Per-stage result dicts in completion order
+    """
+    deps = dependencies()
+    selected = {stage.name for stage in stages}
+    state = load_json(STATE_PATH, {})
+    results = {}
+    pending = list(stages)
+    running = {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for stage in list(pending):
+                upstream = [d for d in deps[stage.name] if d in selected]
+                if any(d not in results for d in upstream):
+                    continue
+                pending.remove(stage)
+                if any(results[d]["status"] in ("failed", "skipped") for d in upstream):
+                    now = time.perf_counter() - t0
+                    results[stage.name] = {"stage": stage.name, "status": "skipped", "returncode": None,
+                                           "start": now, "seconds": 0.0, "output": None}
+                    print(f"  ⚠ {stage.name:<14} skipped (upstream failed)")
+                    continue
+                future = pool.submit(execute_stage, stage, state.get(stage.name), force, quiet, t0,
+                                     extra_args)
+                running[future] = stage
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                result = future.result()
+                results[stage.name] = result
+                record = result.pop("record", None)
+                if record is not None:
+                    state[stage.name] = record
+                if result["status"] == "cached":
+                    print(f"  = {stage.name:<14} {result['seconds']:8.2f}s (inputs unchanged)")
+                elif result["status"] == "ran":
+                    print(f"  ✓ {stage.name:<14} {result['seconds']:8.2f}s")
+                else:
+                    print(f"  ❌ {stage.name:<14} {result['seconds']:8.2f}s (exit {result['returncode']})")
+                    if result["output"]:
+                        print("     " + "\n     ".join(result["output"].rstrip().splitlines()[-10:]))
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(STATE_PATH, state)
+    return list(results.values())
+
+
+def critical_path(results: list) -> tuple:
+    """
+    Longest chain of dependent stages by duration: the lower bound on wall
+    time no amount of parallelism can beat.
+
+    Returns:
+        (stage names along the path, total seconds)
+    """
+    deps = dependencies()
+    by_name = {r["stage"]: r for r in results}
+    finish, previous = {}, {}
+    for stage in STAGES:
+        if stage.name not in by_name:
+            continue
+        upstream = [d for d in deps[stage.name] if d in finish]
+        before = max(upstream, key=finish.get, default=None)
+        previous[stage.name] = before
+        finish[stage.name] = by_name[stage.name]["seconds"] + (finish[before] if before else 0.0)
+    if not finish:
+        return [], 0.0
+    name = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name:
+        path.append(name)
+        name = previous[name]
+    return path[::-1], total
+
+
+def print_report(results: list, wall_seconds: float):
+    by_name = {r["stage"]: r for r in results}
+    path, path_seconds = critical_path(results)
+    print("\n" + "="*70)
+    print("⏱  PIPELINE REPORT")
+    print("="*70)
+    print(f"{'Stage':<16}{'Status':<10}{'Start s':>10}{'Time s':>10}  {'Critical'}")
+    for stage in STAGES:
+        result = by_name.get(stage.name)
+        if result:
+            mark = "*" if stage.name in path else ""
+            print(f"{stage.name:<16}{result['status']:<10}{result['start']:>10.2f}{result['seconds']:>10.2f}  {mark}")
+    print("-"*70)
+    print("Critical path: " + " -> ".join(f"{name} ({by_name[name]['seconds']:.2f}s)" for name in path)
+          + f" = {path_seconds:.2f}s")
+    serial = sum(r["seconds"] for r in results)
+    print(f"Wall time: {wall_seconds:.2f}s (stages add up to {serial:.2f}s)")
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("Stages: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    print("="*70)
+
+
+def snapshot(paths) -> dict:
+    """path -> (mtime_ns, size), or None for missing files."""
+    state = {}
+    for path in paths:
+        try:
+            st = path.stat()
+            state[path] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            state[path] = None
+    return state
+
+
+def watched_paths(stages: list = STAGES) -> list:
+    return sorted({p for stage in stages if not stage.manual for p in stage.input_paths()})
+
+
+def watch(interval: float = 0.5, debounce: float = 1.0, jobs: int = 4, quiet: bool = True):
+    """Poll stage inputs and rerun the affected stages once changes have been quiet for `debounce` seconds."""
+    state = snapshot(watched_paths())
+    print(f"👀 Watching {len(state)} files (poll {interval}s, debounce {debounce}s); Ctrl+C to stop")
+    pending = set()
+    last_change = None
+    while True:
+        time.sleep(interval)
+        current = snapshot(watched_paths())
+        changed = {p for p in current.keys() | state.keys() if current.get(p) != state.get(p)}
+        if changed:
+            pending |= changed
+            last_change = time.monotonic()
+            state = current
+            continue
+        if not pending or time.monotonic() - last_change < debounce:
+            continue
+
+        stages = affected_stages(pending)
+        names = ", ".join(sorted(str(p.relative_to(PROJECT_ROOT)) for p in pending))
+        print(f"\n🔄 Changed: {names}")
+        print(f"   Rebuilding: {' -> '.join(s.name for s in stages) or 'nothing'}")
+        start = time.perf_counter()
+        results = run_pipeline(stages, jobs=jobs, quiet=quiet)
+        print(f"   Done in {time.perf_counter() - start:.2f}s "
+              f"({sum(r['returncode'] == 0 for r in results)}/{len(stages)} stages ok)")
+        pending.clear()
+
+        # Files the stages just wrote aren't new edits; anything else that
+        # changed while they ran is picked up on the next poll
+        after = snapshot(watched_paths())
+        written = {p for stage in stages for p in stage.output_paths()}
+        state = {p: (after.get(p) if p in written else state.get(p, after.get(p))) for p in after}
+
+
+def print_stages():
+    deps = dependencies()
+    print(f"{'Stage':<15}{'Script':<32}{'Depends on'}")
+    for stage in STAGES:
+        note = " (manual)" if stage.manual else ""
+        print(f"{stage.name:<15}{stage.script:<32}{', '.join(deps[stage.name]) or '-'}{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data/export pipeline, or watch its inputs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="Show stages and their dependencies")
+    run_parser = subparsers.add_parser("run", help="Run stages whose inputs changed since their last run")
+    run_parser.add_argument("stages", nargs="*", help="Stages to bring up to date (default: all but scrape)")
+    run_parser.add_argument("--jobs", type=int, default=4, help="Independent stages to run at once")
+    run_parser.add_argument("--force", action="store_true", help="Run even if inputs are unchanged")
+    run_parser.add_argument("--verbose", action="store_true", help="Show stage output")
+    run_parser.add_argument("--profile", action="store_true",
+                            help="Have every stage that runs write a profiling report (see profiling.py)")
+    watch_parser = subparsers.add_parser("watch", help="Rebuild affected stages when their inputs change")
+    watch_parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    watch_parser.add_argument("--debounce", type=float, default=1.0,
+                              help="Seconds without further changes before rebuilding")
+    watch_parser.add_argument("--jobs", type=int, default=4, help="Independent stages to run at once")
+    watch_parser.add_argument("--verbose", action="store_true", help="Show stage output")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print_stages()
+    elif args.command == "run":
+        try:
+            stages = select_stages(args.stages)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"🚀 Running {len(stages)} stages with up to {args.jobs} in parallel")
+        start = time.perf_counter()
+        results = run_pipeline(stages, jobs=args.jobs, force=args.force, quiet=not args.verbose,
+                               extra_args=["--profile"] if args.profile else [])
+        print_report(results, time.perf_counter() - start)
+        if any(r["status"] == "failed" for r in results):
+            sys.exit(1)
+    elif args.command == "watch":
+        try:
+            watch(args.interval, args.debounce, jobs=args.jobs, quiet=not args.verbose)
+        except KeyboardInterrupt:
+            print("\n✓ Stopped watching")
+
+if __name__ == "__main__":
+    main()
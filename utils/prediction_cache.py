@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+On-disk prediction cache for model evaluation.
+
+Entries are keyed by (model id + revision, hash of the rendered prompt
+tokens, generation parameters) and store the completion, generated token
+count and timing. Re-running an evaluation after changing only the metrics
+code, or only one of the models, then costs a SQLite lookup per prompt
+instead of a GPU generation. Local model directories have no Hub commit
+hash; their revision is a hash of the weight files' size and mtime instead.
+
+Usage:
+    python utils/prediction_cache.py            # show cache statistics
+    python utils/prediction_cache.py --clear    # delete all entries
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_CACHE_PATH = PROJECT_ROOT / "data" / "prediction_cache.sqlite3"
+# Files that identify a local model's weights when there is no Hub revision
+WEIGHT_PATTERNS = ("*.safetensors", "*.bin", "*.pt", "*.pth", "*.gguf", "config.json", "adapter_config.json")
+
+
+def prompt_hash(token_ids: list) -> str:
+    """Stable hash of a rendered, tokenized prompt."""
+    return hashlib.sha256(json.dumps(list(token_ids), separators=(",", ":")).encode('utf-8')).hexdigest()
+
+
+def local_revision(model_path) -> str:
+    """
+    Stand-in revision for a local model directory, which has no Hub commit hash.
+
+    Hashes the name, size and mtime of the weight and config files, so
+    retraining into the same directory invalidates its cached predictions.
+    Returns None when model_path is not a local directory.
+    """
+    path = Path(model_path)
+    if not path.is_dir():
+        return None
+    files = sorted(f for pattern in WEIGHT_PATTERNS for f in path.glob(pattern))
+    digest = hashlib.sha256()
+    for f in dict.fromkeys(files):
+        stat = f.stat()
+        digest.update(f"{f.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return f"local-{digest.hexdigest()[:16]}"
+
+
+def cache_key(model_id: str, revision: str, prompt_sha: str, params: dict) -> str:
+    payload = json.dumps({"model": model_id, "revision": revision or "", "prompt": prompt_sha,
+                          "params": params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """SQLite-backed store of completions keyed by model, prompt and decoding config."""
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                revision TEXT,
+                prompt_sha TEXT NOT NULL,
+                params TEXT NOT NULL,
+                completion TEXT NOT NULL,
+                generated_tokens INTEGER,
+                seconds REAL,
+                created_at REAL
+            )
+        """)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list) -> dict:
+        """Look up many keys at once; returns {key: (completion, generated_tokens, seconds)}."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, completion, generated_tokens, seconds FROM predictions "
+                f"WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, completion, tokens, seconds in rows:
+                found[key] = (completion, tokens, seconds)
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, entries: list):
+        """
+        Store entries of (key, model_id, revision, prompt_sha, params,
+        completion, generated_tokens, seconds).
+        """
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(key, model_id, revision, sha, json.dumps(params, sort_keys=True), completion, tokens, seconds, now)
+             for key, model_id, revision, sha, params, completion, tokens, seconds in entries]
+        )
+        self.conn.commit()
+
+    def stats(self) -> dict:
+        rows = self.conn.execute(
+            "SELECT model_id, revision, COUNT(*), SUM(seconds) FROM predictions GROUP BY model_id, revision"
+        ).fetchall()
+        return {
+            "path": str(self.path),
+            "models": [{"model_id": m, "revision": r, "entries": n, "generation_seconds": s or 0.0}
+                       for m, r, n, s in rows],
+        }
+
+    def clear(self, model_id: str = None):
+        if model_id:
+            self.conn.execute("DELETE FROM predictions WHERE model_id = ?", (model_id,))
+        else:
+            self.conn.execute("DELETE FROM predictions")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the evaluation prediction cache.")
+    parser.add_argument("--path", default=str(DEFAULT_CACHE_PATH))
+    parser.add_argument("--clear", action="store_true")
+    parser.add_argument("--model", default=None, help="Only clear entries for this model id")
+    args = parser.parse_args()
+
+    cache = PredictionCache(args.path)
+    if args.clear:
+        cache.clear(args.model)
+        print(f"✓ Cleared {'entries for ' + args.model if args.model else 'all entries'}")
+    stats = cache.stats()
+    print(f"Cache: {stats['path']}")
+    for entry in stats["models"]:
+        print(f"  • {entry['model_id']}@{entry['revision'] or '-'}: {entry['entries']} predictions "
+              f"({entry['generation_seconds']:.1f}s of generation saved per rerun)")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,40 @@
+import argparse
 import json
-import os
 from pathlib import Path
 
-import pandas as pd
+from course_catalog import load_catalog, normalize_code
+from profiling import add_profile_args, enable_from_args, stage
 
 # Get project root directory (parent of utils/)
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
+# Empty schedule cells used to come through pandas as NaN and reach the
+# examples as "nan"; kept so the dataset the models were trained on is unchanged
+EMPTY_CELL = "nan"
+
 def get_data_path(filename):
     """Get path to a file in the data/ directory, relative to project root."""
     return PROJECT_ROOT / "data" / filename
 
-def load_descriptions():
-    """Loads course descriptions from bulletin_courses.csv if available."""
-    path = get_data_path("bulletin_courses.csv")
+def load_descriptions(catalog=None):
+    """Loads course descriptions from bulletin_courses.csv (via the shared course catalog)."""
+    if catalog is None:
+        catalog = load_catalog()
     descriptions = {}
     subject_info = {}
 
-    if os.path.exists(path):
-        try:
-            df = pd.read_csv(path)
-            # Normalize course code to match spring_2026 format (e.g. "CSCI 1010")
-            for _, row in df.iterrows():
-                code = str(row['course_code']).strip()
-                desc = str(row['description']).strip()
-                descriptions[code] = desc
-
-                # Track subject info for better prompts
-                if 'subject' in row:
-                    subject = str(row['subject']).strip()
-                    subject_info[subject] = subject_info.get(subject, 0) + 1
-
-            print(f"Loaded {len(descriptions)} descriptions from bulletin.")
-            if subject_info:
-                print(f"Subjects found: {dict(subject_info)}")
-        except Exception as e:
-            print(f"Error loading descriptions: {e}")
+    for code, course in catalog.courses.items():
+        descriptions[code] = course.description
+
+        # Track subject info for better prompts
+        if course.subject:
+            subject_info[course.subject] = subject_info.get(course.subject, 0) + 1
+
+    if descriptions:
+        print(f"Loaded {len(descriptions)} descriptions from bulletin.")
+    if subject_info:
+        print(f"Subjects found: {dict(subject_info)}")
     return descriptions, subject_info
 
 def create_chat_message(row, descriptions, subjects_list):
@@ -46,14 +44,8 @@ def create_chat_message(row, descriptions, subjects_list):
     # Get course code (now directly from the new format)
     course_code = str(row.get('course_code', row.get('subject_code', ''))).strip()
 
-    # Fallback: Clean if it looks like "CSCI CSCI 1012.10" (old format)
-    if "Details" in course_code:
-        course_code = course_code.replace("Details", "").strip()
-
-    # Attempt to normalize "CSCI CSCI" repetition if present
-    parts = course_code.split()
-    if len(parts) >= 2 and parts[0] == parts[1]:
-        course_code = " ".join(parts[1:])
+    # Old-format codes ("CSCI CSCI 1012", "... Details") are cleaned the same way as in the catalog
+    course_code = normalize_code(course_code)
 
     title = str(row['title'])
     instructor = str(row['instructor'])
@@ -110,6 +102,10 @@ def create_chat_message(row, descriptions, subjects_list):
         yield {"messages": [system_msg, user_msg5, assistant_msg5]}
 
 def main():
+    parser = argparse.ArgumentParser(description="Build the fine-tuning dataset from the scraped CSVs.")
+    add_profile_args(parser)
+    enable_from_args(parser.parse_args(), "prepare_dataset")
+
     input_path = get_data_path("spring_2026_courses.csv")
     if not input_path.exists():
         print(f"Error: {input_path} not found. Please run scrape_courses.py first.")
@@ -119,16 +115,19 @@ def main():
     print("📚 Preparing Fine-tuning Dataset")
     print("="*70)
 
-    # Load schedule data
-    df = pd.read_csv(input_path)
-    print(f"Loaded {len(df)} course entries from schedule.")
+    # Load schedule and bulletin once (binary-cached, see course_catalog.py)
+    with stage("load_schedule"):
+        catalog = load_catalog()
+    sections = catalog.sections
+    print(f"Loaded {len(sections)} course entries from schedule.")
 
     # Load descriptions and subject info
-    descriptions, subject_info = load_descriptions()
+    with stage("load_descriptions"):
+        descriptions, subject_info = load_descriptions(catalog)
 
     # Get unique subjects from schedule data
-    if 'subject' in df.columns:
-        subjects_in_data = sorted(df['subject'].unique())
+    subjects_in_data = [subject for subject in catalog.subjects if subject]
+    if subjects_in_data:
         print(f"Subjects in dataset: {subjects_in_data}")
     else:
         subjects_in_data = ["Computer Science"]  # Fallback for old format
@@ -148,9 +147,10 @@ def main():
     count = 0
     subject_counts = {}
 
-    with open(output_file, 'w') as f:
-        for _, row in df.iterrows():
-            subject = row.get('subject', 'CSCI')
+    with stage("write_examples"), open(output_file, 'w') as f:
+        for section in sections:
+            row = {name: value or EMPTY_CELL for name, value in section.as_row().items()}
+            subject = section.subject or 'CSCI'
             subject_counts[subject] = subject_counts.get(subject, 0) + 1
 
             for example in create_chat_message(row, descriptions, subjects_list):
@@ -163,18 +163,19 @@ def main():
     print(f"Total training examples: {count}")
     print(f"Examples per subject:")
     for subject, cnt in sorted(subject_counts.items()):
-        examples_per_course = count // len(df) if len(df) > 0 else 0
+        examples_per_course = count // len(sections) if len(sections) > 0 else 0
         print(f"  • {subject}: {cnt} courses × ~{examples_per_course} variations = ~{cnt * examples_per_course} examples")
     print(f"\nSaved to: {output_file}")
     
     # Sync to public/data/ for frontend access
     print("\n📦 Syncing to public/data/ for frontend...")
     try:
-        import shutil
-        public_data_dir = PROJECT_ROOT / 'public' / 'data'
-        public_data_dir.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(output_file, public_data_dir / 'course_finetune.jsonl')
-        print(f"✓ Synced to: {public_data_dir / 'course_finetune.jsonl'}")
+        from build_assets import refresh_assets
+        from sync_data_to_public import sync_data_files
+        with stage("sync"):
+            sync_data_files(['course_finetune.jsonl'])
+        with stage("build_assets"):
+            refresh_assets()
     except Exception as e:
         print(f"⚠ Warning: Could not sync to public/data/: {e}")
         print("  You can manually run: python utils/sync_data_to_public.py")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Stage timing and memory instrumentation shared by the utils scripts.
+
+Scripts mark their steps with the `stage` context manager or the
+`profiled` decorator; both cost nothing until profiling is enabled with
+--profile (see add_profile_args). Per stage the report holds wall time,
+CPU time, peak traced Python memory (tracemalloc), RSS growth (psutil, if
+installed) and the number of calls, nested stages as "outer/inner". With
+--cprofile every top-level stage also gets a cProfile dump and its
+hottest functions in the report.
+
+One JSON report per run goes to profiles/<script>-<timestamp>.json, so
+runs can be compared to spot pipeline regressions over time.
+
+Usage (in a script):
+    from profiling import add_profile_args, enable_from_args, stage
+
+    parser = argparse.ArgumentParser()
+    add_profile_args(parser)
+    args = parser.parse_args()
+    enable_from_args(args, "prepare_dataset")
+    with stage("load_schedule"):
+        ...
+"""
+
+import argparse
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# cProfile, pstats, tracemalloc and psutil are only imported once profiling
+# is enabled, so instrumented scripts start as fast as uninstrumented ones
+psutil = None
+tracemalloc = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+PROFILES_DIR = PROJECT_ROOT / 'profiles'
+MB = 1024 * 1024
+TOP_FUNCTIONS = 15
+
+
+def _rss():
+    return psutil.Process().memory_info().rss if psutil is not None else None
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Collects per-stage timings for one run and writes them as a JSON report."""
+    def __init__(self, name: str = None, enabled: bool = False, cprofile: bool = False,
+                 output_dir: Path = PROFILES_DIR):
+        self.name = name or Path(sys.argv[0]).stem
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.output_dir = Path(output_dir)
+        self.stages = {}
+        self._stack = []
+        self._started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._written = None
+
+    def enable(self, cprofile: bool = False):
+        global psutil, tracemalloc
+        import tracemalloc
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self.enabled = True
+        self.cprofile = cprofile
+        self._started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        atexit.register(self.write)
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        path = "/".join([frame["path"] for frame in self._stack[-1:]] + [name])
+        # tracemalloc keeps one peak; fold the current one into the enclosing
+        # stage before resetting it for this one
+        if self._stack:
+            self._stack[-1]["peak"] = max(self._stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        frame = {"path": path, "peak": 0}
+        self._stack.append(frame)
+        # Created on entry so the report lists outer stages before inner ones
+        entry = self.stages.setdefault(path, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                              "peak_traced_mb": 0.0})
+        if self.cprofile:
+            import cProfile
+        profile = cProfile.Profile() if self.cprofile and len(self._stack) == 1 else None
+        rss_start = _rss()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_end = _rss()
+            self._stack.pop()
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+
+            entry["calls"] += 1
+            entry["wall_seconds"] += wall
+            entry["cpu_seconds"] += cpu
+            entry["peak_traced_mb"] = max(entry["peak_traced_mb"], peak / MB)
+            if rss_start is not None:
+                entry["rss_delta_mb"] = entry.get("rss_delta_mb", 0.0) + (rss_end - rss_start) / MB
+            if profile is not None:
+                entry.update(self._dump_profile(profile, path))
+
+    def _dump_profile(self, profile, path: str) -> dict:
+        import io
+        import pstats
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prof_path = self.output_dir / f"{self._stem()}.{path.replace('/', '.')}.prof"
+        profile.dump_stats(prof_path)
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        top = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in list(
+                sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True))[:TOP_FUNCTIONS]:
+            top.append({"function": f"{os.path.basename(filename)}:{line}({function})", "calls": calls,
+                        "total_seconds": total, "cumulative_seconds": cumulative})
+        # Stored next to the report, so the file name is enough
+        return {"cprofile": prof_path.name, "top_functions": top}
+
+    def profiled(self, name: str = None):
+        """Decorator form of stage(); defaults to the function's name."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _stem(self) -> str:
+        return f"{self.name}-{self._started_at.strftime('%Y%m%d-%H%M%S')}"
+
+    def report(self) -> dict:
+        import platform
+        peak_rss = _peak_rss()
+        return {
+            "script": self.name,
+            "argv": sys.argv[1:],
+            "started_at": self._started_at.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "wall_seconds": time.perf_counter() - self._wall_start,
+            "cpu_seconds": time.process_time() - self._cpu_start,
+            "peak_traced_mb": max([s["peak_traced_mb"] for s in self.stages.values()] or [0.0]),
+            "peak_rss_mb": peak_rss / MB if peak_rss is not None else None,
+            "stages": self.stages,
+        }
+
+    def write(self) -> Path:
+        """Write the report once (also called at exit); returns its path."""
+        if not self.enabled or self._written:
+            return self._written
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{self._stem()}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        self._written = path
+        print(f"⏱  Profile written to: {path}")
+        return path
+
+
+# Process-wide profiler used by the module-level helpers
+PROFILER = Profiler()
+
+
+def stage(name: str):
+    return PROFILER.stage(name)
+
+
+def profiled(name: str = None):
+    return PROFILER.profiled(name)
+
+
+def add_profile_args(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Record per-stage time/memory to {PROFILES_DIR.name}/<script>-<time>.json")
+    parser.add_argument("--cprofile", action="store_true", help="With --profile, also cProfile each stage")
+
+
+def enable_from_args(args, name: str = None):
+    if getattr(args, "profile", False) or getattr(args, "cprofile", False):
+        if name:
+            PROFILER.name = name
+        PROFILER.enable(cprofile=args.cprofile)
+
+
+def print_report(path):
+    """Print a saved report as a table."""
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    print("\n" + "="*70)
+    print(f"⏱  {report['script']} ({report['started_at']})")
+    print("="*70)
+    print(f"{'Stage':<36}{'calls':>6}{'wall s':>9}{'cpu s':>9}{'peak MB':>10}")
+    for path, entry in report["stages"].items():
+        print(f"{path:<36}{entry['calls']:>6}{entry['wall_seconds']:>9.3f}{entry['cpu_seconds']:>9.3f}"
+              f"{entry['peak_traced_mb']:>10.1f}")
+    print("-"*70)
+    peak_rss = report.get("peak_rss_mb")
+    print(f"Total: {report['wall_seconds']:.3f}s wall, {report['cpu_seconds']:.3f}s CPU"
+          + (f", peak RSS {peak_rss:.0f} MB" if peak_rss else ""))
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show profiling reports written with --profile.")
+    parser.add_argument("reports", nargs="*", help="Report files (default: the latest one)")
+    args = parser.parse_args()
+
+    reports = args.reports or sorted(PROFILES_DIR.glob("*.json"), key=os.path.getmtime)[-1:]
+    if not reports:
+        print(f"No reports in {PROFILES_DIR}; run a script with --profile first.")
+    for path in reports:
+        print_report(path)
+
+if __name__ == "__main__":
+    main()
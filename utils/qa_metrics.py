@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Offline, vectorized QA metrics: exact match, token F1, BLEU and ROUGE-1/2/L.
+
+Drop-in replacement for evaluate_qa_predictions in evaluate_models_colab.py
+that needs no network access (no evaluate.load) and scores thousands of
+pairs in one batch. Texts are tokenized once into integer arrays; n-grams
+are mapped to integer ids and clipped overlap counts for every pair come
+from a handful of NumPy sort/unique operations instead of per-pair Counters.
+
+Definitions follow the implementations the Colab script used:
+    exact_match - stripped, lowercased string equality
+    f1          - unique lowercased whitespace tokens (the script's set-based F1)
+    bleu        - corpus BLEU-4 over 13a tokens, no smoothing (evaluate "bleu")
+    rouge*      - mean per-pair F-measure over rouge_score tokens, no stemming
+                  (evaluate "rouge"; it reports a bootstrap mid-point of the same mean)
+
+Usage:
+    python utils/qa_metrics.py --validate     # compare with rouge_score / nltk if installed
+    python utils/qa_metrics.py --benchmark 100000
+"""
+
+import argparse
+import math
+import re
+import time
+
+import numpy as np
+
+_13A_RULES = [
+    (re.compile(r'([\{-\~\[-\` -\&\(-\+\:-\@\/])'), r' \1 '),
+    (re.compile(r'([^0-9])([\.,])'), r'\1 \2 '),
+    (re.compile(r'([\.,])([^0-9])'), r' \1 \2'),
+    (re.compile(r'([0-9])(-)'), r'\1 \2 '),
+]
+_NON_ALPHANUM = re.compile(r"[^a-z0-9]+")
+
+
+def tokenize_13a(text: str) -> list:
+    """mteval-v13a tokenization, as used by the evaluate/sacrebleu BLEU metric."""
+    text = text.replace('<skipped>', '').replace('-\n', '').replace('\n', ' ')
+    if '&' in text:
+        text = (text.replace('&quot;', '"').replace('&amp;', '&')
+                .replace('&lt;', '<').replace('&gt;', '>'))
+    text = f' {text} '
+    for pattern, replacement in _13A_RULES:
+        text = pattern.sub(replacement, text)
+    return text.split()
+
+
+def tokenize_rouge(text: str) -> list:
+    """rouge_score tokenization without stemming."""
+    return _NON_ALPHANUM.sub(" ", text.lower()).split()
+
+
+def tokenize_f1(text: str) -> list:
+    return text.lower().split()
+
+
+class TokenArrays:
+    """A batch of tokenized texts as one flat int64 array plus per-text offsets."""
+    def __init__(self, token_lists: list, vocabulary: dict):
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        self.lengths = lengths
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        flat = [vocabulary.setdefault(token, len(vocabulary)) for tokens in token_lists for token in tokens]
+        self.tokens = np.asarray(flat, dtype=np.int64)
+        # Index of the text each flat position belongs to
+        self.owner = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+
+
+def encode_pairs(predictions: list, references: list, tokenizer) -> tuple:
+    """Tokenize predictions and references into TokenArrays sharing one vocabulary."""
+    vocabulary = {}
+    preds = TokenArrays([tokenizer(text) for text in predictions], vocabulary)
+    refs = TokenArrays([tokenizer(text) for text in references], vocabulary)
+    return preds, refs, len(vocabulary)
+
+
+def ngram_ids(preds: TokenArrays, refs: TokenArrays, vocab_size: int, max_order: int) -> list:
+    """
+    Integer ids for every n-gram (n = 1..max_order) in both sides.
+
+    Order-n ids are built by uniquely numbering (order n-1 id, next token)
+    pairs across predictions and references together, so ids are shared
+    between the two sides and stay compact regardless of vocabulary size.
+
+    Returns:
+        One ((pred_owner, pred_ids, ref_owner, ref_ids), num_ids) tuple per order
+    """
+    sides = (preds, refs)
+    ids = [side.tokens for side in sides]
+    num_ids = vocab_size
+    result = []
+    for n in range(1, max_order + 1):
+        if n > 1:
+            # The n-gram starting at flat position i extends the (n-1)-gram at i
+            keys = []
+            for side, prev in zip(sides, ids):
+                count = max(len(prev) - 1, 0)
+                keys.append(prev[:count] * vocab_size + side.tokens[n - 1:n - 1 + count])
+            unique_keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+            num_ids = len(unique_keys)
+            ids = [inverse[:len(keys[0])], inverse[len(keys[0]):]]
+
+        entry = []
+        for side, side_ids in zip(sides, ids):
+            # Drop n-grams that run across the boundary between two texts
+            owner = side.owner[:len(side_ids)]
+            position = np.arange(len(side_ids)) - side.offsets[owner]
+            inside = position + n <= side.lengths[owner]
+            entry.extend((owner[inside], side_ids[inside]))
+        result.append((tuple(entry), max(num_ids, 1)))
+    return result
+
+
+def _pair_counts(owner: np.ndarray, ids: np.ndarray, num_ids: int):
+    """Unique (pair, n-gram) keys and their multiplicities."""
+    keys, counts = np.unique(owner * num_ids + ids, return_counts=True)
+    return keys, counts
+
+
+def clipped_overlap(pred_owner, pred_ids, ref_owner, ref_ids, num_ids: int, num_pairs: int,
+                    unique: bool = False):
+    """
+    Per-pair n-gram overlap: sum over shared n-grams of min(count_pred, count_ref),
+    or the number of shared distinct n-grams when unique=True.
+
+    Returns:
+        (overlap, pred_total, ref_total) arrays of length num_pairs
+    """
+    pred_keys, pred_counts = _pair_counts(pred_owner, pred_ids, num_ids)
+    ref_keys, ref_counts = _pair_counts(ref_owner, ref_ids, num_ids)
+    if unique:
+        pred_counts = np.ones_like(pred_counts)
+        ref_counts = np.ones_like(ref_counts)
+    _, pred_idx, ref_idx = np.intersect1d(pred_keys, ref_keys, assume_unique=True, return_indices=True)
+    matched = np.minimum(pred_counts[pred_idx], ref_counts[ref_idx])
+    overlap = np.bincount(pred_keys[pred_idx] // num_ids, weights=matched, minlength=num_pairs)
+    pred_total = np.bincount(pred_keys // num_ids, weights=pred_counts, minlength=num_pairs)
+    ref_total = np.bincount(ref_keys // num_ids, weights=ref_counts, minlength=num_pairs)
+    return overlap, pred_total, ref_total
+
+
+def _f_measure(overlap, pred_total, ref_total):
+    overlap = np.asarray(overlap, dtype=np.float64)
+    precision = np.divide(overlap, pred_total, out=np.zeros_like(overlap), where=pred_total > 0)
+    recall = np.divide(overlap, ref_total, out=np.zeros_like(overlap), where=ref_total > 0)
+    denom = precision + recall
+    return np.divide(2 * precision * recall, denom, out=np.zeros_like(overlap), where=denom > 0)
+
+
+def lcs_length(a: list, b: list) -> int:
+    """Longest common subsequence length via bit-parallel DP (Hyyrö)."""
+    if not a or not b:
+        return 0
+    masks = {}
+    for i, token in enumerate(a):
+        masks[token] = masks.get(token, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    v = full
+    for token in b:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(a) - bin(v).count('1')
+
+
+def exact_match_scores(predictions: list, references: list) -> np.ndarray:
+    return np.fromiter((p.strip().lower() == r.strip().lower() for p, r in zip(predictions, references)),
+                       dtype=np.float64, count=len(predictions))
+
+
+def f1_scores(predictions: list, references: list) -> np.ndarray:
+    """Set-based token F1 for every pair (same definition as the Colab script)."""
+    preds, refs, vocab_size = encode_pairs(predictions, references, tokenize_f1)
+    (entry, num_ids), = ngram_ids(preds, refs, vocab_size, 1)
+    overlap, pred_total, ref_total = clipped_overlap(*entry, num_ids, len(predictions), unique=True)
+    return _f_measure(overlap, pred_total, ref_total)
+
+
+def bleu_score(predictions: list, references: list, max_order: int = 4) -> dict:
+    """Corpus BLEU with brevity penalty and no smoothing."""
+    preds, refs, vocab_size = encode_pairs(predictions, references, tokenize_13a)
+    precisions = []
+    for entry, num_ids in ngram_ids(preds, refs, vocab_size, max_order):
+        overlap, pred_total, _ = clipped_overlap(*entry, num_ids, len(predictions))
+        possible = pred_total.sum()
+        precisions.append(overlap.sum() / possible if possible > 0 else 0.0)
+
+    translation_length = int(preds.lengths.sum())
+    reference_length = int(refs.lengths.sum())
+    if min(precisions) > 0:
+        geo_mean = math.exp(sum(math.log(p) for p in precisions) / max_order)
+    else:
+        geo_mean = 0.0
+    ratio = translation_length / reference_length if reference_length else 0.0
+    if ratio > 1.0:
+        brevity_penalty = 1.0
+    else:
+        brevity_penalty = math.exp(1 - 1.0 / ratio) if ratio > 0 else 0.0
+    return {
+        "bleu": geo_mean * brevity_penalty,
+        "precisions": [float(p) for p in precisions],
+        "brevity_penalty": brevity_penalty,
+        "translation_length": translation_length,
+        "reference_length": reference_length,
+    }
+
+
+def rouge_scores(predictions: list, references: list) -> dict:
+    """Per-pair ROUGE-1/2/L F-measures."""
+    pred_tokens = [tokenize_rouge(text) for text in predictions]
+    ref_tokens = [tokenize_rouge(text) for text in references]
+    vocabulary = {}
+    preds = TokenArrays(pred_tokens, vocabulary)
+    refs = TokenArrays(ref_tokens, vocabulary)
+
+    scores = {}
+    for n, (entry, num_ids) in enumerate(ngram_ids(preds, refs, len(vocabulary), 2), 1):
+        scores[f"rouge{n}"] = _f_measure(*clipped_overlap(*entry, num_ids, len(predictions)))
+
+    # LCS on the shared integer ids; bit-parallel so long answers stay cheap
+    lcs = np.fromiter((lcs_length(r, p) for p, r in zip(pred_tokens, ref_tokens)),
+                      dtype=np.float64, count=len(predictions))
+    scores["rougeL"] = _f_measure(lcs, preds.lengths.astype(np.float64), refs.lengths.astype(np.float64))
+    return scores
+
+
+def evaluate_qa_predictions(predictions: list, references: list) -> dict:
+    """Same keys as evaluate_models_colab.evaluate_qa_predictions, computed offline."""
+    if len(predictions) != len(references):
+        raise ValueError(f"Got {len(predictions)} predictions for {len(references)} references")
+    if not predictions:
+        return {"exact_match": 0.0, "f1": 0.0, "bleu": 0.0, "rouge1": 0.0, "rouge2": 0.0, "rougeL": 0.0}
+    rouge = rouge_scores(predictions, references)
+    return {
+        "exact_match": float(exact_match_scores(predictions, references).mean()),
+        "f1": float(f1_scores(predictions, references).mean()),
+        "bleu": float(bleu_score(predictions, references)["bleu"]),
+        "rouge1": float(rouge["rouge1"].mean()),
+        "rouge2": float(rouge["rouge2"].mean()),
+        "rougeL": float(rouge["rougeL"].mean()),
+    }
+
+
+def _sample_pairs(n: int, seed: int = 0):
+    """Prediction/reference pairs built from the KG-RAG answers, with perturbations."""
+    import json
+    import random
+    from pathlib import Path
+
+    path = Path(__file__).parent.parent / "data" / "course_finetune_kg_rag.jsonl"
+    answers = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            content = json.loads(line)["messages"][-1]["content"]
+            answers.append(content.split("Answer:")[-1].strip())
+    rng = random.Random(seed)
+    predictions, references = [], []
+    for _ in range(n):
+        reference = rng.choice(answers)
+        words = reference.split()
+        mode = rng.random()
+        if mode < 0.2:
+            prediction = reference
+        elif mode < 0.6:
+            prediction = " ".join(w for w in words if rng.random() > 0.3)
+        elif mode < 0.9:
+            prediction = " ".join(words + rng.choice(answers).split()[:5])
+        else:
+            prediction = rng.choice(answers)
+        predictions.append(prediction)
+        references.append(reference)
+    return predictions, references
+
+
+def validate(n: int = 2000):
+    """Compare against rouge_score and nltk's corpus BLEU (the evaluate metrics' internals)."""
+    predictions, references = _sample_pairs(n)
+    ours = evaluate_qa_predictions(predictions, references)
+    print(f"Offline metrics on {n} pairs: {ours}")
+
+    try:
+        from rouge_score import rouge_scorer
+        scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=False)
+        per_pair = [scorer.score(r, p) for p, r in zip(predictions, references)]
+        for key in ("rouge1", "rouge2", "rougeL"):
+            expected = float(np.mean([s[key].fmeasure for s in per_pair]))
+            print(f"  {key}: offline={ours[key]:.6f} rouge_score={expected:.6f} diff={abs(ours[key] - expected):.2e}")
+    except ImportError:
+        print("  ⚠ rouge_score not installed; skipped ROUGE validation")
+
+    try:
+        from nltk.translate.bleu_score import corpus_bleu
+        expected = corpus_bleu([[tokenize_13a(r)] for r in references], [tokenize_13a(p) for p in predictions])
+        # nltk counts max(1, possible) per sentence, so hypotheses shorter than
+        # four tokens make it differ slightly from evaluate's corpus counts
+        print(f"  bleu: offline={ours['bleu']:.6f} nltk={expected:.6f} diff={abs(ours['bleu'] - expected):.2e}")
+    except ImportError:
+        print("  ⚠ nltk not installed; skipped BLEU validation")
+
+
+def benchmark(n: int = 100000):
+    predictions, references = _sample_pairs(n)
+    start = time.perf_counter()
+    metrics = evaluate_qa_predictions(predictions, references)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Scored {n} pairs in {elapsed:.2f}s ({n / elapsed:,.0f} pairs/s)")
+    print(f"  {metrics}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline QA metrics (EM/F1/BLEU/ROUGE).")
+    parser.add_argument("--validate", action="store_true", help="Compare against reference implementations")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N", help="Score N synthetic pairs")
+    args = parser.parse_args()
+    if args.validate:
+        validate()
+    if args.benchmark:
+        benchmark(args.benchmark)
+    if not args.validate and not args.benchmark:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
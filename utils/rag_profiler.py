@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Per-query latency and token instrumentation for the KG-RAG pipeline.
+
+Runs each query through the same stages as evaluate_models_colab.py and
+records wall time for every one of them:
+    extract_entities -> retrieve_subgraph -> format_subgraph_context
+    -> tokenize -> prefill -> decode
+plus context size, prompt/completion token counts and decode tokens/s.
+The export holds p50/p95/p99 summaries per stage and the correlation
+between context size and latency, keyed by approach so runs for different
+models merge into one file (the way data_prep.py merges metrics files):
+public/data/latency_metrics.json, shown on the results page.
+
+Usage:
+    python utils/rag_profiler.py --backend stub --max-samples 100
+    python utils/rag_profiler.py --backend hf --model path/to/tiny-model --dataset standard
+"""
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from eval_runner import (APPROACHES, DATASETS, GENERATION_KWARGS, NO_GRAPH_CONTEXT, build_kg_messages,
+                         build_standard_messages, load_local_examples)
+from inference_backends import BACKENDS, load_backend
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Read by the results page (components/results-content.tsx); per-query traces stay in data/
+LATENCY_METRICS_PATH = PROJECT_ROOT / 'public' / 'data' / 'latency_metrics.json'
+TRACES_DIR = PROJECT_ROOT / 'data'
+
+STAGES = ["extract_entities", "retrieve_subgraph", "format_subgraph_context", "tokenize", "prefill", "decode"]
+PERCENTILES = (50, 95, 99)
+
+
+class QueryTrace:
+    """Timings and sizes recorded for one query."""
+    def __init__(self, query: str):
+        self.query = query
+        self.stages = {}
+        self.values = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def to_dict(self) -> dict:
+        total = sum(self.stages.values())
+        return {"query": self.query, "total_seconds": total,
+                **{f"{name}_seconds": seconds for name, seconds in self.stages.items()}, **self.values}
+
+
+def summarize(values) -> dict:
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {"count": 0}
+    summary = {"count": int(len(values)), "mean": float(values.mean())}
+    for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{p}"] = float(value)
+    summary["max"] = float(values.max())
+    return summary
+
+
+def correlation(x, y) -> float:
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if len(x) < 2 or x.std() == 0 or y.std() == 0:
+        return None
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def profile_queries(backend, dataset: str, queries: list, max_hops: int = 3, retriever=None) -> list:
+    """
+    Run every query through retrieval and generation, one at a time, so
+    prefill and decode time belong to a single prompt.
+
+    Returns:
+        List of per-query dicts (see QueryTrace.to_dict)
+    """
+    if dataset == "kg" and retriever is None:
+        from knowledge_graph import GraphRetriever, load_pickle
+        retriever = GraphRetriever(load_pickle(SCRIPT_DIR / "kg_graph.pkl"))
+    if dataset == "kg":
+        from knowledge_graph import extract_entities
+
+    traces = []
+    for query in queries:
+        trace = QueryTrace(query)
+        if dataset == "kg":
+            with trace.stage("extract_entities"):
+                entities = extract_entities(query)
+            with trace.stage("retrieve_subgraph"):
+                subgraph = retriever.retrieve_subgraph(query, entities, max_hops=max_hops)
+            with trace.stage("format_subgraph_context"):
+                context = retriever.format_subgraph_context(subgraph)
+            trace.values.update({
+                "entities": len(entities),
+                "subgraph_nodes": subgraph.number_of_nodes(),
+                "subgraph_edges": subgraph.number_of_edges(),
+                "context_chars": 0 if context == NO_GRAPH_CONTEXT else len(context),
+            })
+            messages = build_kg_messages(query, context)
+        else:
+            messages = build_standard_messages(query)
+
+        with trace.stage("tokenize"):
+            tokens = backend.tokenize(messages)
+        start = time.perf_counter()
+        _, counts = backend.batch_generate([tokens])
+        elapsed = time.perf_counter() - start
+        prefill = backend.last_timings.get("prefill_seconds", 0.0)
+        decode = backend.last_timings.get("decode_seconds", elapsed - prefill)
+        trace.stages["prefill"] = prefill
+        trace.stages["decode"] = decode
+        trace.values.update({
+            "prompt_tokens": len(tokens),
+            "completion_tokens": counts[0],
+            "decode_tokens_per_second": counts[0] / decode if decode > 0 else None,
+        })
+        traces.append(trace.to_dict())
+    return traces
+
+
+def build_report(traces: list, backend, dataset: str) -> dict:
+    """Percentile summaries per stage plus context-size/latency correlations."""
+    stages = {name: summarize([t[f"{name}_seconds"] for t in traces if f"{name}_seconds" in t])
+              for name in STAGES}
+    stages = {name: summary for name, summary in stages.items() if summary["count"]}
+    stages["total"] = summarize([t["total_seconds"] for t in traces])
+
+    tokens = {key: summarize([t[key] for t in traces if t.get(key) is not None])
+              for key in ("prompt_tokens", "completion_tokens", "decode_tokens_per_second", "context_chars")}
+    tokens = {key: summary for key, summary in tokens.items() if summary["count"]}
+
+    correlations = {
+        "prompt_tokens_vs_prefill": correlation([t["prompt_tokens"] for t in traces],
+                                                [t["prefill_seconds"] for t in traces]),
+        "prompt_tokens_vs_total": correlation([t["prompt_tokens"] for t in traces],
+                                              [t["total_seconds"] for t in traces]),
+    }
+    if dataset == "kg":
+        correlations["context_chars_vs_total"] = correlation([t["context_chars"] for t in traces],
+                                                             [t["total_seconds"] for t in traces])
+        correlations["subgraph_edges_vs_retrieval"] = correlation(
+            [t["subgraph_edges"] for t in traces], [t["retrieve_subgraph_seconds"] for t in traces])
+
+    return {
+        "profiled_at": datetime.now().isoformat(),
+        "backend": backend.name,
+        "model": backend.model_id,
+        "dataset": dataset,
+        "generation_params": backend.generation_params(),
+        "num_queries": len(traces),
+        "stages_seconds": stages,
+        "tokens": tokens,
+        "correlations": correlations,
+    }
+
+
+def export_report(report: dict, approach: str, output_path: Path, traces: list = None):
+    """Merge one approach's report into the latency metrics file."""
+    data = {"approaches": {}}
+    if output_path.exists():
+        with open(output_path, encoding='utf-8') as f:
+            data = json.load(f)
+    data["approaches"][approach] = report
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    if traces is not None:
+        traces_path = TRACES_DIR / (output_path.stem + "_queries.jsonl")
+        with open(traces_path, 'w', encoding='utf-8') as f:
+            for trace in traces:
+                f.write(json.dumps(trace, ensure_ascii=False) + "\n")
+        return traces_path
+
+
+def print_report(report: dict):
+    print("\n" + "="*70)
+    print(f"⏱  LATENCY PROFILE ({report['num_queries']} queries, {report['backend']} backend)")
+    print("="*70)
+    print(f"{'Stage':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, summary in report["stages_seconds"].items():
+        print(f"{name:<26}" + "".join(f"{summary[key] * 1000:>10.2f}" for key in ("p50", "p95", "p99", "mean")))
+    for key, summary in report["tokens"].items():
+        print(f"{key}: p50={summary['p50']:.1f} p95={summary['p95']:.1f} p99={summary['p99']:.1f}")
+    for key, value in report["correlations"].items():
+        print(f"corr({key}) = {'n/a' if value is None else f'{value:.3f}'}")
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile per-stage latency of the RAG pipeline.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub")
+    parser.add_argument("--model", help="Local path or Hugging Face repo id (not needed for --backend stub)")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="kg")
+    parser.add_argument("--max-samples", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-hops", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--prefix-cache", action="store_true",
+                        help="Prefill the shared system-prompt prefix once and reuse its KV cache")
+    parser.add_argument("--output", default=str(LATENCY_METRICS_PATH))
+    parser.add_argument("--save-queries", action="store_true", help="Also write every per-query trace")
+    args = parser.parse_args()
+
+    queries, _ = load_local_examples(args.dataset, args.max_samples, args.seed)
+    # Same decoding settings as eval_runner.py, so the profile matches the evaluated runs
+    backend = load_backend(args.backend, args.model, device=args.device, max_new_tokens=args.max_new_tokens,
+                           prefix_cache=args.prefix_cache, **GENERATION_KWARGS[args.dataset])
+    print(f"✓ Profiling {len(queries)} {args.dataset} queries with the {backend.name} backend")
+
+    traces = profile_queries(backend, args.dataset, queries, max_hops=args.max_hops)
+    report = build_report(traces, backend, args.dataset)
+    print_report(report)
+    traces_path = export_report(report, APPROACHES[args.dataset], Path(args.output),
+                                traces if args.save_queries else None)
+    print(f"✓ Saved summary to: {args.output}")
+    if Path(args.output).resolve().parent == LATENCY_METRICS_PATH.parent.resolve():
+        from build_assets import refresh_assets
+        refresh_assets(LATENCY_METRICS_PATH.parent)
+    if traces_path:
+        print(f"✓ Saved per-query traces to: {traces_path}")
+
+if __name__ == "__main__":
+    main()
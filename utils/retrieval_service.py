@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Long-running KG retrieval service.
+
+Loads kg_graph.pkl (and the lexical index) once and serves graph context
+over a small asyncio HTTP/JSON API, so callers such as app/api/chat/route.ts
+pay for a lookup rather than a pickle load on every request.
+
+Endpoints:
+    GET  /health            -> graph size, generation, load time
+    POST /context {query, max_hops?, mode?}   -> {context}
+    POST /retrieve {query, max_hops?}         -> {entities, seeds, nodes, edges, context}
+    POST /answer {query}    -> {answer, intent} from the course catalog, or {answer: null}
+    POST /cache/get {query, context?, history?}         -> {answer, similarity} of a cached model answer
+    POST /cache/put {query, context?, history?, answer} -> store a model answer
+    POST /reload            -> reload the configured graph (--kg-path) without downtime
+
+Concurrent identical requests are coalesced onto one computation, and
+/context requests arriving within a few milliseconds are answered with a
+single GraphRetriever.retrieve_batch call.
+
+Usage:
+    python utils/retrieval_service.py --port 8765 --watch 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from answer_cache import AnswerCache
+from knowledge_graph import GraphRetriever, KnowledgeGraph, extract_entities, load_pickle
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_KG_PATH = SCRIPT_DIR / "kg_graph.pkl"
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                500: "Internal Server Error"}
+
+
+def build_retriever(kg_path, use_lexical: bool = True) -> GraphRetriever:
+    """Load a KnowledgeGraph (or pickled GraphRetriever) and attach the lexical index."""
+    obj = load_pickle(kg_path)
+    retriever = obj if isinstance(obj, GraphRetriever) else GraphRetriever(obj)
+    if not isinstance(retriever.kg, KnowledgeGraph):
+        raise TypeError(f"{kg_path} does not contain a KnowledgeGraph")
+    if use_lexical:
+        from lexical_index import DEFAULT_CSV_PATH, load_or_build
+        if DEFAULT_CSV_PATH.exists():
+            retriever.lexical_index = load_or_build()
+    # Build derived indexes now rather than on the first request
+    retriever.pagerank_index
+    return retriever
+
+
+class RetrievalService:
+    """Holds the in-memory retriever and answers coalesced, micro-batched requests."""
+    def __init__(self, kg_path, use_lexical: bool = True, batch_window_ms: float = 2.0,
+                 max_batch: int = 64):
+        self.kg_path = Path(kg_path)
+        self.use_lexical = use_lexical
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self.retriever = None
+        self.fast_path = None
+        self.answer_cache = AnswerCache()
+        self.generation = 0
+        self.loaded_at = None
+        self.load_seconds = None
+        self._loaded_mtimes = None
+        self._reload_lock = asyncio.Lock()
+
+        self._inflight = {}
+        self._pending = []
+        self._flush_handle = None
+        self.stats = {"requests": 0, "coalesced": 0, "batches": 0}
+
+    async def reload(self) -> dict:
+        """Load the configured graph in a worker thread, then swap it in atomically."""
+        async with self._reload_lock:
+            path = self.kg_path
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            retriever = await loop.run_in_executor(None, build_retriever, path, self.use_lexical)
+            # Rebuilt every time so schedule/bulletin CSV changes are picked up too
+            from fast_path import FastPath
+            fast_path = await loop.run_in_executor(None, FastPath)
+            if self.fast_path is not None:
+                # Hit/miss counters in /health cover the whole process, not one generation
+                fast_path.stats = self.fast_path.stats
+            # Requests already running keep the old retriever; new ones see this one
+            self.retriever = retriever
+            self.fast_path = fast_path
+            self.generation += 1
+            self.loaded_at = time.time()
+            self.load_seconds = time.perf_counter() - start
+            self._loaded_mtimes = self._source_mtimes()
+            print(f"✓ Loaded {path} (generation {self.generation}, {self.load_seconds * 1000:.0f} ms)")
+            return self.health()
+
+    def _source_mtimes(self) -> tuple:
+        """mtimes of the graph and the catalog CSVs the fast path answers from."""
+        from course_catalog import BULLETIN_CSV, SCHEDULE_CSV
+        return tuple(path.stat().st_mtime if path.exists() else None
+                     for path in (self.kg_path, SCHEDULE_CSV, BULLETIN_CSV))
+
+    async def watch(self, interval: float):
+        """Poll the graph file and the catalog CSVs and hot-reload when one changes."""
+        while True:
+            await asyncio.sleep(interval)
+            mtimes = self._source_mtimes()
+            if mtimes[0] is None:
+                continue
+            if mtimes != self._loaded_mtimes:
+                try:
+                    await self.reload()
+                except Exception as e:
+                    print(f"⚠ Reload failed, keeping generation {self.generation}: {e}")
+                    self._loaded_mtimes = mtimes
+
+    def health(self) -> dict:
+        graph = self.retriever.kg.graph
+        return {
+            "status": "ok",
+            "kg_path": str(self.kg_path),
+            "generation": self.generation,
+            "nodes": graph.number_of_nodes(),
+            "edges": graph.number_of_edges(),
+            "lexical_index": getattr(self.retriever, 'lexical_index', None) is not None,
+            "loaded_at": self.loaded_at,
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "fast_path": self.fast_path.summary(),
+            "answer_cache": self.answer_cache.summary(),
+            **self.stats,
+        }
+
+    def _coalesce(self, key, start):
+        """Return the shared future for key, creating it with start() if none is in flight."""
+        self.stats["requests"] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return future
+        future = start()
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def context(self, query: str, max_hops: int = 2, mode: str = 'hops') -> str:
+        key = ("context", self.generation, query, max_hops, mode)
+
+        def start():
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((query, max_hops, mode, future))
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+            return future
+
+        return await asyncio.shield(self._coalesce(key, start))
+
+    def _flush(self):
+        """Send every pending /context request to retrieve_batch, grouped by options."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        groups = {}
+        for query, max_hops, mode, future in pending:
+            groups.setdefault((max_hops, mode), []).append((query, future))
+        for (max_hops, mode), items in groups.items():
+            asyncio.ensure_future(self._run_batch(self.retriever, items, max_hops, mode))
+
+    async def _run_batch(self, retriever, items, max_hops, mode):
+        self.stats["batches"] += 1
+        queries = [query for query, _ in items]
+        loop = asyncio.get_running_loop()
+        try:
+            contexts = await loop.run_in_executor(
+                None, lambda: retriever.retrieve_batch(queries, max_hops=max_hops, mode=mode))
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), context in zip(items, contexts):
+            if not future.done():
+                future.set_result(context)
+
+    async def retrieve(self, query: str, max_hops: int = 2) -> dict:
+        key = ("retrieve", self.generation, query, max_hops)
+        retriever = self.retriever
+
+        def lookup():
+            entities = extract_entities(query)
+            seeds = retriever.seed_nodes(query, entities)
+            subgraph = retriever.retrieve_subgraph(query, entities, max_hops=max_hops)
+            return {
+                "query": query,
+                "entities": entities,
+                "seeds": seeds,
+                "nodes": list(subgraph.nodes()),
+                "edges": [[u, v, data.get('edge_type', 'unknown')] for u, v, data in subgraph.edges(data=True)],
+                "context": retriever.format_subgraph_context(subgraph),
+            }
+
+        def start():
+            return asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(None, lookup))
+
+        return await asyncio.shield(self._coalesce(key, start))
+
+    async def dispatch(self, method: str, path: str, body: dict):
+        """Route one request; returns (status, payload)."""
+        if path == "/health":
+            return 200, self.health()
+        if path not in ("/context", "/retrieve", "/answer", "/cache/get", "/cache/put", "/reload"):
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": f"{method} not allowed on {path}"}
+        if path == "/reload":
+            # The path is fixed at startup: unpickling a client-supplied file would run arbitrary code
+            return 200, await self.reload()
+
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            return 400, {"error": "'query' must be a non-empty string"}
+        if path == "/cache/get":
+            answer, similarity = self.answer_cache.get(query, body.get("context") or "", body.get("history"))
+            return 200, {"answer": answer, "similarity": similarity}
+        if path == "/cache/put":
+            answer = body.get("answer")
+            if not isinstance(answer, str) or not answer.strip():
+                return 400, {"error": "'answer' must be a non-empty string"}
+            self.answer_cache.put(query, answer, body.get("context") or "", body.get("history"))
+            return 200, {"entries": len(self.answer_cache)}
+        if path == "/answer":
+            # Catalog lookups take microseconds; no need to leave the event loop
+            answer, intent = self.fast_path.answer(query)
+            return 200, {"answer": answer, "intent": intent}
+        max_hops = int(body.get("max_hops", 2))
+        if path == "/context":
+            mode = body.get("mode", "hops")
+            if mode not in ("hops", "pagerank"):
+                return 400, {"error": "'mode' must be 'hops' or 'pagerank'"}
+            return 200, {"context": await self.context(query, max_hops, mode), "generation": self.generation}
+        return 200, await self.retrieve(query, max_hops)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 handler with keep-alive and JSON bodies."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                raw_body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                    status, payload = await self.dispatch(method.upper(), target.split("?", 1)[0], body)
+                except (json.JSONDecodeError, ValueError, TypeError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload).encode('utf-8')
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    service = RetrievalService(args.kg_path, use_lexical=not args.no_lexical,
+                               batch_window_ms=args.batch_window_ms, max_batch=args.max_batch)
+    await service.reload()
+    server = await asyncio.start_server(service.handle_connection, args.host, args.port)
+    if args.watch:
+        asyncio.ensure_future(service.watch(args.watch))
+
+    print("\n" + "="*70)
+    print(f"🚀 KG retrieval service listening on http://{args.host}:{args.port}")
+    print("="*70)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve KG-RAG retrieval from an in-memory graph.")
+    parser.add_argument("--host", default=os.getenv("RETRIEVAL_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("RETRIEVAL_PORT", "8765")))
+    parser.add_argument("--kg-path", default=str(DEFAULT_KG_PATH))
+    parser.add_argument("--no-lexical", action="store_true", help="Don't attach the bulletin lexical index")
+    parser.add_argument("--watch", type=float, default=0.0,
+                        help="Poll the graph file every N seconds and hot-reload on change")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n✅ Retrieval service stopped.")
+
+if __name__ == "__main__":
+    main()
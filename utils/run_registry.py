@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Registry of training runs parsed from the notebooks in notebooks/.
+
+Each .ipynb is read as JSON and its code cells parsed with `ast`: the last
+FastLanguageModel.from_pretrained, get_peft_model and SFTConfig /
+TrainingArguments calls give the model, LoRA and training settings
+(keyword values resolved through earlier literal assignments such as
+`max_seq_length = 2048`; code under `if False:` is ignored). Dataset sizes
+come from the cell outputs: the trainer banner ("Num examples = 1,920 |
+Num Epochs = 5 | Total steps = 1,200") and the notebooks' own
+"Train examples:" / "Validation examples:" prints.
+
+Runs are keyed by the notebook's content hash. data/run_registry.json caches
+them together with each notebook's size/mtime, so rebuilding only hashes
+notebooks whose stat changed and only parses those whose hash changed.
+
+Usage:
+    python utils/run_registry.py            # update and list runs
+    python utils/run_registry.py --force    # reparse every notebook
+"""
+
+import argparse
+import ast
+import json
+import re
+from pathlib import Path
+
+from sync_data_to_public import file_sha256, load_json, write_json_atomic
+
+# Get project root directory (parent of utils/)
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+NOTEBOOKS_DIR = PROJECT_ROOT / 'notebooks'
+REGISTRY_PATH = PROJECT_ROOT / 'data' / 'run_registry.json'
+# Bump when the extracted fields change so cached entries are reparsed
+PARSER_VERSION = 1
+
+LORA_KEYS = ("r", "lora_alpha", "lora_dropout", "target_modules", "use_rslora", "random_state")
+TRAINING_KEYS = ("learning_rate", "num_train_epochs", "max_steps", "per_device_train_batch_size",
+                 "gradient_accumulation_steps", "warmup_steps", "warmup_ratio", "lr_scheduler_type", "optim",
+                 "weight_decay", "seed")
+MODEL_KEYS = ("model_name", "max_seq_length", "load_in_4bit")
+TRAINING_CALLS = {"SFTConfig", "TrainingArguments"}
+
+TRAINER_BANNER = re.compile(r"Num examples = ([\d,]+) \| Num Epochs = ([\d,]+) \| Total steps = ([\d,]+)")
+TRAIN_EXAMPLES = re.compile(r"Train examples: ([\d,]+)")
+EVAL_EXAMPLES = re.compile(r"Validation examples: ([\d,]+)")
+
+
+def _call_name(node: ast.Call):
+    """("FastLanguageModel", "from_pretrained") for FastLanguageModel.from_pretrained(...)."""
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        owner = func.value.id if isinstance(func.value, ast.Name) else None
+        return owner, func.attr
+    if isinstance(func, ast.Name):
+        return None, func.id
+    return None, None
+
+
+def _value(node, names: dict):
+    """Literal value of node, resolving bare names through earlier literal assignments."""
+    if isinstance(node, ast.Name):
+        return names.get(node.id)
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return None
+
+
+def _walk_live(node):
+    """ast.walk that skips `if False:` bodies (disabled example code)."""
+    if isinstance(node, ast.If) and isinstance(node.test, ast.Constant) and node.test.value is False:
+        yield from (n for child in node.orelse for n in _walk_live(child))
+        return
+    yield node
+    for child in ast.iter_child_nodes(node):
+        yield from _walk_live(child)
+
+
+def _cell_source(cell: dict) -> str:
+    source = cell.get("source", "")
+    source = "".join(source) if isinstance(source, list) else source
+    # IPython magics and shell escapes aren't Python
+    return "\n".join("" if line.lstrip().startswith(("%", "!")) else line for line in source.splitlines())
+
+
+def _cell_output_text(cell: dict) -> str:
+    parts = []
+    for output in cell.get("outputs", []):
+        text = output.get("text") or output.get("data", {}).get("text/plain", "")
+        parts.append("".join(text) if isinstance(text, list) else text)
+    return "\n".join(parts)
+
+
+def _int(text: str) -> int:
+    return int(text.replace(",", ""))
+
+
+def parse_notebook(nb: dict) -> dict:
+    """Model, LoRA, training and dataset settings of one notebook (last call of each kind wins)."""
+    names = {}
+    model, lora, training = {}, {}, {}
+    dataset = {}
+    for cell in nb.get("cells", []):
+        if cell.get("cell_type") != "code":
+            continue
+        try:
+            tree = ast.parse(_cell_source(cell))
+        except SyntaxError:
+            tree = None
+        for node in (_walk_live(tree) if tree else ()):
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                value = _value(node.value, names)
+                if value is not None:
+                    names[node.targets[0].id] = value
+            elif isinstance(node, ast.Call):
+                owner, name = _call_name(node)
+                kwargs = {kw.arg: _value(kw.value, names) for kw in node.keywords if kw.arg}
+                if name == "from_pretrained" and owner == "FastLanguageModel":
+                    model = {k: kwargs.get(k) for k in MODEL_KEYS}
+                elif name == "get_peft_model":
+                    lora = {k: kwargs.get(k) for k in LORA_KEYS}
+                elif name in TRAINING_CALLS:
+                    training = {k: kwargs[k] for k in TRAINING_KEYS if kwargs.get(k) is not None}
+
+        text = _cell_output_text(cell)
+        for match in TRAINER_BANNER.finditer(text):
+            dataset.update(num_examples=_int(match.group(1)), num_epochs=_int(match.group(2)),
+                           total_steps=_int(match.group(3)))
+        for pattern, key in ((TRAIN_EXAMPLES, "train_examples"), (EVAL_EXAMPLES, "eval_examples")):
+            for match in pattern.finditer(text):
+                dataset[key] = _int(match.group(1))
+
+    train = dataset.get("train_examples", dataset.get("num_examples"))
+    if train is not None:
+        dataset["total_examples"] = train + dataset.get("eval_examples", 0)
+    batch = training.get("per_device_train_batch_size")
+    if batch:
+        training["effective_batch_size"] = batch * training.get("gradient_accumulation_steps", 1)
+    return {"model": model, "lora": lora, "training": training, "dataset": dataset}
+
+
+def build_registry(notebooks_dir: Path = NOTEBOOKS_DIR, registry_path: Path = REGISTRY_PATH,
+                   force: bool = False, verbose: bool = True) -> dict:
+    """
+    Bring the registry up to date with the notebooks on disk.
+
+    Returns:
+        {"notebooks": {filename: {sha256, size, mtime_ns, run_id}}, "runs": {run_id: run}}
+    """
+    registry = load_json(registry_path, {})
+    if registry.get("parser_version") != PARSER_VERSION:
+        registry = {}
+    old_notebooks = registry.get("notebooks", {})
+    old_runs = registry.get("runs", {})
+    notebooks, runs = {}, {}
+    parsed = 0
+
+    for path in sorted(Path(notebooks_dir).glob("*.ipynb")):
+        stat = path.stat()
+        entry = old_notebooks.get(path.name, {})
+        if not force and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            digest = entry["sha256"]
+        else:
+            digest = file_sha256(path)
+        run_id = digest[:12]
+        if force or run_id not in old_runs:
+            with open(path, encoding='utf-8') as f:
+                run = parse_notebook(json.load(f))
+            run.update(run_id=run_id, notebook=path.name)
+            parsed += 1
+        else:
+            run = old_runs[run_id]
+        runs[run_id] = run
+        notebooks[path.name] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                "run_id": run_id}
+
+    registry = {"parser_version": PARSER_VERSION, "notebooks": notebooks, "runs": runs}
+    registry_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(registry_path, registry)
+    if verbose:
+        print(f"✓ Run registry: {len(runs)} runs ({parsed} notebooks parsed, "
+              f"{len(runs) - parsed} cached) -> {registry_path}")
+    return registry
+
+
+def run_for_notebook(registry: dict, notebook: str) -> dict:
+    """The registered run of a notebook (by file name), or None."""
+    entry = registry.get("notebooks", {}).get(notebook)
+    return registry["runs"].get(entry["run_id"]) if entry else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index training runs parsed from notebooks/.")
+    parser.add_argument("--force", action="store_true", help="Reparse every notebook")
+    args = parser.parse_args()
+
+    registry = build_registry(force=args.force)
+    print(f"\n{'Run':<14}{'r':>4}{'alpha':>7}{'lr':>9}{'epochs':>8}{'batch':>7}{'examples':>10}  Notebook")
+    for run in registry["runs"].values():
+        lora, training, dataset = run["lora"], run["training"], run["dataset"]
+        epochs = training.get("num_train_epochs") if training.get("max_steps", -1) in (-1, None) \
+            else f"{training['max_steps']}st"
+        print(f"{run['run_id']:<14}{lora.get('r') or '-':>4}{lora.get('lora_alpha') or '-':>7}"
+              f"{training.get('learning_rate') or '-':>9}{epochs or '-':>8}"
+              f"{training.get('effective_batch_size') or '-':>7}{dataset.get('total_examples') or '-':>10}"
+              f"  {run['notebook']}")
+
+if __name__ == "__main__":
+    main()
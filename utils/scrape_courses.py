@@ -1,3 +1,4 @@
+import argparse
 import os
 import re
 import time
@@ -8,6 +9,9 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
+from course_catalog import BULLETIN_FIELDS, SCHEDULE_FIELDS, load_catalog, normalize_code
+from profiling import add_profile_args, enable_from_args, profiled, stage
+
 # Get project root directory (parent of utils/)
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
@@ -49,6 +53,7 @@ SUBJECTS = {
 DEFAULT_TERM_ID = 202601  # Spring 2026
 DEFAULT_CAMPUS_ID = 1
 
+@profiled()
 def scrape_subject_bulletin(subject_code, url, bulletin_code=None):
     """
     Scrapes course descriptions for a specific subject from the GWU Bulletin.
@@ -133,6 +138,7 @@ def scrape_subject_bulletin(subject_code, url, bulletin_code=None):
     print(f"  ✓ Parsed {len(all_courses)} {subject_code} bulletin courses")
     return all_courses
 
+@profiled()
 def scrape_subject_schedule(subject_code, schedule_id, term_id=DEFAULT_TERM_ID, campus_id=DEFAULT_CAMPUS_ID):
     """
     Scrapes course schedule for a specific subject from GWU schedule system.
@@ -187,7 +193,7 @@ def scrape_subject_schedule(subject_code, schedule_id, term_id=DEFAULT_TERM_ID,
                     if status in ["OPEN", "CLOSED", "WAITLIST", "CANCELLED"]:
                         try:
                             crn = cells[1].get_text(strip=True)
-                            subj_text = cells[2].get_text(" ", strip=True).split("Details")[0].strip()
+                            subj_text = normalize_code(cells[2].get_text(" ", strip=True).split("Details")[0])
                             section = cells[3].get_text(strip=True)
                             title = cells[4].get_text(strip=True)
                             credit = cells[5].get_text(strip=True)
@@ -298,34 +304,35 @@ def scrape_all_subjects(subjects_to_scrape=None, incremental=False, term_id=DEFA
     # Handle incremental updates
     if incremental:
         print("\n📊 Merging with existing data...")
-
-        schedule_path = get_data_path('spring_2026_courses.csv')
-        if schedule_path.exists():
-            existing_schedule = pd.read_csv(schedule_path)
-            # Remove old data for subjects we just scraped
-            existing_schedule = existing_schedule[~existing_schedule['subject'].isin(subjects_to_scrape)]
-            schedule_df = pd.concat([existing_schedule, schedule_df], ignore_index=True)
-            print(f"  ✓ Merged schedule data (kept {len(existing_schedule)} existing courses)")
-
-        bulletin_path = get_data_path('bulletin_courses.csv')
-        if bulletin_path.exists():
-            existing_bulletin = pd.read_csv(bulletin_path)
-            existing_bulletin = existing_bulletin[~existing_bulletin['subject'].isin(subjects_to_scrape)]
-            bulletin_df = pd.concat([existing_bulletin, bulletin_df], ignore_index=True)
-            print(f"  ✓ Merged bulletin data (kept {len(existing_bulletin)} existing courses)")
+        with stage("merge_existing"):
+            # Existing rows come from the shared catalog (binary-cached, codes normalized)
+            catalog = load_catalog(get_data_path('spring_2026_courses.csv'), get_data_path('bulletin_courses.csv'))
+            if catalog.sections:
+                # Remove old data for subjects we just scraped
+                existing_schedule = pd.DataFrame(catalog.schedule_rows(exclude_subjects=subjects_to_scrape),
+                                                 columns=SCHEDULE_FIELDS)
+                schedule_df = pd.concat([existing_schedule, schedule_df], ignore_index=True)
+                print(f"  ✓ Merged schedule data (kept {len(existing_schedule)} existing courses)")
+
+            if catalog.courses:
+                existing_bulletin = pd.DataFrame(catalog.bulletin_rows(exclude_subjects=subjects_to_scrape),
+                                                 columns=BULLETIN_FIELDS)
+                bulletin_df = pd.concat([existing_bulletin, bulletin_df], ignore_index=True)
+                print(f"  ✓ Merged bulletin data (kept {len(existing_bulletin)} existing courses)")
 
     # Save to CSV
     print("\n💾 Saving data...")
     data_dir = PROJECT_ROOT / 'data'
     data_dir.mkdir(exist_ok=True)
 
-    schedule_path = get_data_path('spring_2026_courses.csv')
-    schedule_df.to_csv(schedule_path, index=False)
-    print(f"  ✓ Saved schedule: {schedule_path}")
+    with stage("save_csv"):
+        schedule_path = get_data_path('spring_2026_courses.csv')
+        schedule_df.to_csv(schedule_path, index=False)
+        print(f"  ✓ Saved schedule: {schedule_path}")
 
-    bulletin_path = get_data_path('bulletin_courses.csv')
-    bulletin_df.to_csv(bulletin_path, index=False)
-    print(f"  ✓ Saved bulletin: {bulletin_path}")
+        bulletin_path = get_data_path('bulletin_courses.csv')
+        bulletin_df.to_csv(bulletin_path, index=False)
+        print(f"  ✓ Saved bulletin: {bulletin_path}")
 
     # Summary statistics
     print("\n" + "="*70)
@@ -350,7 +357,11 @@ def scrape_all_subjects(subjects_to_scrape=None, incremental=False, term_id=DEFA
     return schedule_df, bulletin_df
 
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="Scrape GWU schedule and bulletin data into data/.")
+    add_profile_args(parser)
+    enable_from_args(parser.parse_args(), "scrape_courses")
+
     # ========================================================================
     # USAGE EXAMPLES - Uncomment the one you want to use
     # ========================================================================
@@ -367,3 +378,5 @@ if __name__ == "__main__":
     # Option 4: Add a new subject without re-scraping existing ones
     # scrape_all_subjects(subjects_to_scrape=['MATH'], incremental=True)
 
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,43 @@
 """
 Sync frontend-accessible data files from data/ to public/data/
 This script ensures frontend can access the training data files.
+
+Files are compared by content hash against public/data/data_manifest.json
+(with a local size/mtime cache in data/.sync_state.json, so unchanged
+files aren't even read) and only changed files are published. A changed
+file is first materialized next to its destination (reflink/copy-on-write
+clone where the filesystem supports it, otherwise a plain copy; hardlinks
+on request) and then renamed into place, so the frontend never sees a
+half-written file. The manifest lists each file's SHA-256 and size for
+cache-busting URLs.
+
+Usage:
+    python utils/sync_data_to_public.py
+    python utils/sync_data_to_public.py --link hardlink   # share inodes with data/
+
+After syncing, the fingerprinted copies of public/data are
+rebuilt (see build_assets.py); pass --no-assets to skip that.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import shutil
 from pathlib import Path
 
+from profiling import add_profile_args, enable_from_args, stage
+
 # Get project root directory (parent of utils/)
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
+DATA_DIR = PROJECT_ROOT / 'data'
+PUBLIC_DATA_DIR = PROJECT_ROOT / 'public' / 'data'
+MANIFEST_NAME = 'data_manifest.json'
+# Local size/mtime of each source at its last sync; lets unchanged files skip hashing
+SYNC_STATE_PATH = DATA_DIR / '.sync_state.json'
+
 # Files that should be synced from data/ to public/data/
 FRONTEND_DATA_FILES = [
     'course_finetune.jsonl',
@@ -20,44 +47,169 @@ FRONTEND_DATA_FILES = [
     'bulletin_courses.csv',     # For frontend CSV exploration
 ]
 
-def sync_data_files():
-    """Copy frontend-accessible files from data/ to public/data/"""
-    data_dir = PROJECT_ROOT / 'data'
-    public_data_dir = PROJECT_ROOT / 'public' / 'data'
-    
-    # Ensure public/data directory exists
-    public_data_dir.mkdir(parents=True, exist_ok=True)
-    
-    synced_files = []
-    skipped_files = []
-    
-    for filename in FRONTEND_DATA_FILES:
-        source = data_dir / filename
-        destination = public_data_dir / filename
-        
-        if source.exists():
-            shutil.copy2(source, destination)
-            synced_files.append(filename)
-            print(f"✓ Synced {filename}")
-        else:
-            skipped_files.append(filename)
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents (copy-on-write)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json(path: Path, default: dict) -> dict:
+    if path.exists():
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    return default
+
+
+def write_json_atomic(path: Path, data: dict):
+    tmp_path = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            return False
+    shutil.copystat(source, destination)
+    return True
+
+
+def publish(source: Path, destination: Path, link: str = 'auto') -> str:
+    """
+    Materialize source next to destination, then atomically rename it into place.
+
+    link: 'auto' (reflink, else copy), 'reflink', 'hardlink' or 'copy'.
+    Hardlinks share the inode with data/, so a script that later rewrites
+    the source in place would also change the published file mid-write;
+    that's why they are opt-in.
+
+    Returns:
+        The method used
+    """
+    tmp_path = destination.with_name(f".{destination.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    method = None
+    try:
+        if link == 'hardlink':
+            try:
+                os.link(source, tmp_path)
+                method = 'hardlink'
+            except OSError:
+                pass
+        if method is None and link in ('auto', 'reflink') and _reflink(source, tmp_path):
+            method = 'reflink'
+        if method is None:
+            shutil.copy2(source, tmp_path)
+            method = 'copy'
+        os.replace(tmp_path, destination)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return method
+
+
+def sync_data_files(filenames: list = None, link: str = 'auto', force: bool = False) -> dict:
+    """
+    Publish changed frontend-accessible files from data/ to public/data/.
+
+    A file is skipped without reading it when its size and mtime match the
+    last sync and the published copy is intact; otherwise its hash decides.
+
+    Returns:
+        {'synced': [...], 'unchanged': [...], 'skipped': [...]}
+    """
+    filenames = filenames or FRONTEND_DATA_FILES
+    PUBLIC_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = PUBLIC_DATA_DIR / MANIFEST_NAME
+    manifest = load_json(manifest_path, {"files": {}})
+    entries = manifest.setdefault("files", {})
+    state = load_json(SYNC_STATE_PATH, {})
+    result = {"synced": [], "unchanged": [], "skipped": []}
+
+    for filename in filenames:
+        source = DATA_DIR / filename
+        destination = PUBLIC_DATA_DIR / filename
+        if not source.exists():
+            result["skipped"].append(filename)
             print(f"⚠ Skipped {filename} (not found in data/)")
-    
+            continue
+
+        stat = source.stat()
+        entry = entries.get(filename, {})
+        published = destination.exists() and destination.stat().st_size == entry.get("size")
+        if not force and published and state.get(filename) == [stat.st_size, stat.st_mtime_ns]:
+            result["unchanged"].append(filename)
+            print(f"= {filename} unchanged")
+            continue
+
+        digest = file_sha256(source)
+        if not force and published and entry.get("sha256") == digest:
+            result["unchanged"].append(filename)
+            print(f"= {filename} unchanged (touched)")
+        else:
+            method = publish(source, destination, link)
+            result["synced"].append(filename)
+            print(f"✓ Synced {filename} ({method})")
+        entries[filename] = {"sha256": digest, "size": stat.st_size}
+        state[filename] = [stat.st_size, stat.st_mtime_ns]
+
+    manifest["files"] = dict(sorted(entries.items()))
+    write_json_atomic(manifest_path, manifest)
+    write_json_atomic(SYNC_STATE_PATH, state)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync frontend data files from data/ to public/data/.")
+    parser.add_argument("files", nargs="*", help=f"Files to sync (default: {', '.join(FRONTEND_DATA_FILES)})")
+    parser.add_argument("--link", choices=["auto", "reflink", "hardlink", "copy"], default="auto")
+    parser.add_argument("--force", action="store_true", help="Republish even if unchanged")
+    parser.add_argument("--no-assets", action="store_true",
+                        help="Don't rebuild the fingerprinted/compressed asset copies")
+    add_profile_args(parser)
+    args = parser.parse_args()
+    enable_from_args(args, "sync_data_to_public")
+
+    with stage("sync"):
+        result = sync_data_files(args.files or None, link=args.link, force=args.force)
+    if not args.no_assets:
+        from build_assets import build_assets
+        with stage("build_assets"):
+            build_assets(PUBLIC_DATA_DIR)
+
     print("\n" + "="*60)
     print("📦 DATA SYNC SUMMARY")
     print("="*60)
-    print(f"Synced files: {len(synced_files)}")
-    for f in synced_files:
+    print(f"Synced files: {len(result['synced'])}")
+    for f in result['synced']:
         print(f"  • {f}")
-    
-    if skipped_files:
-        print(f"\nSkipped files (not found): {len(skipped_files)}")
-        for f in skipped_files:
+    print(f"Unchanged files: {len(result['unchanged'])}")
+
+    if result['skipped']:
+        print(f"\nSkipped files (not found): {len(result['skipped'])}")
+        for f in result['skipped']:
             print(f"  • {f}")
-    
+
     print("="*60)
-    print("✅ Sync complete! Frontend can now access the updated files.")
+    print(f"✅ Sync complete! Manifest: {PUBLIC_DATA_DIR / MANIFEST_NAME}")
     print("="*60)
 
 if __name__ == "__main__":
-    sync_data_files()
+    main()